@@ -4,12 +4,37 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from audio_classifier import AudioClassifier
-import tempfile
+from audio_cache import AudioCache
+from feature_cache import FeatureCache
+from feature_store import FeatureStore
+from feature_extractor import RES_TYPE, RES_TYPES
+from profiling import profiler
+from shared_library import LIBRARY_INDEX_STORAGE, LibraryView, SharedLibrary
+from sequence_rerank import (RERANK_CANDIDATES, SequenceCache, sequence_from_source,
+                             two_stage_search)
 import os
 import warnings
+from collections import OrderedDict
 
 warnings.filterwarnings("ignore")
 
+# Toplu yüklemede varsayılan işçi süreç sayısı
+DEFAULT_WORKERS = min(int(os.environ.get("INGEST_WORKERS", os.cpu_count() or 1)),
+                      os.cpu_count() or 1)
+
+# Oturum başına dinleme önbelleğinin bellek bütçesi; aşılınca diske taşar
+AUDIO_CACHE_MB = int(os.environ.get("AUDIO_CACHE_MB", 256))
+# AUDIO_CACHE_COMPRESS=ogg dinleme için yalnızca sıkıştırılmış kopya tutar
+AUDIO_CACHE_COMPRESS = os.environ.get("AUDIO_CACHE_COMPRESS") or None
+
+# Aşama profili süreç genelindedir ve tüm oturumları kapsar: PROFILE_STAGES=1
+# açar, PROFILE_MEMORY=1 tepe belleği de ölçer (tracemalloc, belirgin ek yük)
+PROFILE_STAGES = os.environ.get("PROFILE_STAGES") == "1"
+PROFILE_MEMORY = os.environ.get("PROFILE_MEMORY") == "1"
+
+# Görünüm başına saklanan en fazla (sürüm, seçim) sonucu
+DERIVED_VIEWS_PER_NAME = 8
+
 # Sayfa konfigürasyonu
 st.set_page_config(
     page_title="🎵 Ses Benzerlik Analizi",
@@ -42,19 +67,195 @@ st.markdown("""
 def load_classifier():
     """Sınıflandırıcıyı yükle (cache'lendi)"""
     try:
-        classifier = AudioClassifier()
+        # FEATURE_CACHE_DIR verilirse özellik önbelleği diske de yazılır
+        # MODEL_BACKEND=numpy modeli TensorFlow yüklemeden çalıştırır
+        # INDEX_QUANTIZATION=float16|int8 benzerlik indeksini sıkıştırılmış tutar
+        # STREAM_LONG_FILES=1 uzun dosyaları yaklaşık akış modunda işler;
+        # ONSET_WINDOW_SECONDS yalnızca ilk vuruştan sonraki pencereyi
+        onset_window = os.environ.get("ONSET_WINDOW_SECONDS")
+        classifier = AudioClassifier(
+            feature_cache=FeatureCache(cache_dir=os.environ.get("FEATURE_CACHE_DIR")),
+            backend=os.environ.get("MODEL_BACKEND", "tensorflow"),
+            index_quantization=os.environ.get("INDEX_QUANTIZATION") or None,
+            streaming=os.environ.get("STREAM_LONG_FILES") == "1",
+            onset_window=float(onset_window) if onset_window else None
+        )
         return classifier
     except Exception as e:
         st.error(f"Model yüklenemedi: {e}")
         return None
 
+@st.cache_resource
+def configure_profiler():
+    """Profil kaydediciyi süreç için bir kez ayarla; oturumlar açıp kapatmaz"""
+    if PROFILE_STAGES:
+        profiler.enable(memory=PROFILE_MEMORY)
+    else:
+        profiler.disable()
+    return profiler
+
+@st.cache_resource
+def load_shared_library(_classifier):
+    """Tüm oturumların kilitsiz okuduğu paylaşılan referans kütüphanesi (cache'lendi)"""
+    # FEATURE_STORE_PATH verilirse kütüphane diskte kalıcıdır ve yüklemeler
+    # herkesle paylaşılır; verilmezse her oturumun yüklemeleri kendi katmanında kalır
+    store_path = os.environ.get("FEATURE_STORE_PATH")
+    store = FeatureStore(store_path, classes=_classifier.classes) if store_path else None
+    return SharedLibrary(store=store, n_probe=_classifier.ann_probes,
+                         quantization=_classifier.index_quantization or LIBRARY_INDEX_STORAGE)
+
 # Session state'i başlat
 if 'processed_files' not in st.session_state:
     st.session_state.processed_files = []
-if 'reference_database' not in st.session_state:
-    st.session_state.reference_database = []
+if 'overlay' not in st.session_state:
+    # Oturumun kendi yüklemeleri; paylaşılan kütüphanenin kopyası tutulmaz
+    st.session_state.overlay = SharedLibrary()
 if 'audio_cache' not in st.session_state:
-    st.session_state.audio_cache = {}
+    st.session_state.audio_cache = AudioCache(max_memory_bytes=AUDIO_CACHE_MB << 20,
+                                              compress=AUDIO_CACHE_COMPRESS)
+if 'sequence_cache' not in st.session_state:
+    # Yeniden sıralama dizileri diske bırakılan özgün baytlardan, yalnızca
+    # ilk M aday için hesaplanır; dinleme önbelleğine dokunulmaz
+    st.session_state.sequence_cache = SequenceCache()
+if 'file_digests' not in st.session_state:
+    st.session_state.file_digests = {}
+if 'upload_digests' not in st.session_state:
+    st.session_state.upload_digests = {}
+if 'library_version' not in st.session_state:
+    st.session_state.library_version = 0
+if 'derived_views' not in st.session_state:
+    st.session_state.derived_views = {}
+
+def content_digest(classifier, uploaded_file):
+    """Yüklenen dosyanın içerik anahtarı (yükleme kimliği başına bir kez hesaplanır)"""
+    upload_id = getattr(uploaded_file, 'file_id', None) or uploaded_file.name
+    digest = st.session_state.upload_digests.get(upload_id)
+    if digest is None:
+        digest = classifier.feature_cache.key(uploaded_file.getvalue())
+        st.session_state.upload_digests[upload_id] = digest
+    return digest
+
+def play_audio(name):
+    """Önbellekteki sesi çal (diske taşmışsa yeniden okunur)"""
+    entry = st.session_state.audio_cache.get(name) if name else None
+    if entry is not None:
+        data, mime = entry
+        st.audio(data, format=mime)
+
+def find_similar(view, target_features, target_class, query_sequence, rerank_candidates):
+    """En benzer 10 ses; rerank_candidates > 0 ise o kadar aday DTW ile yeniden sıralanır"""
+    if not rerank_candidates:
+        return view.find_similar_sounds(target_features, target_class, top_k=10)
+    sequences = st.session_state.sequence_cache
+    return two_stage_search(view, target_features, target_class, query_sequence(sequences),
+                            sequences, top_k=10, candidates=rerank_candidates)
+
+def similarity_details(sim):
+    """Benzerlik kartının metrik satırları"""
+    details = (f"🎯 Cosine Similarity: {sim['cosine_similarity']:.3f}<br>"
+               f"📏 Euclidean Distance: {sim['euclidean_distance']:.3f}")
+    if sim.get('dtw_distance') is not None:
+        details += f"<br>🎼 DTW Distance: {sim['dtw_distance']:.3f}"
+    return details
+
+def library_version(view):
+    """Türetilmiş görünümlerin anahtarı: oturum değişiklik sayacı + kütüphane sürümleri"""
+    return st.session_state.library_version, view.version
+
+def bump_library_version():
+    """Sonuçlar ya da kütüphane değişti: önbellekli görünümler geçersizleşir"""
+    st.session_state.library_version += 1
+    st.session_state.derived_views = {}
+
+def memo(name, key, compute):
+    """name görünümünü key için bir kez hesapla; yeniden çalıştırmalarda sakla"""
+    views = st.session_state.derived_views.setdefault(name, OrderedDict())
+    if key in views:
+        views.move_to_end(key)
+        return views[key]
+    value = views[key] = compute()
+    while len(views) > DERIVED_VIEWS_PER_NAME:
+        views.popitem(last=False)
+    return value
+
+def results_views(results):
+    """Sonuç listesinden türetilen tablo, grafikler ve ada göre arama sözlüğü"""
+    names = [r['filename'] for r in results]
+    
+    # Sonuç tablosu
+    df_results = pd.DataFrame([
+        {
+            'Dosya': r['filename'],
+            'Tahmin': r['predicted_class'],
+            'Güven': f"{r['confidence']:.3f}"
+        } for r in results
+    ])
+    
+    # Sınıf sayıları ve pie chart
+    class_counts = pd.Series([r['predicted_class'] for r in results]).value_counts()
+    fig_pie = px.pie(
+        values=class_counts.values,
+        names=class_counts.index,
+        title="Sınıf Dağılımı"
+    )
+    
+    # Güven skoru histogramı
+    fig_hist = px.histogram(
+        x=[r['confidence'] for r in results],
+        nbins=20,
+        title="Güven Skorları",
+        labels={'x': 'Güven Skoru', 'y': 'Frekans'}
+    )
+    
+    # Kenar çubuğu için yükleme sırasında sınıf sayıları
+    sidebar_counts = {}
+    for r in results:
+        sidebar_counts[r['predicted_class']] = sidebar_counts.get(r['predicted_class'], 0) + 1
+    
+    return {'names': names, 'by_name': dict(zip(names, results)), 'table': df_results,
+            'pie': fig_pie, 'hist': fig_hist, 'counts': sidebar_counts}
+
+def pca_figure(view, target_features, target_class, target_label):
+    """Sınıfın PCA haritası; sınıfta 2'den az ses varsa None"""
+    pca_data = view.get_pca_visualization_data(target_features, target_class)
+    if pca_data[0] is None:
+        return None
+    pca_features, pca_names, variance_ratio, pca_obj = pca_data
+    
+    fig_pca = go.Figure()
+    
+    # Referans sesleri
+    ref_indices = [i for i, name in enumerate(pca_names) if name != 'Yüklenen Ses']
+    if ref_indices:
+        fig_pca.add_trace(go.Scatter(
+            x=pca_features[ref_indices, 0],
+            y=pca_features[ref_indices, 1],
+            mode='markers+text',
+            text=[pca_names[i] for i in ref_indices],
+            textposition="top center",
+            marker=dict(color='lightblue', size=10),
+            name='Referans Sesler'
+        ))
+    
+    # Hedef ses
+    target_idx = pca_names.index('Yüklenen Ses')
+    fig_pca.add_trace(go.Scatter(
+        x=[pca_features[target_idx, 0]],
+        y=[pca_features[target_idx, 1]],
+        mode='markers+text',
+        text=[f'🎯 {target_label}'],
+        textposition="top center",
+        marker=dict(color='red', size=15, symbol='star'),
+        name=target_label
+    ))
+    
+    fig_pca.update_layout(
+        title=f"PCA Görselleştirmesi<br>Açıklanan Varyans: PC1={variance_ratio[0]:.2%}, PC2={variance_ratio[1]:.2%}",
+        xaxis_title="1. Ana Bileşen",
+        yaxis_title="2. Ana Bileşen",
+        height=500
+    )
+    return fig_pca
 
 def main():
     st.markdown('<div class="main-header">🎵 Ses Benzerlik Analizi</div>', 
@@ -65,8 +266,10 @@ def main():
     if classifier is None:
         st.stop()
     
-    # Cache'deki veritabanını classifier'a yükle
-    classifier.reference_database = st.session_state.reference_database
+    # Paylaşılan kütüphane + oturum katmanı; bu çalıştırmadaki tüm aramalar
+    # aynı sürümleri görür
+    shared = load_shared_library(classifier)
+    view = LibraryView(shared, st.session_state.overlay)
     
     st.markdown(f"""
     **Desteklenen Sınıflar:** {', '.join(classifier.classes)}
@@ -74,6 +277,42 @@ def main():
     **Kullanım:** Ses dosyalarınızı yükleyin ve sistem otomatik olarak sınıflandıracak.
     """)
     
+    # Toplu yükleme için işçi süreç sayısı
+    n_workers = st.sidebar.number_input(
+        "⚙️ İşçi süreç sayısı",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=DEFAULT_WORKERS,
+        help="Toplu yüklemede özellik çıkarımı için kullanılacak süreç sayısı"
+    )
+    
+    # Yeniden örnekleme kalitesi (model soxr_hq ile eğitildi)
+    res_type = st.sidebar.selectbox(
+        "⚙️ Yeniden örnekleme kalitesi",
+        options=list(RES_TYPES),
+        index=RES_TYPES.index(RES_TYPE),
+        help="Hızlı modlar özellikleri az da olsa kaydırır; ayrıntılar README'de"
+    )
+    
+    # İki aşamalı arama: 42 boyutlu aramanın ilk M adayı zarf dizileriyle yeniden sıralanır
+    use_rerank = st.sidebar.checkbox(
+        "🎼 Zamansal yeniden sıralama (DTW)",
+        value=False,
+        help="Yalnızca ilk M aday için çerçeve düzeyinde MFCC dizileri DTW ile karşılaştırılır"
+    )
+    rerank_candidates = use_rerank and st.sidebar.number_input(
+        "Yeniden sıralanacak aday sayısı (M)",
+        min_value=10, max_value=500, value=RERANK_CANDIDATES, step=10
+    )
+    
+    # Aşama profili süreç ayarıdır; kutu yalnızca bu oturumda paneli gösterir
+    configure_profiler()
+    profile_stages = profiler.enabled and st.sidebar.checkbox(
+        "⏱️ Aşama profili paneli",
+        value=True,
+        help="Tüm oturumların çözme, STFT, mel, kontrast, onset, HPSS vb. süreleri"
+    )
+    
     # Tab'lar oluştur
     tab1, tab2 = st.tabs(["📁 Toplu Yükleme", "🎯 Tek Dosya Analizi"])
     
@@ -93,10 +332,11 @@ def main():
         if uploaded_files:
             st.markdown("---")
             
-            # Yeni dosyaları kontrol et (cache için)
+            # Yeni dosyaları içerik özetine göre kontrol et: aynı adla değişen
+            # dosya yeniden işlenir, yeniden adlandırılan kopya önbellekten gelir
             new_files = []
             for uploaded_file in uploaded_files:
-                if uploaded_file.name not in [f['filename'] for f in st.session_state.processed_files]:
+                if content_digest(classifier, uploaded_file) != st.session_state.file_digests.get(uploaded_file.name):
                     new_files.append(uploaded_file)
             
             if new_files:
@@ -106,49 +346,73 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                # Sadece yeni dosyaları işle
-                for i, uploaded_file in enumerate(new_files):
-                    status_text.text(f"İşleniyor: {uploaded_file.name}")
-                    progress_bar.progress((i + 1) / len(new_files))
-                    
-                    # Geçici dosya oluştur
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                        file_content = uploaded_file.read()
-                        tmp_file.write(file_content)
-                        tmp_file.flush()
-                        
-                        # Sınıflandır
-                        predicted_class, confidence, features = classifier.predict_single(tmp_file.name)
-                        
-                        if predicted_class is not None:
-                            # Veritabanına ekle
-                            classifier.add_to_database(uploaded_file, predicted_class, features)
-                            
-                            # Session state'e ekle
-                            st.session_state.processed_files.append({
-                                'filename': uploaded_file.name,
-                                'predicted_class': predicted_class,
-                                'confidence': confidence,
-                                'features': features
-                            })
-                            
-                            # Ses dosyasını cache'le
-                            st.session_state.audio_cache[uploaded_file.name] = file_content
-                        
-                        # Geçici dosyayı sil
-                        os.unlink(tmp_file.name)
+                def update_progress(done, total, name):
+                    status_text.text(f"İşleniyor: {name}")
+                    progress_bar.progress(done / total)
+                
+                # Sadece yeni dosyaları paralel işle (tek toplu model çağrısı)
+                errors = []
+                new_refs = []
+                results = classifier.classify_multiple_files(
+                    new_files,
+                    n_workers=n_workers,
+                    progress_callback=update_progress,
+                    errors=errors,
+                    res_type=res_type,
+                    database=new_refs
+                )
                 
-                # Session state'i güncelle
-                st.session_state.reference_database = classifier.reference_database.copy()
+                # Kalıcı depo varsa yüklemeler paylaşılan kütüphaneye, yoksa oturum katmanına
+                library = shared if shared.store is not None else st.session_state.overlay
+                
+                # Aynı adla değişmiş dosyaların eski sonuçlarını çıkar
+                replaced = {r['filename'] for r in results} & set(st.session_state.file_digests)
+                if replaced:
+                    st.session_state.processed_files = [
+                        f for f in st.session_state.processed_files if f['filename'] not in replaced
+                    ]
+                    if library.store is None:
+                        library.remove(replaced)
+                
+                # Tek yayım: eşzamanlı aramalar ya eski ya yeni kütüphaneyi görür
+                library.extend(new_refs)
+                view = LibraryView(shared, st.session_state.overlay)
+                
+                for result in results:
+                    # Session state'e ekle
+                    st.session_state.processed_files.append(result)
+                
+                for uploaded_file in new_files:
+                    st.session_state.file_digests[uploaded_file.name] = content_digest(classifier, uploaded_file)
+                
+                # Ses dosyalarını cache'le
+                processed_names = {r['filename'] for r in results}
+                for uploaded_file in new_files:
+                    # Aynı adla değişen dosyanın eski dizisi bir daha kullanılmaz
+                    st.session_state.sequence_cache.discard(uploaded_file.name)
+                    if uploaded_file.name in processed_names:
+                        st.session_state.audio_cache.put(uploaded_file.name, uploaded_file.getvalue())
+                        st.session_state.sequence_cache.register(
+                            uploaded_file.name, uploaded_file.getvalue(),
+                            key=content_digest(classifier, uploaded_file)
+                        )
+                
+                bump_library_version()
                 
                 progress_bar.empty()
                 status_text.empty()
-                st.success(f"{len(new_files)} dosya başarıyla işlendi!")
+                st.success(f"{len(results)} dosya başarıyla işlendi!")
+                for error in errors:
+                    st.warning(f"{error['filename']} işlenemedi: {error['error']}")
             
             # Tüm işlenmiş dosyaları göster
             results = st.session_state.processed_files
             
             if results:
+                # Tablo ve grafikler kütüphane değişmedikçe yeniden kurulmaz
+                version = library_version(view)
+                views = memo('results', version, lambda: results_views(results))
+                
                 # Sonuçları göster
                 col1, col2 = st.columns([2, 1])
                 
@@ -158,58 +422,37 @@ def main():
                     # Temizle butonu
                     if st.button("🗑️ Tümünü Temizle", help="Tüm yüklenmiş dosyaları temizle"):
                         st.session_state.processed_files = []
-                        st.session_state.reference_database = []
-                        st.session_state.audio_cache = {}
-                        classifier.reference_database = []
+                        st.session_state.audio_cache.clear()
+                        st.session_state.sequence_cache.clear()
+                        st.session_state.file_digests = {}
+                        # Paylaşılan kütüphane temizlenmez, yalnızca oturum katmanı
+                        st.session_state.overlay = SharedLibrary()
+                        bump_library_version()
                         st.rerun()
                     
                     # Sonuç tablosu
-                    df_results = pd.DataFrame([
-                        {
-                            'Dosya': r['filename'],
-                            'Tahmin': r['predicted_class'],
-                            'Güven': f"{r['confidence']:.3f}"
-                        } for r in results
-                    ])
-                    
-                    st.dataframe(df_results, use_container_width=True)
+                    st.dataframe(views['table'], use_container_width=True)
                 
                 with col2:
                     st.subheader("📈 Sınıf Dağılımı")
                     
-                    # Sınıf sayıları
-                    class_counts = pd.Series([r['predicted_class'] for r in results]).value_counts()
-                    
                     # Pie chart
-                    fig_pie = px.pie(
-                        values=class_counts.values,
-                        names=class_counts.index,
-                        title="Sınıf Dağılımı"
-                    )
-                    st.plotly_chart(fig_pie, use_container_width=True)
+                    st.plotly_chart(views['pie'], use_container_width=True)
                 
                 # Ses çalma bölümü
                 st.subheader("🎧 Ses Çalar")
                 selected_audio = st.selectbox(
                     "Çalmak istediğiniz sesi seçin:",
-                    options=[r['filename'] for r in results],
+                    options=views['names'],
                     key="audio_player_bulk"
                 )
                 
                 # Seçilen ses dosyasını çal
-                if selected_audio and selected_audio in st.session_state.audio_cache:
-                    st.audio(st.session_state.audio_cache[selected_audio], format='audio/wav')
+                play_audio(selected_audio)
                 
                 # Güven skoru histogramı
                 st.subheader("📊 Güven Skoru Dağılımı")
-                confidences = [r['confidence'] for r in results]
-                fig_hist = px.histogram(
-                    x=confidences,
-                    nbins=20,
-                    title="Güven Skorları",
-                    labels={'x': 'Güven Skoru', 'y': 'Frekans'}
-                )
-                st.plotly_chart(fig_hist, use_container_width=True)
+                st.plotly_chart(views['hist'], use_container_width=True)
                 
                 st.markdown("---")
                 
@@ -218,13 +461,13 @@ def main():
                 
                 selected_file = st.selectbox(
                     "Benzerlik analizi için bir ses seçin:",
-                    options=[r['filename'] for r in results],
+                    options=views['names'],
                     help="Seçilen ses ile aynı sınıftaki diğer sesler arasında benzerlik analizi yapılacak"
                 )
                 
                 if selected_file:
                     # Seçilen sesi bul
-                    selected_result = next(r for r in results if r['filename'] == selected_file)
+                    selected_result = views['by_name'][selected_file]
                     target_class = selected_result['predicted_class']
                     target_features = selected_result['features']
                     
@@ -235,13 +478,14 @@ def main():
                     """)
                     
                     # Seçilen sesi çal
-                    if selected_file in st.session_state.audio_cache:
-                        st.audio(st.session_state.audio_cache[selected_file], format='audio/wav')
+                    play_audio(selected_file)
                     
-                    # Benzer sesleri bul
-                    similar_sounds = classifier.find_similar_sounds(
-                        target_features, target_class, top_k=10
-                    )
+                    # Benzer sesleri bul (aynı seçim için yeniden aranmaz)
+                    selection = (version, selected_file, target_class)
+                    similar_sounds = memo('similar', selection + (rerank_candidates,), lambda: find_similar(
+                        view, target_features, target_class,
+                        lambda sequences: sequences.get(selected_file), rerank_candidates
+                    ))
                     
                     if similar_sounds:
                         col1, col2 = st.columns([1, 1])
@@ -255,8 +499,7 @@ def main():
                                     <div class="similarity-card">
                                         <strong>{i+1}. {sim['filename']}</strong><br>
                                         <small>
-                                        🎯 Cosine Similarity: {sim['cosine_similarity']:.3f}<br>
-                                        📏 Euclidean Distance: {sim['euclidean_distance']:.3f}
+                                        {similarity_details(sim)}
                                         </small>
                                     </div>
                                     """, unsafe_allow_html=True)
@@ -271,59 +514,53 @@ def main():
                                     key="similar_audio_player"
                                 )
                                 
-                                if similar_audio and similar_audio in st.session_state.audio_cache:
-                                    st.audio(st.session_state.audio_cache[similar_audio], format='audio/wav')
+                                play_audio(similar_audio)
                         
                         with col2:
                             # PCA görselleştirmesi
-                            pca_data = classifier.get_pca_visualization_data(
-                                target_features, target_class
-                            )
+                            fig_pca = memo('pca', selection, lambda: pca_figure(
+                                view, target_features, target_class, 'Seçilen Ses'
+                            ))
                             
-                            if pca_data[0] is not None:
-                                pca_features, pca_names, variance_ratio, pca_obj = pca_data
-                                
+                            if fig_pca is not None:
                                 st.subheader(f"📍 PCA Haritası ({target_class})")
-                                
-                                fig_pca = go.Figure()
-                                
-                                # Referans sesleri
-                                ref_indices = [i for i, name in enumerate(pca_names) if name != 'Yüklenen Ses']
-                                if ref_indices:
-                                    fig_pca.add_trace(go.Scatter(
-                                        x=pca_features[ref_indices, 0],
-                                        y=pca_features[ref_indices, 1],
-                                        mode='markers+text',
-                                        text=[pca_names[i] for i in ref_indices],
-                                        textposition="top center",
-                                        marker=dict(color='lightblue', size=10),
-                                        name='Referans Sesler'
-                                    ))
-                                
-                                # Hedef ses
-                                target_idx = pca_names.index('Yüklenen Ses')
-                                fig_pca.add_trace(go.Scatter(
-                                    x=[pca_features[target_idx, 0]],
-                                    y=[pca_features[target_idx, 1]],
-                                    mode='markers+text',
-                                    text=['🎯 Seçilen Ses'],
-                                    textposition="top center",
-                                    marker=dict(color='red', size=15, symbol='star'),
-                                    name='Seçilen Ses'
-                                ))
-                                
-                                fig_pca.update_layout(
-                                    title=f"PCA Görselleştirmesi<br>Açıklanan Varyans: PC1={variance_ratio[0]:.2%}, PC2={variance_ratio[1]:.2%}",
-                                    xaxis_title="1. Ana Bileşen",
-                                    yaxis_title="2. Ana Bileşen",
-                                    height=500
-                                )
-                                
                                 st.plotly_chart(fig_pca, use_container_width=True)
                             else:
                                 st.info(f"PCA görselleştirmesi için {target_class} sınıfından en az 2 ses gerekli.")
                     else:
                         st.info(f"Henüz {target_class} sınıfından başka ses yok.")
+
+                st.markdown("---")
+
+                # Kütüphane genelinde yinelenen / neredeyse aynı sesler
+                st.subheader("🧬 Yinelenen Sesler")
+                duplicate_threshold = st.slider(
+                    "Kosinüs benzerliği eşiği",
+                    min_value=0.90, max_value=1.0, value=0.99, step=0.001, format="%.3f",
+                    help="Aynı sınıfta benzerliği bu eşiğe ulaşan sesler aynı kümeye girer"
+                )
+                duplicates_key = (library_version(view), duplicate_threshold)
+                if st.button("🔎 Yinelenenleri bul") or duplicates_key in st.session_state.derived_views.get('duplicates', {}):
+                    try:
+                        with st.spinner("Tüm çiftler taranıyor..."):
+                            duplicates = memo('duplicates', duplicates_key,
+                                              lambda: view.find_duplicates(duplicate_threshold))
+                    except ValueError:
+                        # Eşleşen çift sayısı MAX_DUPLICATE_PAIRS sınırını aştı
+                        duplicates = None
+                        st.warning("Bu eşikte çok fazla eşleşen çift var; lütfen eşiği yükseltin.")
+                    if duplicates:
+                        st.write(f"{len(duplicates)} küme, toplam {sum(len(c['files']) for c in duplicates)} ses")
+                        st.dataframe(pd.DataFrame([
+                            {
+                                'Sınıf': c['class'],
+                                'Ses sayısı': len(c['files']),
+                                'En düşük benzerlik': f"{c['min_similarity']:.4f}",
+                                'Dosyalar': ', '.join(c['files'])
+                            } for c in duplicates
+                        ]), use_container_width=True)
+                    elif duplicates is not None:
+                        st.info("Bu eşikte yinelenen ses bulunamadı.")
             else:
                 st.info("Henüz hiç ses dosyası yüklenmemiş.")
     
@@ -340,20 +577,17 @@ def main():
         )
         
         if single_file:
-            if len(st.session_state.processed_files) == 0:
-                st.warning("Önce 'Toplu Yükleme' sekmesinden referans sesler yüklemeniz gerekiyor!")
+            # Referanslar bu oturumun yüklemeleri ya da paylaşılan/kalıcı kütüphanedir
+            if len(view) == 0:
+                st.warning("Kütüphane boş; önce 'Toplu Yükleme' sekmesinden referans sesler yükleyin!")
             else:
+                # Aynı yükleme ve ayarlar için sonuçlar yeniden hesaplanmaz
+                upload = (content_digest(classifier, single_file), res_type)
                 with st.spinner("Ses analiz ediliyor..."):
-                    # Geçici dosya oluştur
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                        tmp_file.write(single_file.read())
-                        tmp_file.flush()
-                        
-                        # Sınıflandır
-                        predicted_class, confidence, features = classifier.predict_single(tmp_file.name)
-                        
-                        # Geçici dosyayı sil
-                        os.unlink(tmp_file.name)
+                    # Sınıflandır (geçici dosya olmadan, bellekten çözülür)
+                    predicted_class, confidence, features = memo('single', upload, lambda: classifier.predict_single(
+                        single_file.getvalue(), res_type=res_type
+                    ))
                 
                 if predicted_class is not None:
                     col1, col2 = st.columns([1, 1])
@@ -371,9 +605,12 @@ def main():
                         st.audio(single_file.getvalue(), format='audio/wav')
                         
                         # Benzer sesleri bul
-                        similar_sounds = classifier.find_similar_sounds(
-                            features, predicted_class, top_k=10
-                        )
+                        selection = (library_version(view), upload)
+                        similar_sounds = memo('similar', selection + (rerank_candidates,), lambda: find_similar(
+                            view, features, predicted_class,
+                            lambda sequences: sequence_from_source(single_file.getvalue(), sequences.res_type),
+                            rerank_candidates
+                        ))
                         
                         if similar_sounds:
                             st.subheader(f"🎯 En Benzer Sesler ({predicted_class})")
@@ -383,8 +620,7 @@ def main():
                                 <div class="similarity-card">
                                     <strong>{i+1}. {sim['filename']}</strong><br>
                                     <small>
-                                    🎯 Cosine Similarity: {sim['cosine_similarity']:.3f}<br>
-                                    📏 Euclidean Distance: {sim['euclidean_distance']:.3f}
+                                    {similarity_details(sim)}
                                     </small>
                                 </div>
                                 """, unsafe_allow_html=True)
@@ -397,56 +633,18 @@ def main():
                                 key="similar_audio_player_single"
                             )
                             
-                            if similar_audio_single and similar_audio_single in st.session_state.audio_cache:
-                                st.audio(st.session_state.audio_cache[similar_audio_single], format='audio/wav')
+                            play_audio(similar_audio_single)
                         else:
                             st.info(f"Veritabanında {predicted_class} sınıfından başka ses bulunamadı.")
                     
                     with col2:
                         # PCA görselleştirmesi
-                        pca_data = classifier.get_pca_visualization_data(
-                            features, predicted_class
-                        )
+                        fig_pca = memo('pca', selection, lambda: pca_figure(
+                            view, features, predicted_class, 'Analiz Edilen Ses'
+                        ))
                         
-                        if pca_data[0] is not None:
-                            pca_features, pca_names, variance_ratio, pca_obj = pca_data
-                            
+                        if fig_pca is not None:
                             st.subheader(f"📍 PCA Haritası ({predicted_class})")
-                            
-                            fig_pca = go.Figure()
-                            
-                            # Referans sesleri
-                            ref_indices = [i for i, name in enumerate(pca_names) if name != 'Yüklenen Ses']
-                            if ref_indices:
-                                fig_pca.add_trace(go.Scatter(
-                                    x=pca_features[ref_indices, 0],
-                                    y=pca_features[ref_indices, 1],
-                                    mode='markers+text',
-                                    text=[pca_names[i] for i in ref_indices],
-                                    textposition="top center",
-                                    marker=dict(color='lightblue', size=10),
-                                    name='Referans Sesler'
-                                ))
-                            
-                            # Hedef ses
-                            target_idx = pca_names.index('Yüklenen Ses')
-                            fig_pca.add_trace(go.Scatter(
-                                x=[pca_features[target_idx, 0]],
-                                y=[pca_features[target_idx, 1]],
-                                mode='markers+text',
-                                text=['🎯 Analiz Edilen Ses'],
-                                textposition="top center",
-                                marker=dict(color='red', size=15, symbol='star'),
-                                name='Analiz Edilen Ses'
-                            ))
-                            
-                            fig_pca.update_layout(
-                                title=f"PCA Görselleştirmesi<br>Açıklanan Varyans: PC1={variance_ratio[0]:.2%}, PC2={variance_ratio[1]:.2%}",
-                                xaxis_title="1. Ana Bileşen",
-                                yaxis_title="2. Ana Bileşen",
-                                height=500
-                            )
-                            
                             st.plotly_chart(fig_pca, use_container_width=True)
                         else:
                             st.info(f"PCA görselleştirmesi için {predicted_class} sınıfından en az 2 ses gerekli.")
@@ -475,15 +673,40 @@ def main():
         # Model istatistikleri
         if len(st.session_state.processed_files) > 0:
             st.markdown("### 📊 Yüklenen Sesler")
-            class_counts = {}
-            for file_info in st.session_state.processed_files:
-                class_name = file_info['predicted_class']
-                class_counts[class_name] = class_counts.get(class_name, 0) + 1
+            class_counts = memo('results', library_version(view),
+                                lambda: results_views(st.session_state.processed_files))['counts']
             
             for class_name, count in class_counts.items():
                 st.markdown(f"**{class_name}:** {count} ses")
             
             st.markdown(f"**Toplam:** {len(st.session_state.processed_files)} ses")
+        
+        # Aşama profili paneli
+        if profile_stages:
+            st.markdown("### ⏱️ Aşama Profili")
+            summary = profiler.summary()
+            if summary:
+                df_profile = pd.DataFrame(summary).T.astype(float).sort_values('total_ms', ascending=False)
+                st.dataframe(df_profile[['count', 'p50_ms', 'p90_ms', 'max_ms', 'peak_mb']].round(2),
+                             use_container_width=True)
+                stage = st.selectbox("Histogram aşaması", options=list(df_profile.index))
+                counts, edges = profiler.histograms()[stage]
+                fig_hist = go.Figure(go.Bar(
+                    x=[f"{lo:.2g}–{hi:.2g}" for lo, hi in zip(edges[:-1], edges[1:])],
+                    y=counts
+                ))
+                fig_hist.update_layout(xaxis_title="ms", yaxis_title="Dosya", height=250,
+                                       margin=dict(l=0, r=0, t=10, b=0))
+                st.plotly_chart(fig_hist, use_container_width=True)
+                records = profiler.file_records()
+                if records:
+                    slowest = max(records, key=lambda r: r['total_ms'])
+                    st.caption(f"En yavaş dosya: {slowest['file']} ({slowest['total_ms']:.0f} ms)")
+                if st.button("Profili sıfırla"):
+                    profiler.reset()
+                    st.rerun()
+            else:
+                st.caption("Henüz ölçüm yok; bir dosya işleyin.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,175 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+# Oynatma kopyası için sıkıştırma biçimleri: ad -> (soundfile biçimi, alt tür, MIME)
+COMPRESS_FORMATS = {
+    "ogg": ("OGG", "VORBIS", "audio/ogg"),
+}
+
+# Sıkıştırırken bir seferde çözülen çerçeve sayısı (bellek sınırı)
+COMPRESS_BLOCK_FRAMES = 1 << 16
+
+
+def compress_for_playback(data, fmt="ogg"):
+    """Ses baytlarının yalnızca dinlemek için sıkıştırılmış kopyası.
+
+    Blok blok çözülüp kodlanır; çözülemezse ya da kopya daha büyükse None.
+    """
+    import soundfile as sf
+
+    sf_format, subtype, _ = COMPRESS_FORMATS[fmt]
+    out = io.BytesIO()
+    try:
+        with sf.SoundFile(io.BytesIO(data)) as src, \
+                sf.SoundFile(out, "w", samplerate=src.samplerate, channels=src.channels,
+                             format=sf_format, subtype=subtype) as dst:
+            for block in src.blocks(blocksize=COMPRESS_BLOCK_FRAMES, dtype="float32"):
+                dst.write(block)
+    except (RuntimeError, ValueError, TypeError):
+        return None
+    compressed = out.getvalue()
+    return compressed if len(compressed) < len(data) else None
+
+
+class AudioCache:
+    """Dinleme için ses baytlarının bayt bütçeli, diske taşan önbelleği.
+
+    Bellekte en fazla max_memory_bytes tutulur; aşılınca en uzun süredir
+    dinlenmeyen kayıtlar geçici dizine yazılıp bellekten çıkarılır ve
+    get() ile istendiğinde yeniden okunur. Disk katmanı max_disk_bytes'ı
+    aşınca en eskiler tamamen silinir. compress verilirse ("ogg") yalnızca
+    sıkıştırılmış oynatma kopyası saklanır. Geçici dizin nesneyle birlikte
+    silinir.
+    """
+
+    def __init__(self, max_memory_bytes=256 << 20, max_disk_bytes=4 << 30,
+                 spill_dir=None, compress=None):
+        if compress is not None and compress not in COMPRESS_FORMATS:
+            raise ValueError(f"Bilinmeyen sıkıştırma: {compress} "
+                             f"(seçenekler: {', '.join(COMPRESS_FORMATS)})")
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.compress = compress
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.spills = 0
+        self.reloads = 0
+        self._memory = OrderedDict()  # ad -> (bayt, MIME), en eski dinlenen başta
+        self._disk = OrderedDict()    # ad -> (yol, boyut, MIME)
+        self._lock = threading.Lock()
+        self._spill_root = spill_dir
+        self._spill_dir = None
+        self._finalizer = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory) + len(self._disk)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._memory or name in self._disk
+
+    def _dir(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="audio_cache_", dir=self._spill_root)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+        return self._spill_dir
+
+    def put(self, name, data, mime="audio/wav"):
+        """name için ses baytlarını sakla (varsa eskisinin yerine geçer)"""
+        if self.compress is not None:
+            compressed = compress_for_playback(data, self.compress)
+            if compressed is not None:
+                data, mime = compressed, COMPRESS_FORMATS[self.compress][2]
+        with self._lock:
+            self._discard(name)
+            self._memory[name] = (data, mime)
+            self.memory_bytes += len(data)
+            self._spill()
+
+    def get(self, name):
+        """(bayt, MIME) ya da None; okunan kayıt en yeni dinlenen olur"""
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None:
+                self._memory.move_to_end(name)
+                return entry
+            spilled = self._disk.pop(name, None)
+            if spilled is None:
+                return None
+            path, size, mime = spilled
+            self.disk_bytes -= size
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.remove(path)
+            except OSError:
+                return None
+            self.reloads += 1
+            self._memory[name] = (data, mime)
+            self.memory_bytes += len(data)
+            self._spill(keep=name)
+            return data, mime
+
+    def _discard(self, name):
+        entry = self._memory.pop(name, None)
+        if entry is not None:
+            self.memory_bytes -= len(entry[0])
+        spilled = self._disk.pop(name, None)
+        if spilled is not None:
+            self.disk_bytes -= spilled[1]
+            try:
+                os.remove(spilled[0])
+            except OSError:
+                pass
+
+    def _spill(self, keep=None):
+        """Bellek bütçesi aşıldıkça en eski dinlenenleri diske taşı"""
+        while self.memory_bytes > self.max_memory_bytes and self._memory:
+            name = next(iter(self._memory))
+            if name == keep:
+                if len(self._memory) == 1:
+                    break  # tek başına bütçeyi aşan kayıt dinlenirken bellekte kalır
+                self._memory.move_to_end(name)
+                continue
+            data, mime = self._memory.pop(name)
+            self.memory_bytes -= len(data)
+            path = os.path.join(self._dir(), f"{self.spills:08d}.bin")
+            try:
+                with open(path, "wb") as f:
+                    f.write(data)
+            except OSError:
+                continue  # disk yazılamıyorsa kayıt düşer
+            self.spills += 1
+            self._disk[name] = (path, len(data), mime)
+            self.disk_bytes += len(data)
+        while self.disk_bytes > self.max_disk_bytes and self._disk:
+            _, (path, size, _) = self._disk.popitem(last=False)
+            self.disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {"memory_items": len(self._memory), "memory_bytes": self.memory_bytes,
+                    "disk_items": len(self._disk), "disk_bytes": self.disk_bytes,
+                    "spills": self.spills, "reloads": self.reloads}
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._disk.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._memory.clear()
+            self._disk.clear()
+            self.memory_bytes = 0
+            self.disk_bytes = 0
@@ -1,23 +1,64 @@
 import numpy as np
-import pandas as pd
-import tensorflow as tf
 import joblib
 import warnings
-from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
-from sklearn.decomposition import PCA
-import librosa
-from feature_extractor import extract_from_file, extract_features
+from collections import Counter
+from feature_extractor import (extract_from_file, extract_files_parallel, source_name,
+                               FEATURE_NAMES, RES_TYPE)
+from similarity_index import (ClassProjection, SimilarityIndex, duplicate_groups,
+                              DUPLICATE_BLOCK, SCORE_CHUNK)
+from feature_store import ColumnStore, FeatureStore
+from feature_cache import FeatureCache
+from numpy_model import load_numpy_model
+from profiling import profiler
+
+# predict_batch'in tek derlenmiş çağrıda işlediği en fazla satır
+PREDICT_CHUNK_SIZE = 8192
+
+# Çıkarım arka uçları: Keras/TensorFlow ya da TensorFlow'suz NumPy ileri geçişi
+BACKENDS = ("tensorflow", "numpy")
+
+def _audio_source(audio_file):
+    """Yüklenen dosya nesnesini süreçlere gönderilebilir kaynağa çevir"""
+    if hasattr(audio_file, 'getvalue'):
+        return audio_file.getvalue()
+    if hasattr(audio_file, 'read'):
+        return audio_file.read()
+    return str(audio_file)
 
 class AudioClassifier:
     def __init__(self, model_path="my_enhanced_audio_model.h5", 
                  scaler_path="scaler.pkl", 
-                 label_encoder_path="label_encoder.pkl"):
-        """Ses sınıflandırıcı ve benzerlik analizi sınıfı"""
+                 label_encoder_path="label_encoder.pkl",
+                 ann_probes=None, store_path=None, feature_cache=None,
+                 res_type=RES_TYPE, backend="tensorflow", index_quantization=None,
+                 streaming=False, onset_window=None):
+        """Ses sınıflandırıcı ve benzerlik analizi sınıfı.
+
+        ann_probes verilirse büyük sınıflarda benzerlik araması yaklaşık
+        (IVF) yapılır; değer taranacak liste sayısıdır. store_path verilirse
+        referans veritabanı bu dizindeki kalıcı FeatureStore olur.
+        feature_cache verilmezse bellek içi bir FeatureCache kullanılır.
+        res_type varsayılan yeniden örnekleme kalitesidir (RES_TYPES).
+        streaming=True uzun dosyaları yaklaşık akış modunda işler;
+        onset_window (saniye) yalnızca ilk vuruştan sonraki pencereyi
+        (features_from_source).
+        backend="numpy" modeli TensorFlow yüklemeden saf NumPy ile çalıştırır;
+        model_path .h5 ya da NumpyMLP.save ile aktarılmış .npz olabilir.
+        index_quantization ("float32", "float16" ya da "int8") benzerlik indeksindeki
+        vektörleri sıkıştırılmış tutar; en iyi sonuçlar referans
+        veritabanındaki özgün özelliklerle yeniden puanlanır.
+        """
         warnings.filterwarnings("ignore")
         
         # Model ve ön işleme araçlarını yükle
-        from tensorflow import keras
-        self.model = keras.models.load_model(model_path)
+        if backend not in BACKENDS:
+            raise ValueError(f"Bilinmeyen arka uç: {backend} ({', '.join(BACKENDS)})")
+        self.backend = backend
+        if backend == "numpy":
+            self.model = load_numpy_model(model_path)
+            self._infer = self.model
+        else:
+            self._infer = self._load_tensorflow(model_path)
         
         # PKL dosyalarını joblib ile yükle
         with warnings.catch_warnings():
@@ -28,37 +69,73 @@ class AudioClassifier:
         self.classes = self.label_encoder.classes_
         print(f"Model yüklendi. Sınıflar: {self.classes}")
         
-        # Referans ses veritabanı
-        self.reference_database = []
+        # Isınma: ilk gerçek istek izleme maliyetini ödemesin
+        self.predict_batch(np.zeros((1, len(FEATURE_NAMES))))
         
-    def predict_single(self, audio_file):
-        """Tek bir ses dosyasını sınıflandır"""
-        # Özellik çıkar
-        features = extract_from_file(audio_file)
-        if features is None:
-            return None, None, None
-            
-        # DataFrame'e çevir ve sırala
-        feature_names = [f"mfcc{i+1:02d}" for i in range(20)] + [
-            "rms_mean", "rms_std", "zcr_mean", "centroid_mean", 
-            "bandwidth_mean", "rolloff_mean", "flatness_mean", "flux_mean"
-        ] + [f"contrast_b{i+1}" for i in range(7)] + [
-            "onset_mean", "onset_std", "onset_max", "onset_sum",
-            "attack_time", "attack_slope", "hpi_ratio"
-        ]
+        self.res_type = res_type
+        self.streaming = streaming
+        self.onset_window = onset_window
+        
+        # İçerik anahtarlı özellik önbelleği
+        self.feature_cache = feature_cache if feature_cache is not None else FeatureCache()
         
-        feature_vector = np.array([features[name] for name in feature_names]).reshape(1, -1)
+        # Referans ses veritabanı (kalıcı depo ya da bellek içi sütunlu depo)
+        self.store = FeatureStore(store_path, classes=self.classes) if store_path else None
+        self.reference_database = (self.store if self.store is not None
+                                   else ColumnStore(classes=self.classes, dim=len(FEATURE_NAMES)))
+        self.ann_probes = ann_probes
+        self.index_quantization = index_quantization
+        
+    def _load_tensorflow(self, model_path):
+        """Keras modelini yükle ve NumPy giriş/çıkışlı derlenmiş çağrı döndür"""
+        import tensorflow as tf
+        from tensorflow import keras
+        self.model = keras.models.load_model(model_path)
+        
+        # Sabit giriş imzalı derlenmiş çağrı; yeniden izleme (retracing) olmaz
+        infer = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec([None, len(FEATURE_NAMES)], tf.float32)]
+        )
+        return lambda x: infer(tf.constant(x, dtype=tf.float32)).numpy()
+    
+    def predict_single(self, audio_file, res_type=None):
+        """Tek bir ses dosyasını (yol, bayt ya da dosya benzeri) sınıflandır"""
+        with profiler.file(source_name(audio_file)):
+            # Özellik çıkar
+            features = extract_from_file(audio_file, cache=self.feature_cache,
+                                         res_type=res_type or self.res_type,
+                                         streaming=self.streaming, onset_window=self.onset_window)
+            if features is None:
+                return None, None, None
+                
+            # Model sırasına göre vektöre çevir
+            feature_vector = np.array([features[name] for name in FEATURE_NAMES]).reshape(1, -1)
+            
+            predicted_classes, confidences, features_scaled = self.predict_batch(feature_vector)
+        return predicted_classes[0], confidences[0], features_scaled[0]
+    
+    def predict_batch(self, feature_matrix):
+        """(n, 42) özellik matrisini tek çağrıda normalize edip sınıflandır.
+
+        (tahmin edilen sınıflar, güven skorları, normalize özellikler) döndürür.
+        """
+        feature_matrix = np.asarray(feature_matrix, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
         
         # Normalize et
-        feature_vector_scaled = self.scaler.transform(feature_vector)
+        with profiler.stage("scale"):
+            features_scaled = self.scaler.transform(feature_matrix)
         
-        # Tahmin yap
-        prediction = self.model.predict(feature_vector_scaled)
-        predicted_class_idx = np.argmax(prediction[0])
-        predicted_class = self.classes[predicted_class_idx]
-        confidence = prediction[0][predicted_class_idx]
+        # Tahmin yap (büyük girişler bellek için parçalara bölünür)
+        with profiler.stage("predict"):
+            prediction = np.concatenate([
+                self._infer(features_scaled[start:start + PREDICT_CHUNK_SIZE])
+                for start in range(0, max(len(features_scaled), 1), PREDICT_CHUNK_SIZE)
+            ])[:len(features_scaled)]
+        predicted_idx = np.argmax(prediction, axis=1)
+        confidences = prediction[np.arange(len(prediction)), predicted_idx]
         
-        return predicted_class, confidence, feature_vector_scaled[0]
+        return self.classes[predicted_idx], confidences, features_scaled
     
     def add_to_database(self, audio_file, predicted_class, features):
         """Sesi referans veritabanına ekle"""
@@ -68,34 +145,59 @@ class AudioClassifier:
             'features': features
         })
     
+    def _similarity_index(self):
+        """reference_database ile eşzamanlı tutulan benzerlik indeksini döndür"""
+        db = self.reference_database
+        index = getattr(self, '_index', None)
+        # Liste değiştirildiyse ya da kısaldıysa yeniden kur, büyüdüyse sadece ekle
+        if index is None or self._index_source is not db or index.size > len(db):
+            index = self._index = SimilarityIndex(len(FEATURE_NAMES), n_probe=self.ann_probes,
+                                                  quantization=self.index_quantization)
+            self._index_source = db
+            self._index_generation = getattr(self, '_index_generation', 0) + 1
+        if index.size < len(db):
+            if hasattr(db, 'coded_columns'):
+                # Sütunlu depo: satır sözlüğü oluşturmadan, bellek eşlemli
+                # sütunlardan parça parça (tam float64 kopyası kurulmaz)
+                for start in range(index.size, len(db), SCORE_CHUNK):
+                    index.add_coded(*db.coded_columns(start, start + SCORE_CHUNK))
+            else:
+                new_refs = db[index.size:]
+                index.add([ref['features'] for ref in new_refs],
+                          [ref['class'] for ref in new_refs])
+        return index
+    
+    def _filenames(self, rows):
+        db = self.reference_database
+        if hasattr(db, 'filenames'):
+            names = db.filenames
+            return [names[row] for row in rows]
+        return [db[row]['filename'] for row in rows]
+    
     def find_similar_sounds(self, target_features, target_class, top_k=5):
         """Benzer sesleri bul"""
         if len(self.reference_database) == 0:
             return []
-            
+        
+        # Cosine similarity'ye göre ilk top_k (yüksekten düşüğe)
+        with profiler.stage("similarity"):
+            rows, cos_sims, euc_dists = self._similarity_index().query(
+                target_features, target_class, top_k,
+                exact=getattr(self.reference_database, 'features', None)
+            )
+        
         similarities = []
+        for row, cos_sim, euc_dist in zip(rows, cos_sims, euc_dists):
+            ref = self.reference_database[row]
+            similarities.append({
+                'filename': ref['filename'],
+                'class': ref['class'],
+                'cosine_similarity': cos_sim,
+                'euclidean_distance': euc_dist,
+                'features': ref['features']
+            })
         
-        for ref in self.reference_database:
-            # Aynı sınıftan olanları öncelendir
-            if ref['class'] == target_class:
-                # Cosine similarity hesapla
-                cos_sim = cosine_similarity([target_features], [ref['features']])[0][0]
-                
-                # Euclidean distance hesapla  
-                euc_dist = euclidean_distances([target_features], [ref['features']])[0][0]
-                
-                similarities.append({
-                    'filename': ref['filename'],
-                    'class': ref['class'],
-                    'cosine_similarity': cos_sim,
-                    'euclidean_distance': euc_dist,
-                    'features': ref['features']
-                })
-        
-        # Cosine similarity'ye göre sırala (yüksekten düşüğe)
-        similarities = sorted(similarities, key=lambda x: x['cosine_similarity'], reverse=True)
-        
-        return similarities[:top_k]
+        return similarities
     
     def get_pca_visualization_data(self, target_features, target_class):
         """PCA ile 2D görselleştirme verisi hazırla"""
@@ -103,45 +205,106 @@ class AudioClassifier:
             return None, None, None, None
             
         # Aynı sınıftan sesleri al
-        same_class_features = []
-        same_class_names = []
-        
-        for ref in self.reference_database:
-            if ref['class'] == target_class:
-                same_class_features.append(ref['features'])
-                same_class_names.append(ref['filename'])
+        index = self._similarity_index()
+        same_class_features, rows = index.class_features(target_class)
         
         if len(same_class_features) < 2:
             return None, None, None, None
             
-        # Target ses ile birleştir
-        all_features = same_class_features + [target_features]
-        all_names = same_class_names + ['Yüklenen Ses']
+        # Sınıf projeksiyonu kütüphane değişmedikçe yeniden eğitilmez. İndeks
+        # yeniden kurulsa da (ör. büyümüş bir liste kopyası atandığında)
+        # korunur; önceki satırlar değiştiyse update baştan eğitir
+        projections = getattr(self, '_projections', None)
+        if projections is None:
+            projections = self._projections = {}
+        projection = projections.setdefault(target_class, ClassProjection())
+        with profiler.stage("pca"):
+            projection.update(same_class_features, (self._index_generation, index.version))
+        pca = projection.pca
         
-        # PCA uygula
-        pca = PCA(n_components=2)
-        pca_features = pca.fit_transform(all_features)
+        # Hedef ses yalnızca 42x2'lik bir çarpımla yansıtılır
+        pca_features = np.vstack([projection.coords, projection.project(target_features)])
+        all_names = self._filenames(rows) + ['Yüklenen Ses']
         
         return pca_features, all_names, pca.explained_variance_ratio_, pca
     
-    def classify_multiple_files(self, audio_files):
-        """Birden fazla ses dosyasını sınıflandır"""
+    def find_duplicates(self, threshold=0.99, block_size=DUPLICATE_BLOCK):
+        """Her sınıf içinde yinelenen ya da neredeyse aynı ses kümelerini bul.
+
+        Sınıf içi tüm çiftlerin kosinüs benzerliği block_size'lık karolar
+        halinde matris çarpımıyla hesaplanır; benzerliği threshold'a ulaşan
+        çiftler kümelere birleştirilir. Büyükten küçüğe sıralı
+        {'class', 'files', 'min_similarity', 'max_similarity'} listesi
+        döndürür; files kütüphaneye eklenme sırasındadır.
+        """
+        if len(self.reference_database) < 2:
+            return []
+        index = self._similarity_index()
+        clusters = []
+        with profiler.stage("duplicates"):
+            for class_name in index.blocks:
+                unit, rows = index.class_unit(class_name)
+                for members, lowest, highest in duplicate_groups(unit, threshold, block_size):
+                    clusters.append({
+                        'class': class_name,
+                        'files': self._filenames(rows[members]),
+                        'min_similarity': lowest,
+                        'max_similarity': highest
+                    })
+        clusters.sort(key=lambda c: -len(c['files']))
+        return clusters
+    
+    def classify_multiple_files(self, audio_files, n_workers=None,
+                                progress_callback=None, errors=None, res_type=None,
+                                database=None, streaming=None, onset_window=None):
+        """Birden fazla ses dosyasını sınıflandır.
+
+        Özellikler süreç havuzunda çıkarılır, model tek seferde çağrılır.
+        Sonuçlar gönderim sırasındadır; errors listesi verilirse başarısız
+        dosyalar {'filename', 'error'} olarak eklenir. Sonuçlar database'e
+        (verilmezse reference_database'e) eklenir. streaming verilmezse
+        sınıflandırıcının streaming ve onset_window ayarları kullanılır.
+        """
+        if streaming is None:
+            streaming, onset_window = self.streaming, self.onset_window
+        names = [f.name if hasattr(f, 'name') else str(f) for f in audio_files]
+        sources = [_audio_source(f) for f in audio_files]
+        extracted = extract_files_parallel(sources, n_workers=n_workers,
+                                           progress_callback=progress_callback,
+                                           names=names, cache=self.feature_cache,
+                                           res_type=res_type or self.res_type,
+                                           streaming=streaming, onset_window=onset_window)
+        
+        ok = [i for i, (vector, _) in enumerate(extracted) if vector is not None]
+        if errors is not None:
+            errors.extend({'filename': names[i], 'error': err}
+                          for i, (_, err) in enumerate(extracted) if err is not None)
+        if not ok:
+            return []
+        
+        # Tek toplu model çağrısı
+        feature_matrix = np.stack([extracted[i][0] for i in ok])
+        predicted_classes, confidences, features_scaled = self.predict_batch(feature_matrix)
+        
         results = []
+        for row, i in enumerate(ok):
+            predicted_class = predicted_classes[row]
+            confidence = confidences[row]
+            features = features_scaled[row]
+            
+            results.append({
+                'filename': names[i],
+                'predicted_class': predicted_class,
+                'confidence': confidence,
+                'features': features
+            })
         
-        for audio_file in audio_files:
-            result = self.predict_single(audio_file)
-            if result[0] is not None:
-                predicted_class, confidence, features = result
-                
-                # Veritabanına ekle
-                self.add_to_database(audio_file, predicted_class, features)
-                
-                results.append({
-                    'filename': audio_file.name if hasattr(audio_file, 'name') else str(audio_file),
-                    'predicted_class': predicted_class,
-                    'confidence': confidence,
-                    'features': features
-                })
+        # Veritabanına tek seferde ekle (kalıcı depoda tek meta yazımı)
+        database = self.reference_database if database is None else database
+        database.extend(
+            {'filename': r['filename'], 'class': r['predicted_class'], 'features': r['features']}
+            for r in results
+        )
         
         return results
     
@@ -150,6 +313,11 @@ class AudioClassifier:
         if not self.reference_database:
             return {}
             
-        df = pd.DataFrame(self.reference_database)
-        summary = df['class'].value_counts().to_dict()
-        return summary 
\ No newline at end of file
+        db = self.reference_database
+        if hasattr(db, 'class_counts'):
+            # Sütunlu depolar sınıf sayımlarını eklerken tutar
+            counts = Counter(db.class_counts())
+        else:
+            counts = Counter(ref['class'] for ref in db)
+        # value_counts ile aynı sıra: en kalabalık sınıf önce
+        return dict(counts.most_common()) 
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""IVF yaklaşık aramasının kesin aramaya karşı recall@k ve gecikme ölçümü.
+
+Kullanım:
+    python benchmarks/ann_recall.py --rows 1000000 --probes 1 4 8 16 32
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity_index import SimilarityIndex  # noqa: E402
+
+DIM = 42
+
+
+def synthetic_features(n_rows, n_clusters, rng):
+    """Ölçeklenmiş 42 özelliğe benzeyen kümeli (Gauss karışımı) veri"""
+    centers = rng.standard_normal((n_clusters, DIM))
+    spread = rng.uniform(0.2, 0.8, size=n_clusters)
+    labels = rng.integers(n_clusters, size=n_rows)
+    return centers[labels] + spread[labels, None] * rng.standard_normal((n_rows, DIM))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    features = synthetic_features(args.rows, args.clusters, rng)
+    queries = synthetic_features(args.queries, args.clusters, rng)
+
+    # Tek sınıf: sınıf başına indeksin en kötü durumu
+    index = SimilarityIndex(DIM, min_ann_rows=0, seed=args.seed)
+    index.add(features, np.zeros(args.rows, dtype=int))
+
+    start = time.perf_counter()
+    exact = [set(index.query(q, 0, args.top_k)[0]) for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+
+    start = time.perf_counter()
+    index.query(queries[0], 0, args.top_k, n_probe=1)
+    build_s = time.perf_counter() - start
+
+    results = {"rows": args.rows, "top_k": args.top_k, "exact_ms": exact_ms,
+               "build_s": build_s, "ann": []}
+    print(f"{args.rows} satır, k={args.top_k}: kesin {exact_ms:.2f} ms/sorgu, "
+          f"IVF eğitimi {build_s:.1f} s")
+    print(f"{'n_probe':>8} {'recall@k':>9} {'ms/sorgu':>9}")
+    for n_probe in args.probes:
+        start = time.perf_counter()
+        found = [index.query(q, 0, args.top_k, n_probe=n_probe)[0] for q in queries]
+        ms = (time.perf_counter() - start) * 1000 / args.queries
+        recall = np.mean([len(truth.intersection(rows)) / len(truth)
+                          for truth, rows in zip(exact, found)])
+        results["ann"].append({"n_probe": n_probe, "recall": float(recall), "ms": ms})
+        print(f"{n_probe:>8} {recall:>9.3f} {ms:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Soğuk başlangıç ölçümü: modül içe aktarma maliyeti ve ilk tahmine kadar geçen süre.
+
+Her ölçüm yeni bir Python sürecinde yapılır (sys.modules önbelleği yok).
+
+Kullanım:
+    python benchmarks/cold_start.py --backends tensorflow numpy --budget 3.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["feature_extractor", "feature_cache", "feature_store", "similarity_index",
+           "numpy_model", "audio_classifier"]
+
+FIRST_PREDICTION = """
+import io, json, resource, sys, time
+import numpy as np, soundfile as sf
+rng = np.random.default_rng(0)
+t = np.arange(22050) / 22050
+signal = np.exp(-t * 20) * (np.sin(2 * np.pi * 60 * t) + 0.3 * rng.standard_normal(len(t)))
+buf = io.BytesIO()
+sf.write(buf, signal.astype(np.float32), 22050, format="WAV")
+data = buf.getvalue()
+
+start = time.perf_counter()
+from audio_classifier import AudioClassifier
+imported = time.perf_counter()
+classifier = AudioClassifier(backend=sys.argv[1])
+loaded = time.perf_counter()
+classifier.predict_single(data)
+done = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "load_s": loaded - imported,
+                  "predict_s": done - loaded, "total_s": done - start,
+                  "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _run(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def import_cost(module):
+    """-X importtime çıktısından modülün toplam (kümülatif) içe aktarma süresi, s"""
+    stderr = _run(["-X", "importtime", "-c", f"import {module}"]).stderr
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return float("nan")
+
+
+def first_prediction(backend):
+    stdout = _run(["-c", FIRST_PREDICTION, backend]).stdout
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--backends", nargs="+", default=["tensorflow", "numpy"])
+    parser.add_argument("--repeat", type=int, default=3, help="En iyi süre için tekrar sayısı")
+    parser.add_argument("--budget", type=float,
+                        help="İlk tahmin süresi (s) bunu aşan arka uç varsa çıkış kodu 1")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    results = {"imports": {}, "first_prediction": {}}
+    print(f"{'modül':<20} {'içe aktarma (s)':>16}")
+    for module in args.modules:
+        cost = min(import_cost(module) for _ in range(args.repeat))
+        results["imports"][module] = cost
+        print(f"{module:<20} {cost:>16.3f}")
+
+    print(f"\n{'arka uç':<12} {'import':>8} {'yükleme':>8} {'tahmin':>8} {'toplam':>8} {'RSS MB':>8}")
+    for backend in args.backends:
+        runs = [first_prediction(backend) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["total_s"])
+        results["first_prediction"][backend] = best
+        print(f"{backend:<12} {best['import_s']:>8.2f} {best['load_s']:>8.2f} "
+              f"{best['predict_s']:>8.2f} {best['total_s']:>8.2f} {best['max_rss_mb']:>8.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget is not None:
+        over = [b for b, r in results["first_prediction"].items() if r["total_s"] > args.budget]
+        if over:
+            print(f"Bütçe ({args.budget:.2f} s) aşıldı: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
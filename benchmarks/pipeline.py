@@ -0,0 +1,243 @@
+"""Özellik çıkarma, çıkarım ve benzerlik araması için tekrarlanabilir ölçüm takımı.
+
+Üç bölüm:
+    extraction   sentetik davul vuruşlarında aşama başına süre (SpectralEngine)
+    inference    predict_single ile toplu predict_batch karşılaştırması
+    similarity   find_similar_sounds / get_pca_visualization_data, veritabanı
+                 100 satırdan 1M satıra büyürken
+
+Kullanım:
+    python benchmarks/pipeline.py --json sonuc.json
+    python benchmarks/pipeline.py --parts similarity --db-sizes 100 10000 --compare onceki.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import drum_kit, to_wav_bytes  # noqa: E402
+import feature_extractor  # noqa: E402
+from feature_extractor import SpectralEngine, FEATURE_NAMES  # noqa: E402
+
+# SpectralEngine önbellekli özellikleri bağımlılık sırasıyla; her biri bir aşama
+STAGES = ("stft", "magnitude", "power", "mel_basis", "mel", "mfcc", "rms", "zcr",
+          "centroid", "bandwidth", "rolloff", "flatness", "contrast", "flux",
+          "onset_env", "hpi_ratio")
+PARTS = ("extraction", "inference", "similarity")
+DB_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def _summary(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {"median_ms": float(np.median(values)), "p90_ms": float(np.percentile(values, 90))}
+
+
+def bench_extraction(hits):
+    """Aşama başına süre; her vuruş yeni bir motorla sıfırdan hesaplanır"""
+    stage_ms = {name: [] for name in ("decode",) + STAGES + ("assemble", "total")}
+    # Isınma: librosa'nın tembel içe aktarmaları ölçüme girmesin
+    feature_extractor.extract_features(hits[0][1])
+    for _, signal in hits:
+        data = to_wav_bytes(signal)
+        start = time.perf_counter()
+        y = feature_extractor.load_signal(data)
+        stage_ms["decode"].append(_ms(start))
+
+        total = time.perf_counter()
+        engine = SpectralEngine(y)
+        for name in STAGES:
+            start = time.perf_counter()
+            getattr(engine, name)
+            stage_ms[name].append(_ms(start))
+        start = time.perf_counter()
+        engine.features()
+        stage_ms["assemble"].append(_ms(start))
+        stage_ms["total"].append(_ms(total))
+
+    signals = [signal for _, signal in hits]
+    start = time.perf_counter()
+    feature_extractor.extract_features_batch(signals)
+    batch_ms = _ms(start) / len(signals)
+    return {"n_hits": len(hits), "stages": {k: _summary(v) for k, v in stage_ms.items()},
+            "batch_ms_per_signal": batch_ms}
+
+
+def bench_inference(classifier, hits, n_rows):
+    """predict_single (uçtan uca ve yalnız model) ile tek toplu çağrının karşılaştırması"""
+    single_ms = []
+    classifier.predict_single(to_wav_bytes(hits[0][1]))
+    for _, signal in hits:
+        data = to_wav_bytes(signal)
+        classifier.feature_cache.clear()
+        start = time.perf_counter()
+        classifier.predict_single(data)
+        single_ms.append(_ms(start))
+
+    matrix = np.random.default_rng(0).standard_normal((n_rows, len(FEATURE_NAMES)))
+    start = time.perf_counter()
+    for row in matrix:
+        classifier.predict_batch(row[None])
+    per_row_ms = _ms(start) / n_rows
+    start = time.perf_counter()
+    classifier.predict_batch(matrix)
+    batch_ms = _ms(start) / n_rows
+    return {"predict_single": _summary(single_ms), "rows": n_rows,
+            "model_per_row_call_ms": per_row_ms, "model_batched_ms_per_row": batch_ms,
+            "batch_speedup": per_row_ms / batch_ms}
+
+
+def bench_similarity(classifier, db_sizes, n_queries, seed):
+    """Veritabanı büyürken arama ve PCA gecikmesi (kalıcı depo, geçici dizinde)"""
+    from feature_store import FeatureStore
+
+    rng = np.random.default_rng(seed)
+    classes = list(classifier.classes)
+    queries = rng.standard_normal((n_queries, len(FEATURE_NAMES)))
+    query_classes = [classes[i % len(classes)] for i in range(n_queries)]
+    results = []
+    with tempfile.TemporaryDirectory() as path:
+        store = FeatureStore(os.path.join(path, "store"), classes=classes)
+        classifier.reference_database = store
+        for size in sorted(db_sizes):
+            n_new = size - len(store)
+            if n_new > 0:
+                store.append_rows(rng.standard_normal((n_new, len(FEATURE_NAMES))),
+                                  [classes[i] for i in rng.integers(len(classes), size=n_new)],
+                                  [f"ref_{len(store) + i}.wav" for i in range(n_new)])
+
+            # İlk çağrılar (sınıf başına bir) indeks eşitlemesini ve PCA eğitimini içerir
+            start = time.perf_counter()
+            for c in classes:
+                classifier.find_similar_sounds(queries[0], c)
+            first_find = _ms(start)
+            start = time.perf_counter()
+            for q, c in zip(queries, query_classes):
+                classifier.find_similar_sounds(q, c)
+            find_ms = _ms(start) / n_queries
+
+            start = time.perf_counter()
+            for c in classes:
+                classifier.get_pca_visualization_data(queries[0], c)
+            first_pca = _ms(start)
+            start = time.perf_counter()
+            for q, c in zip(queries, query_classes):
+                classifier.get_pca_visualization_data(q, c)
+            pca_ms = _ms(start) / n_queries
+
+            row = {"rows": size, "find_first_ms": first_find, "find_ms": find_ms,
+                   "pca_first_ms": first_pca, "pca_ms": pca_ms}
+            results.append(row)
+            print(f"{size:>9} {first_find:>10.1f} {find_ms:>9.2f} {first_pca:>10.1f} {pca_ms:>9.2f}")
+        classifier.reference_database = []
+    return results
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            out.update(_flatten(item, f"{prefix}{key}."))
+        return out
+    if isinstance(value, list):
+        out = {}
+        for item in value:
+            if isinstance(item, dict) and "rows" in item:
+                out.update(_flatten(item, f"{prefix}{item['rows']}."))
+        return out
+    # Yalnızca süreler (anahtarında "ms" geçenler) karşılaştırılır
+    if isinstance(value, (int, float)) and "ms" in prefix.rsplit(".", 2)[-2]:
+        return {prefix[:-1]: float(value)}
+    return {}
+
+
+def compare(results, baseline_path, threshold):
+    """Temel sonuçlara göre threshold'dan fazla değişen süreleri yazdır"""
+    with open(baseline_path) as f:
+        raw = json.load(f)
+    baseline, current = _flatten(raw), _flatten(results)
+    print(f"\nKarşılaştırma: {baseline_path} ({raw.get('commit')} -> {results['commit']})")
+    for key in sorted(set(baseline) & set(current)):
+        old, new = baseline[key], current[key]
+        if old > 0 and abs(new / old - 1) >= threshold:
+            print(f"  {key:<50} {old:>10.3f} -> {new:>10.3f} ms ({new / old - 1:+.0%})")
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parts", nargs="+", choices=PARTS, default=list(PARTS))
+    parser.add_argument("--hits", type=int, default=40, help="Sentetik vuruş sayısı")
+    parser.add_argument("--rows", type=int, default=1000, help="Toplu çıkarım satır sayısı")
+    parser.add_argument("--db-sizes", type=int, nargs="+", default=list(DB_SIZES))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--backend", default="numpy", choices=("tensorflow", "numpy"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    parser.add_argument("--compare", help="Önceki bir --json çıktısıyla karşılaştır")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Karşılaştırmada gösterilecek en küçük göreli değişim")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    hits = drum_kit(args.hits, seed=args.seed)
+    results = {"commit": _commit(), "python": platform.python_version(),
+               "numpy": np.__version__, "machine": platform.machine(),
+               "cpu_count": os.cpu_count(), "args": vars(args)}
+
+    if "extraction" in args.parts:
+        results["extraction"] = bench_extraction(hits)
+        print(f"{'aşama':<12} {'medyan ms':>10} {'p90 ms':>9}")
+        for name, stats in results["extraction"]["stages"].items():
+            print(f"{name:<12} {stats['median_ms']:>10.2f} {stats['p90_ms']:>9.2f}")
+        print(f"toplu çıkarma: {results['extraction']['batch_ms_per_signal']:.2f} ms/sinyal\n")
+
+    classifier = None
+    if "inference" in args.parts or "similarity" in args.parts:
+        from audio_classifier import AudioClassifier
+        classifier = AudioClassifier(model_path=os.path.join(ROOT, "my_enhanced_audio_model.h5"),
+                                     scaler_path=os.path.join(ROOT, "scaler.pkl"),
+                                     label_encoder_path=os.path.join(ROOT, "label_encoder.pkl"),
+                                     backend=args.backend)
+
+    if "inference" in args.parts:
+        inference = results["inference"] = bench_inference(classifier, hits, args.rows)
+        print(f"predict_single: {inference['predict_single']['median_ms']:.1f} ms (medyan)")
+        print(f"model: satır başına çağrı {inference['model_per_row_call_ms']:.3f} ms, "
+              f"toplu {inference['model_batched_ms_per_row']:.4f} ms/satır "
+              f"({inference['batch_speedup']:.0f}x)\n")
+
+    if "similarity" in args.parts:
+        print(f"{'satır':>9} {'ilk arama':>10} {'arama ms':>9} {'ilk PCA':>10} {'PCA ms':>9}")
+        results["similarity"] = bench_similarity(classifier, args.db_sizes,
+                                                 args.queries, args.seed)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        compare(results, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Sıkıştırılmış benzerlik indeksinin kesin find_similar_sounds sonucuna karşı top-k örtüşmesi.
+
+Kullanım:
+    python benchmarks/quantization.py --rows 200000 --classes 7
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_recall import DIM, synthetic_features  # noqa: E402
+from similarity_index import SimilarityIndex  # noqa: E402
+
+
+def index_bytes(index):
+    """İndeksin sınıf tamponlarında dolu satırların kapladığı bayt"""
+    return sum(getattr(block, name)[:block.size].nbytes
+               for block in index.blocks.values() for name in block._buffers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--classes", type=int, default=7)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Sonuçları bu dosyaya JSON olarak yaz")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Referanslar depoda olduğu gibi float32
+    features = synthetic_features(args.rows, args.clusters, rng).astype(np.float32)
+    codes = rng.integers(args.classes, size=args.rows)
+    class_names = [f"class{i}" for i in range(args.classes)]
+    queries = synthetic_features(args.queries, args.clusters, rng)
+    query_classes = [class_names[c] for c in rng.integers(args.classes, size=args.queries)]
+
+    def run(index, exact=None):
+        start = time.perf_counter()
+        found = [index.query(q, c, args.top_k, exact=exact)[0]
+                 for q, c in zip(queries, query_classes)]
+        return found, (time.perf_counter() - start) * 1000 / args.queries
+
+    results = {"rows": args.rows, "top_k": args.top_k, "modes": []}
+    truth = None
+    print(f"{args.rows} satır, {args.classes} sınıf, k={args.top_k}")
+    print(f"{'biçim':>8} {'kesin':>6} {'B/satır':>8} {'örtüşme':>8} {'aynı sıra':>9} {'ms/sorgu':>9}")
+    for quantization in (None, "float32", "float16", "int8"):
+        index = SimilarityIndex(DIM, quantization=quantization)
+        index.add_coded(features, codes, class_names)
+        for exact in ((None,) if quantization is None else (None, features)):
+            found, ms = run(index, exact)
+            if truth is None:
+                truth = found
+            overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(truth, found)])
+            same = np.mean([a == b for a, b in zip(truth, found)])
+            row = {"quantization": quantization, "rerank": exact is not None,
+                   "bytes_per_row": index_bytes(index) / args.rows,
+                   "overlap": float(overlap), "identical": float(same), "ms": ms}
+            results["modes"].append(row)
+            print(f"{str(quantization):>8} {'evet' if row['rerank'] else 'hayır':>6} "
+                  f"{row['bytes_per_row']:>8.1f} {overlap:>8.4f} {same:>9.3f} {ms:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Ölçümler için belirlenimci, davul benzeri tek vuruşluk sentetik sesler.
+
+Aynı (tür, süre, tohum) her zaman aynı sinyali üretir.
+"""
+import io
+
+import numpy as np
+import soundfile as sf
+
+SR = 22_050
+KINDS = ("kick", "snare", "hat", "clap")
+
+
+def _decay(n, seconds, sr):
+    """Üstel sönüm zarfı; seconds içinde ~-60 dB"""
+    return np.exp(-6.9 * np.arange(n) / (seconds * sr))
+
+
+def drum_hit(kind, seconds=0.5, seed=0, sr=SR):
+    """kind türünde seconds uzunluğunda float32 tek vuruş"""
+    rng = np.random.default_rng([seed, KINDS.index(kind)])
+    n = max(1, int(seconds * sr))
+    t = np.arange(n) / sr
+    noise = rng.standard_normal(n)
+    if kind == "kick":
+        # 150 Hz'den 45 Hz'e inen sinüs + kısa tık
+        freq = 45 + 105 * np.exp(-t * 30)
+        y = np.sin(2 * np.pi * np.cumsum(freq) / sr) * _decay(n, min(seconds, 0.4), sr)
+        y += 0.3 * noise * _decay(n, 0.01, sr)
+    elif kind == "snare":
+        # 190 Hz gövde + gürültülü tel
+        body = np.sin(2 * np.pi * 190 * t) * _decay(n, 0.12, sr)
+        y = 0.6 * body + 0.5 * noise * _decay(n, min(seconds, 0.25), sr)
+    elif kind == "hat":
+        # Birinci fark ile yüksek geçiren filtrelenmiş kısa gürültü
+        y = np.diff(noise, prepend=0.0) * _decay(n, min(seconds, 0.08), sr)
+    else:
+        # Birkaç ms arayla üç gürültü patlaması ve kuyruk
+        y = np.zeros(n)
+        for k, offset in enumerate((0.0, 0.011, 0.023)):
+            start = min(n - 1, int(offset * sr))
+            y[start:] += (0.8 - 0.2 * k) * noise[:n - start] * _decay(n - start, 0.02, sr)
+        y += 0.2 * noise * _decay(n, min(seconds, 0.3), sr)
+    y = y / (np.abs(y).max() + 1e-12) * 0.9
+    return y.astype(np.float32)
+
+
+def drum_kit(n_hits, lengths=(0.1, 0.25, 0.5, 1.0, 2.0), seed=0):
+    """n_hits adet (ad, sinyal): türler ve uzunluklar sırayla dolaşılır"""
+    hits = []
+    for i in range(n_hits):
+        kind = KINDS[i % len(KINDS)]
+        seconds = lengths[(i // len(KINDS)) % len(lengths)]
+        hits.append((f"{kind}_{seconds:g}s_{i:04d}.wav", drum_hit(kind, seconds, seed + i)))
+    return hits
+
+
+def to_wav_bytes(signal, sr=SR):
+    """Sinyali bellek içi WAV baytlarına çevir"""
+    buf = io.BytesIO()
+    sf.write(buf, signal, sr, format="WAV", subtype="FLOAT")
+    return buf.getvalue()
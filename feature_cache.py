@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import feature_extractor
+
+# Çıkarıcı kodu değişip sonuçlar değiştiğinde artırılır; eski kayıtlar geçersizleşir
+FEATURE_VERSION = 1
+
+# Disk katmanı bu kadar yazmada bir boyut sınırına göre budanır
+PRUNE_EVERY = 256
+
+
+def extractor_fingerprint():
+    """Özellik sonucunu etkileyen çıkarıcı ayarlarının kararlı özeti"""
+    config = {
+        "version": FEATURE_VERSION,
+        "SR": feature_extractor.SR,
+        "N_FFT": feature_extractor.N_FFT,
+        "HOP_LENGTH": feature_extractor.HOP_LENGTH,
+        "N_MEL": feature_extractor.N_MEL,
+        "N_MFCC": feature_extractor.N_MFCC,
+        "ROLL_PERCENT": feature_extractor.ROLL_PERCENT,
+        "STREAM_THRESHOLD_SECONDS": feature_extractor.STREAM_THRESHOLD_SECONDS,
+    }
+    return json.dumps(config, sort_keys=True).encode()
+
+
+class FeatureCache:
+    """Ses baytları + çıkarıcı ayarlarıyla anahtarlanan özellik önbelleği.
+
+    Bellekte max_items kayıtlık LRU tutar. cache_dir verilirse kayıtlar
+    .npy olarak diske de yazılır; disk katmanı max_disk_bytes'ı aşınca
+    en eski kullanılan dosyalar silinir.
+    """
+
+    def __init__(self, max_items=4096, cache_dir=None, max_disk_bytes=1 << 30):
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._fingerprint = extractor_fingerprint()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, data, res_type=feature_extractor.RES_TYPE, streaming=False, onset_window=None):
+        """Ses baytlarının, çıkarıcı ayarlarının, yeniden örnekleyicinin ve akış modunun içerik anahtarı"""
+        h = hashlib.blake2b(self._fingerprint, digest_size=20)
+        h.update(res_type.encode())
+        if streaming:
+            # Akış modu yaklaşık sonuç verir; tam yolun kayıtlarıyla karışmaz
+            h.update(f"|streaming:{onset_window}".encode())
+        h.update(data)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npy")
+
+    def get(self, key):
+        with self._lock:
+            vector = self._items.get(key)
+            if vector is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return vector
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                vector = np.load(path)
+                os.utime(path)
+            except (OSError, ValueError):
+                vector = None
+            if vector is not None:
+                self._remember(key, vector)
+                with self._lock:
+                    self.hits += 1
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._items[key] = vector
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def put(self, key, vector):
+        vector = np.asarray(vector, dtype=np.float64)
+        self._remember(key, vector)
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, vector)
+        os.replace(tmp, path)
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """Disk katmanını max_disk_bytes altına indir (en eski erişilen önce)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".npy"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
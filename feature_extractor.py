@@ -1,7 +1,19 @@
 import numpy as np
 import librosa
-from scipy.stats import skew, kurtosis
+import soundfile as sf
 import warnings
+import io
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property, wraps
+
+from profiling import profiler
+
+logger = logging.getLogger(__name__)
 
 # Genel ayarlar
 SR = 22_050
@@ -12,6 +24,36 @@ N_MFCC = 20
 ROLL_PERCENT = 0.85
 EPS = 1e-10
 
+# HPSS, librosa.effects.hpss varsayılan çerçevesiyle eğitildi
+HPSS_N_FFT = 2048
+HPSS_HOP_LENGTH = HPSS_N_FFT // 4
+HPSS_KERNEL = 31
+
+# Hızlı medyanda bir seferde kopyalanan pencere elemanı sayısı (bellek sınırı)
+MEDIAN_BLOCK = 1 << 22
+
+# Yeniden örnekleme kalitesi: librosa res_type değerleri. Model soxr_hq ile
+# eğitildi; diğerlerinin özellik kayması README'de belgelenmiştir.
+RES_TYPE = "soxr_hq"
+RES_TYPES = ("soxr_hq", "soxr_mq", "soxr_lq", "polyphase")
+
+# streaming=True verilirse bu süreden uzun dosyalar akış modunda
+# (streaming_extractor) yaklaşık olarak işlenir
+STREAM_THRESHOLD_SECONDS = 30.0
+
+# Toplu çıkarmada sinyaller bu kadar örneğin katlarına doldurulup gruplanır
+BATCH_BUCKET = 4 * N_FFT
+ZCR_THRESHOLD = 1e-10
+
+# Model girişindeki özellik sırası
+FEATURE_NAMES = [f"mfcc{i+1:02d}" for i in range(N_MFCC)] + [
+    "rms_mean", "rms_std", "zcr_mean", "centroid_mean",
+    "bandwidth_mean", "rolloff_mean", "flatness_mean", "flux_mean"
+] + [f"contrast_b{i+1}" for i in range(7)] + [
+    "onset_mean", "onset_std", "onset_max", "onset_sum",
+    "attack_time", "attack_slope", "hpi_ratio"
+]
+
 def log_attack_features(env, sr, hop):
     if env.max() < EPS:
         return 0.0, 0.0
@@ -29,73 +71,565 @@ def log_attack_features(env, sr, hop):
     slope = (env_db[t90] - env_db[t10]) / attack_time
     return attack_time, slope
 
+def _running_median(X, k):
+    """Son eksen boyunca k'lık medyan; median_filter(mode='reflect') ile birebir aynı"""
+    h = k // 2
+    padded = np.pad(X, ((0, 0), (h, h)), mode="symmetric")
+    out = np.empty_like(X)
+    step = max(1, MEDIAN_BLOCK // (X.shape[1] * k))
+    for start in range(0, len(X), step):
+        windows = np.lib.stride_tricks.sliding_window_view(padded[start:start + step], k, axis=1)
+        out[start:start + step] = np.partition(windows, h, axis=-1)[..., h]
+    return out
+
+def hpss_separate(y):
+    """librosa.effects.hpss ile aynı (harmonik, perküsif) sinyaller, daha hızlı.
+
+    Medyan süzgeçler ndimage yerine kayan pencere + np.partition ile
+    hesaplanır (aynı 'reflect' kenar kuralı, birebir aynı sonuç).
+    """
+    D = librosa.stft(y, n_fft=HPSS_N_FFT, hop_length=HPSS_HOP_LENGTH)
+    S, phase = librosa.magphase(D)
+    harm = _running_median(S, HPSS_KERNEL)
+    perc = _running_median(np.ascontiguousarray(S.T), HPSS_KERNEL).T
+    mask_h = librosa.util.softmask(harm, perc, power=2, split_zeros=True)
+    mask_p = librosa.util.softmask(perc, harm, power=2, split_zeros=True)
+    y_h = librosa.istft((S * mask_h) * phase, hop_length=HPSS_HOP_LENGTH, n_fft=HPSS_N_FFT,
+                        dtype=y.dtype, length=len(y))
+    y_p = librosa.istft((S * mask_p) * phase, hop_length=HPSS_HOP_LENGTH, n_fft=HPSS_N_FFT,
+                        dtype=y.dtype, length=len(y))
+    return y_h, y_p
+
 def hpss_energy_ratio(y):
-    y_h, y_p = librosa.effects.hpss(y)
+    """Perküsif / harmonik enerji oranı (hpi_ratio özelliği)"""
+    y_h, y_p = hpss_separate(y)
     return np.sum(y_p**2) / (np.sum(y_h**2) + EPS)
 
+def _stage(func):
+    """cached_property + profiler aşaması (kapalıyken tek bayrak kontrolü)"""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self):
+        if not profiler.enabled:
+            return func(self)
+        with profiler.stage(name):
+            return func(self)
+    return cached_property(wrapper)
+
+class SpectralEngine:
+    """Tek STFT'den tüm spektral temsilleri türeten motor"""
+
+    def __init__(self, signal, sr=SR):
+        if len(signal) < N_FFT:
+            signal = np.pad(signal, (0, N_FFT - len(signal)))
+        self.signal = signal
+        self.sr = sr
+
+    @_stage
+    def stft(self):
+        return librosa.stft(self.signal, n_fft=N_FFT, hop_length=HOP_LENGTH)
+
+    @_stage
+    def magnitude(self):
+        return np.abs(self.stft)
+
+    @_stage
+    def power(self):
+        return self.magnitude ** 2
+
+    @_stage
+    def mel_basis(self):
+        return librosa.filters.mel(sr=self.sr, n_fft=N_FFT, n_mels=N_MEL)
+
+    @_stage
+    def mel(self):
+        # Genlik spektrumundan mel (eğitimdeki melspectrogram(S=S) ile aynı)
+        return self.mel_basis @ self.magnitude
+
+    @_stage
+    def mfcc(self):
+        return librosa.feature.mfcc(S=librosa.power_to_db(self.mel), n_mfcc=N_MFCC)
+
+    @_stage
+    def rms(self):
+        return librosa.feature.rms(S=self.magnitude, frame_length=N_FFT,
+                                   hop_length=HOP_LENGTH)[0]
+
+    @_stage
+    def zcr(self):
+        return librosa.feature.zero_crossing_rate(self.signal, frame_length=N_FFT,
+                                                  hop_length=HOP_LENGTH)[0]
+
+    @_stage
+    def centroid(self):
+        return librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr)[0]
+
+    @_stage
+    def bandwidth(self):
+        return librosa.feature.spectral_bandwidth(S=self.magnitude, sr=self.sr)[0]
+
+    @_stage
+    def rolloff(self):
+        return librosa.feature.spectral_rolloff(S=self.magnitude, sr=self.sr,
+                                                roll_percent=ROLL_PERCENT)[0]
+
+    @_stage
+    def flatness(self):
+        return librosa.feature.spectral_flatness(S=self.magnitude)[0]
+
+    @_stage
+    def contrast(self):
+        return librosa.feature.spectral_contrast(S=self.magnitude, sr=self.sr)
+
+    @_stage
+    def flux(self):
+        # onset_strength(S=S) varsayılan n_fft ile merkezleme kaydırması yapar
+        return librosa.onset.onset_strength(S=self.magnitude, sr=self.sr,
+                                            hop_length=HOP_LENGTH)
+
+    @_stage
+    def onset_env(self):
+        # onset_strength(y=...) ile aynı: güç mel -> dB, ayrı STFT yok
+        mel_db = librosa.power_to_db(self.mel_basis @ self.power)
+        return librosa.onset.onset_strength(S=mel_db, sr=self.sr, n_fft=N_FFT,
+                                            hop_length=HOP_LENGTH)
+
+    @_stage
+    def hpi_ratio(self):
+        # HPSS eğitimde librosa.effects.hpss varsayılan çerçevesiyle hesaplandı
+        return hpss_energy_ratio(self.signal)
+
+    def features(self):
+        """42 özelliği sözlük olarak döndür"""
+        mfcc = self.mfcc
+        rms = self.rms
+        contrast = self.contrast
+        onset_env = self.onset_env
+        atk_time, atk_slope = log_attack_features(onset_env, self.sr, HOP_LENGTH)
+
+        return {
+            **{f"mfcc{i+1:02d}": mfcc[i].mean() for i in range(N_MFCC)},
+            "rms_mean": np.mean(rms),
+            "rms_std": np.std(rms),
+            "zcr_mean": np.mean(self.zcr),
+            "centroid_mean": np.mean(self.centroid),
+            "bandwidth_mean": np.mean(self.bandwidth),
+            "rolloff_mean": np.mean(self.rolloff),
+            "flatness_mean": np.mean(self.flatness),
+            "flux_mean": np.mean(self.flux),
+            **{f"contrast_b{b+1}": contrast[b].mean() for b in range(contrast.shape[0])},
+            "onset_mean": onset_env.mean(),
+            "onset_std": onset_env.std(),
+            "onset_max": onset_env.max(),
+            "onset_sum": onset_env.sum(),
+            "attack_time": atk_time,
+            "attack_slope": atk_slope,
+            "hpi_ratio": self.hpi_ratio,
+        }
+
 def extract_features(signal, sr=SR):
     """42 özellik çıkaran fonksiyon"""
     warnings.filterwarnings("ignore")
-    
-    if len(signal) < N_FFT:
-        signal = np.pad(signal, (0, N_FFT - len(signal)))
-    
-    S = np.abs(librosa.stft(signal, n_fft=N_FFT, hop_length=HOP_LENGTH))
-    mel = librosa.feature.melspectrogram(S=S, sr=sr, n_mels=N_MEL)
-    mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=N_MFCC)
-
-    # RMS
-    rms = librosa.feature.rms(
-        S=S,
-        frame_length=N_FFT,
-        hop_length=HOP_LENGTH
-    )[0]
-
-    # ZCR
-    zcr = librosa.feature.zero_crossing_rate(
-        signal,
-        frame_length=N_FFT,
-        hop_length=HOP_LENGTH
-    )[0]
-
-    centroid = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
-    bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[0]
-    rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr, 
-                                               roll_percent=ROLL_PERCENT)[0]
-    flatness = librosa.feature.spectral_flatness(S=S)[0]
-    contrast = librosa.feature.spectral_contrast(S=S, sr=sr)
+    return SpectralEngine(signal, sr).features()
+
+def _masked_mean(x, mask, n):
+    return np.where(mask, x, 0).sum(axis=-1) / n
+
+def _masked_std(x, mask, n):
+    mean = _masked_mean(x, mask, n)
+    return np.sqrt(_masked_mean((x - mean[..., None]) ** 2, mask, n))
+
+def _batch_power_to_db(S, mask, top_db=80.0):
+    """power_to_db, ancak top_db eşiği her sinyalin kendi geçerli çerçevelerinden"""
+    log_spec = 10.0 * np.log10(np.maximum(1e-10, S))
+    peak = np.where(mask[:, None, :], log_spec, -np.inf).max(axis=(-2, -1))
+    return np.maximum(log_spec, peak[:, None, None] - top_db)
+
+def _contrast_peak_valley(S, sr, fmin=200.0, n_bands=6, quantile=0.02):
+    """spectral_contrast'ın doğrusal tepe/vadi değerleri (librosa varsayılanları)"""
+    freq = librosa.fft_frequencies(sr=sr, n_fft=N_FFT)
+    octa = np.zeros(n_bands + 2)
+    octa[1:] = fmin * (2.0 ** np.arange(0, n_bands + 1))
+
+    shape = S.shape[:-2] + (n_bands + 1, S.shape[-1])
+    valley = np.zeros(shape)
+    peak = np.zeros(shape)
+    for k, (f_low, f_high) in enumerate(zip(octa[:-1], octa[1:])):
+        current_band = np.logical_and(freq >= f_low, freq <= f_high)
+        idx = np.flatnonzero(current_band)
+        if k > 0:
+            current_band[idx[0] - 1] = True
+        if k == n_bands:
+            current_band[idx[-1] + 1:] = True
+        sub_band = S[..., current_band, :]
+        if k < n_bands:
+            sub_band = sub_band[..., :-1, :]
+        idx = int(np.maximum(np.rint(quantile * np.sum(current_band)), 1))
+        sortedr = np.sort(sub_band, axis=-2)
+        valley[..., k, :] = np.mean(sortedr[..., :idx, :], axis=-2)
+        peak[..., k, :] = np.mean(sortedr[..., -idx:, :], axis=-2)
+    return peak, valley
+
+def _batch_contrast(S, sr, mask):
+    """spectral_contrast; dB dönüşümü sinyal başına"""
+    peak, valley = _contrast_peak_valley(S, sr)
+    return _batch_power_to_db(peak, mask) - _batch_power_to_db(valley, mask)
+
+def _batch_zcr(signals, width, n_frames):
+    """Kenar dolgulu zero_crossing_rate; çerçeve başına sayım kümülatif toplamla"""
+    half = N_FFT // 2
+    Y = np.zeros((len(signals), width + N_FFT), dtype=np.float32)
+    for row, y in zip(Y, signals):
+        row[:len(y) + N_FFT] = np.pad(y, half, mode="edge")
+    neg = Y < -ZCR_THRESHOLD
+    cross = np.zeros(Y.shape, dtype=np.int64)
+    cross[:, 1:] = neg[:, 1:] != neg[:, :-1]
+    csum = np.concatenate([np.zeros((len(Y), 1), dtype=np.int64),
+                           np.cumsum(cross, axis=1)], axis=1)
+    starts = np.arange(n_frames) * HOP_LENGTH
+    # Her çerçevenin ilk örneği sayılmaz (pad=False)
+    return (csum[:, starts + N_FFT] - csum[:, starts + 1]) / N_FFT
+
+def _extract_bucket(signals, sr):
+    """Aynı dolgu uzunluğundaki sinyalleri tek 3B STFT ile işle"""
+    lengths = np.array([len(y) for y in signals])
+    width = int(lengths.max())
+    X = np.zeros((len(signals), width), dtype=np.float32)
+    for row, y in zip(X, signals):
+        row[:len(y)] = y
+
+    # Sıfır dolgu sabit-kipli STFT'de geçerli çerçeveleri değiştirmez
+    D = librosa.stft(X, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    S = np.abs(D)
+    n_frames = S.shape[-1]
+    nf = lengths // HOP_LENGTH + 1
+    mask = np.arange(n_frames) < nf[:, None]
+
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MEL)
+    mel = mel_basis @ S
+    mfcc = librosa.feature.mfcc(S=_batch_power_to_db(mel, mask), n_mfcc=N_MFCC)
+    rms = librosa.feature.rms(S=S, frame_length=N_FFT, hop_length=HOP_LENGTH)[:, 0]
+    zcr = _batch_zcr(signals, width, n_frames)
+    centroid = librosa.feature.spectral_centroid(S=S, sr=sr)[:, 0]
+    bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[:, 0]
+    rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr,
+                                               roll_percent=ROLL_PERCENT)[:, 0]
+    flatness = librosa.feature.spectral_flatness(S=S)[:, 0]
+    contrast = _batch_contrast(S, sr, mask)
     flux = librosa.onset.onset_strength(S=S, sr=sr, hop_length=HOP_LENGTH)
-    onset_env = librosa.onset.onset_strength(y=signal, sr=sr,
-                                            n_fft=N_FFT,
-                                            hop_length=HOP_LENGTH)
-    atk_time, atk_slope = log_attack_features(onset_env, sr, HOP_LENGTH)
-
-    feats = {
-        **{f"mfcc{i+1:02d}": mfcc[i].mean() for i in range(N_MFCC)},
-        "rms_mean": np.mean(rms),
-        "rms_std": np.std(rms),
-        "zcr_mean": np.mean(zcr),
-        "centroid_mean": np.mean(centroid),
-        "bandwidth_mean": np.mean(bandwidth),
-        "rolloff_mean": np.mean(rolloff),
-        "flatness_mean": np.mean(flatness),
-        "flux_mean": np.mean(flux),
-        **{f"contrast_b{b+1}": contrast[b].mean() for b in range(contrast.shape[0])},
-        "onset_mean": onset_env.mean(),
-        "onset_std": onset_env.std(),
-        "onset_max": onset_env.max(),
-        "onset_sum": onset_env.sum(),
-        "attack_time": atk_time,
-        "attack_slope": atk_slope,
-        "hpi_ratio": hpss_energy_ratio(signal),
-    }
-    return feats
-
-def extract_from_file(file_path):
-    """Dosyadan özellik çıkarma"""
+    mel_db = _batch_power_to_db(mel_basis @ S ** 2, mask)
+    onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr, n_fft=N_FFT,
+                                             hop_length=HOP_LENGTH)
+
+    m3 = mask[:, None, :]
+    n3 = nf[:, None]
+    onset_valid = np.where(mask, onset_env, 0)
+    attack = np.array([
+        log_attack_features(onset_env[i, :nf[i]], sr, HOP_LENGTH)
+        for i in range(len(signals))
+    ])
+    # HPSS medyan süzgeci zamanda yerel değil; sinyal başına hesaplanır
+    hpi = np.array([SpectralEngine(y, sr).hpi_ratio for y in signals])
+
+    return np.column_stack([
+        _masked_mean(mfcc, m3, n3),
+        _masked_mean(rms, mask, nf),
+        _masked_std(rms, mask, nf),
+        _masked_mean(zcr, mask, nf),
+        _masked_mean(centroid, mask, nf),
+        _masked_mean(bandwidth, mask, nf),
+        _masked_mean(rolloff, mask, nf),
+        _masked_mean(flatness, mask, nf),
+        _masked_mean(flux, mask, nf),
+        _masked_mean(contrast, m3, n3),
+        _masked_mean(onset_env, mask, nf),
+        _masked_std(onset_env, mask, nf),
+        np.where(mask, onset_env, -np.inf).max(axis=-1),
+        onset_valid.sum(axis=-1),
+        attack,
+        hpi,
+    ])
+
+def extract_features_batch(signals, sr=SR, batch_size=256, bucket=BATCH_BUCKET):
+    """Birçok sinyalden (n, 42) float32 özellik matrisi çıkar (FEATURE_NAMES sırası)"""
+    warnings.filterwarnings("ignore")
+    signals = [np.asarray(y, dtype=np.float32) for y in signals]
+    signals = [np.pad(y, (0, N_FFT - len(y))) if len(y) < N_FFT else y
+               for y in signals]
+    out = np.empty((len(signals), len(FEATURE_NAMES)), dtype=np.float32)
+    if not signals:
+        return out
+
+    # Dolgu uzunluğuna göre grupla; her grup en fazla batch_size sinyal
+    keys = np.array([-(-len(y) // bucket) for y in signals])
+    for key in np.unique(keys):
+        idx = np.flatnonzero(keys == key)
+        for start in range(0, len(idx), batch_size):
+            chunk = idx[start:start + batch_size]
+            out[chunk] = _extract_bucket([signals[i] for i in chunk], sr)
+    return out
+
+def load_signal(source, res_type=RES_TYPE):
+    """Dosya yolu, bayt veya dosya benzeri nesneden sinyali SR'de yükle.
+
+    Bayt ve dosya benzeri nesneler geçici dosyaya yazılmadan bellekten çözülür.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'getvalue'):
+        source = io.BytesIO(source.getvalue())
+    with profiler.stage("decode"):
+        signal, _ = librosa.load(source, sr=SR, res_type=res_type)
+    return signal
+
+def _duration(source):
+    """Başlıktan süre (saniye); soundfile okuyamazsa None"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'getvalue'):
+        source = io.BytesIO(source.getvalue())
+    # Dosya benzeri nesne sonradan baştan çözülebilsin diye konumu geri alınır
+    position = source.tell() if hasattr(source, 'seek') else None
     try:
-        signal, _ = librosa.load(file_path, sr=SR)
+        return sf.info(source).duration
+    except Exception:
+        return None
+    finally:
+        if position is not None:
+            source.seek(position)
+
+def features_from_source(source, res_type=RES_TYPE, streaming=False, onset_window=None):
+    """Kaynağı çözüp özellik çıkar.
+
+    streaming=True ise STREAM_THRESHOLD_SECONDS'tan uzun dosyalar sınırlı
+    bellekli akış modunda işlenir (sonuç tam yoldan biraz sapar);
+    onset_window (saniye) verilirse yalnızca ilk vuruştan sonraki pencere.
+    Akış modu soxr gerektirir, diğer res_type'larda dosya tümüyle yüklenir.
+    """
+    duration = _duration(source) if streaming else None
+    if duration is not None and duration > STREAM_THRESHOLD_SECONDS:
+        if res_type.startswith("soxr"):
+            from streaming_extractor import extract_features_streaming
+            with profiler.stage("streaming"):
+                return extract_features_streaming(source, res_type=res_type,
+                                                  onset_window=onset_window)
+        logger.warning("Akış modu soxr gerektirir; %s ile %s tümüyle yükleniyor",
+                       res_type, source_name(source))
+    signal = load_signal(source, res_type)
+    with profiler.stage("assemble"):
         return extract_features(signal)
+
+def read_bytes(source):
+    """Dosya yolu, bayt veya dosya benzeri nesnenin ham baytları"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+def features_to_vector(feats):
+    """Özellik sözlüğünü FEATURE_NAMES sırasında vektöre çevir"""
+    return np.array([feats[name] for name in FEATURE_NAMES])
+
+def source_name(source):
+    """Kaynağın kayıtlarda gösterilecek adı"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return "<bytes>"
+    return getattr(source, 'name', None) or str(source)
+
+def extract_from_file(file_path, cache=None, res_type=RES_TYPE, streaming=False, onset_window=None):
+    """Dosyadan (yol, bayt ya da dosya benzeri) özellik çıkarma.
+
+    cache verilirse içerik anahtarıyla önbelleklenir. streaming ve
+    onset_window için features_from_source'a bakın.
+    """
+    try:
+        with profiler.file(source_name(file_path)):
+            if cache is None:
+                return features_from_source(file_path, res_type, streaming, onset_window)
+            data = read_bytes(file_path)
+            with profiler.stage("cache"):
+                key = cache.key(data, res_type, streaming, onset_window)
+                vector = cache.get(key)
+            if vector is not None:
+                return dict(zip(FEATURE_NAMES, vector))
+            feats = features_from_source(data, res_type, streaming, onset_window)
+            cache.put(key, features_to_vector(feats))
+            return feats
     except Exception as e:
-        print(f"Hata: {file_path}: {e}")
-        return None 
\ No newline at end of file
+        logger.warning("Hata: %s: %s", file_path, e)
+        return None
+
+def _run_extraction(source, res_type, streaming, onset_window):
+    """(özellik vektörü, hata mesajı); hatalar kayıt olarak döner"""
+    try:
+        with profiler.file(None):
+            features = features_from_source(source, res_type, streaming, onset_window)
+            return features_to_vector(features), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _extract_job(source, res_type=RES_TYPE, profile=None, streaming=False, onset_window=None):
+    """İşçi süreç görevi: (özellik vektörü, hata mesajı, profil kaydı) döndürür.
+
+    İşçinin profil durumu her işte profile'a göre ayarlanır: None kapatır
+    (tracemalloc da durur), False/True açar (True: bellek de ölçülür) ve
+    dosyanın aşama kaydı ebeveyne döndürülür.
+    """
+    if profile is None:
+        profiler.disable()
+    elif not profiler.enabled or profiler.memory != profile:
+        profiler.enable(memory=profile)
+    result = _run_extraction(source, res_type, streaming, onset_window)
+    record = None
+    if profile is not None:
+        record = profiler.take_record()
+        profiler.reset()
+    return result + (record,)
+
+def _serial_job(source, res_type, name, streaming=False, onset_window=None):
+    # Aynı süreçte profil durumu değiştirilmez; aşamalar name kaydına yazılır
+    with profiler.file(name):
+        return _run_extraction(source, res_type, streaming, onset_window) + (None,)
+
+# Süreç başına tek havuz; işçi sayısı değişince eskisi kapatılır
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+def _get_pool(n_workers):
+    # Havuz Streamlit yeniden çalıştırmaları arasında yeniden kullanılır;
+    # spawn, TensorFlow yüklü ebeveynin fork edilmesini önler
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and _pool_workers != n_workers:
+            # Gönderilmiş işler tamamlanır, yeni işler yeni havuza gider
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(n_workers, mp_context=ctx)
+            _pool_workers = n_workers
+        return _pool
+
+def _discard_pool(pool):
+    """Bozulan havuzu bırak; sonraki _get_pool yenisini kurar"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+def _discard_if_broken(future, pool):
+    if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+        _discard_pool(pool)
+
+def submit_extraction(source, n_workers=None, res_type=RES_TYPE, streaming=False, onset_window=None):
+    """Tek kaynağı süreç havuzuna gönder.
+
+    (vektör, hata, profil kaydı) döndüren concurrent.futures.Future verir;
+    asyncio'da asyncio.wrap_future ile beklenebilir. Bir işçi ölürse
+    future BrokenProcessPool ile biter ve havuz sonraki çağrılar için
+    yeniden kurulur.
+    """
+    profile = profiler.memory if profiler.enabled else None
+    n_workers = n_workers or os.cpu_count() or 1
+    for attempt in range(2):
+        pool = _get_pool(n_workers)
+        try:
+            future = pool.submit(_extract_job, source, res_type, profile, streaming, onset_window)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            if attempt:
+                raise
+            continue
+        future.add_done_callback(lambda f, pool=pool: _discard_if_broken(f, pool))
+        return future
+
+def extract_files_parallel(sources, n_workers=None, progress_callback=None, names=None,
+                           cache=None, res_type=RES_TYPE, streaming=False, onset_window=None):
+    """Dosyaları süreç havuzunda çöz ve özellik çıkar.
+
+    Sonuçlar gönderim sırasıyla (vektör, hata) çiftleri olarak döner;
+    progress_callback(tamamlanan, toplam, ad) her dosyadan sonra çağrılır.
+    cache verilirse önbellekte bulunan dosyalar havuza gönderilmez.
+    streaming ve onset_window için features_from_source'a bakın.
+    """
+    sources = list(sources)
+    names = list(names) if names is not None else [str(s) for s in sources]
+    total = len(sources)
+    n_workers = n_workers or os.cpu_count() or 1
+    results = [None] * total
+    keys = [None] * total
+    done = 0
+
+    def report(i, result):
+        nonlocal done
+        if result[1] is not None:
+            logger.warning("Hata: %s: %s", names[i], result[1])
+        results[i] = result
+        done += 1
+        if progress_callback is not None:
+            progress_callback(done, total, names[i])
+
+    pending = []
+    for i, source in enumerate(sources):
+        if cache is None:
+            pending.append(i)
+            continue
+        try:
+            data = read_bytes(source)
+        except Exception as e:
+            report(i, (None, f"{type(e).__name__}: {e}"))
+            continue
+        keys[i] = cache.key(data, res_type, streaming, onset_window)
+        vector = cache.get(keys[i])
+        if vector is not None:
+            report(i, (vector, None))
+        else:
+            sources[i] = data
+            pending.append(i)
+
+    if n_workers == 1 or len(pending) <= 1:
+        # Aynı süreçte aşamalar doğrudan bu süreçteki profile yazılır
+        jobs = (_serial_job(sources[i], res_type, names[i], streaming, onset_window)
+                for i in pending)
+        _collect(zip(pending, jobs), names, keys, cache, report)
+        return results
+
+    # Bir işçi ölürse havuz bir kez yeniden kurulur; yine bozulursa kalan
+    # dosyalar hata kaydı olarak döner
+    profile = profiler.memory if profiler.enabled else None
+    for attempt in range(2):
+        pool = _get_pool(n_workers)
+        chunksize = max(1, len(pending) // (4 * n_workers))
+        try:
+            jobs = pool.map(_extract_job, [sources[i] for i in pending],
+                            [res_type] * len(pending), [profile] * len(pending),
+                            [streaming] * len(pending), [onset_window] * len(pending),
+                            chunksize=chunksize)
+            _collect(zip(pending, jobs), names, keys, cache, report)
+            break
+        except BrokenProcessPool as e:
+            logger.warning("İşçi süreç havuzu bozuldu, yeniden kuruluyor: %s", e)
+            _discard_pool(pool)
+            pending = [i for i in pending if results[i] is None]
+            broken = e
+    else:
+        for i in pending:
+            report(i, (None, f"BrokenProcessPool: {broken}"))
+    return results
+
+def _collect(jobs, names, keys, cache, report):
+    """(sıra, (vektör, hata, profil kaydı)) çıktılarını önbelleğe ve sonuçlara yaz"""
+    for i, (vector, err, record) in jobs:
+        if record is not None:
+            record["file"] = names[i]
+            profiler.add_record(record)
+        if cache is not None and vector is not None:
+            cache.put(keys[i], vector)
+        report(i, (vector, err))
@@ -0,0 +1,283 @@
+import json
+import os
+import sys
+from functools import cached_property
+
+import numpy as np
+
+# Yeni deponun başlangıç kapasitesi (satır); dolunca iki katına çıkar
+INITIAL_CAPACITY = 1024
+
+FEATURES_FILE = "features.npy"
+CODES_FILE = "classes.npy"
+FILENAMES_FILE = "filenames.jsonl"
+OFFSETS_FILE = "name_offsets.npy"
+META_FILE = "meta.json"
+
+
+class _ColumnRows:
+    """Sütunlu depoların ortak liste arayüzü ve sütun erişimi.
+
+    Alt sınıflar _features, _codes, classes, dim ve size'ı tutar;
+    filename(i) satırın adını verir, _grow(needed) kapasiteyi büyütür,
+    _commit(end, filenames) sütunlara yazılmış satırları size'a katıp saklar.
+    """
+
+    # Sütun erişimi
+
+    @property
+    def features(self):
+        """(size, dim) float32 özellik matrisi (kopyasız)"""
+        return self._features[:self.size]
+
+    @property
+    def class_codes(self):
+        return self._codes[:self.size]
+
+    def coded_columns(self, start=0, stop=None):
+        """[start, stop) satırlarının (özellikler, int8 kodlar, sınıf adları) sütunları"""
+        stop = self.size if stop is None else min(stop, self.size)
+        return self._features[start:stop], self._codes[start:stop], list(self.classes)
+
+    def class_code(self, class_name):
+        class_name = str(class_name)
+        if class_name not in self.classes:
+            if len(self.classes) >= 127:
+                raise ValueError("int8 sınıf kodu sınırı aşıldı")
+            self.classes.append(class_name)
+        return self.classes.index(class_name)
+
+    @cached_property
+    def _counts(self):
+        # Bir kez sayılır, sonra eklemelerle güncellenir
+        return np.bincount(self.class_codes, minlength=128)
+
+    def class_counts(self):
+        """{sınıf: satır sayısı} (boş sınıflar hariç)"""
+        return {self.classes[code]: int(n) for code, n in enumerate(self._counts[:len(self.classes)]) if n}
+
+    # Ekleme
+
+    def append_rows(self, features, classes, filenames):
+        """Satırları sütun olarak toplu ekle (kapasite dolunca iki katına çıkar)"""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self.dim)
+        filenames = [str(name) for name in filenames]
+        n = len(features)
+        if not (n == len(classes) == len(filenames)):
+            raise ValueError("features, classes ve filenames aynı uzunlukta olmalı")
+        if n == 0:
+            return
+        if self.size + n > len(self._codes):
+            self._grow(self.size + n)
+        end = self.size + n
+        self._features[self.size:end] = features
+        self._codes[self.size:end] = [self.class_code(c) for c in classes]
+        if "_counts" in self.__dict__:
+            self._counts += np.bincount(self._codes[self.size:end], minlength=128)
+        self._commit(end, filenames)
+
+    def append(self, ref):
+        """reference_database.append ile uyumlu tek satır ekleme"""
+        self.extend([ref])
+
+    def extend(self, refs):
+        """reference_database.extend ile uyumlu toplu ekleme (tek _commit)"""
+        refs = list(refs)
+        if refs:
+            self.append_rows([ref['features'] for ref in refs],
+                             [ref['class'] for ref in refs],
+                             [ref['filename'] for ref in refs])
+
+    # Liste arayüzü
+
+    def __len__(self):
+        return self.size
+
+    def _row(self, i):
+        return {
+            'filename': self.filename(i),
+            'class': self.classes[self._codes[i]],
+            'features': np.asarray(self._features[i], dtype=np.float64),
+        }
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._row(i) for i in range(*item.indices(self.size))]
+        if item < 0:
+            item += self.size
+        if not 0 <= item < self.size:
+            raise IndexError(item)
+        return self._row(item)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(self.size))
+
+
+class FeatureStore(_ColumnRows):
+    """Diskte, eklenebilir ve bellek eşlemli referans özellik deposu.
+
+    Dizin düzeni:
+        features.npy     (kapasite, boyut) float32, bellek eşlemli
+        classes.npy      (kapasite,) int8 sınıf kodu
+        filenames.jsonl  satır başına bir JSON dosya adı
+        name_offsets.npy (kapasite,) int64, adın filenames.jsonl'daki konumu
+        meta.json        geçerli satır sayısı, sınıf adları, boyut
+
+    meta.json en son ve atomik olarak yazılır; yarıda kalan bir ekleme
+    bir sonraki açılışta görünmez. reference_database ile aynı liste
+    arayüzünü (len, indeksleme, append) sunar.
+    """
+
+    def __init__(self, path, classes=None, dim=42, mode="r+"):
+        self.path = path
+        self.mode = mode
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            if mode == "r":
+                raise FileNotFoundError(meta_path)
+            self._create(classes, dim)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.size = meta["size"]
+        self.dim = meta["dim"]
+        self.classes = list(meta["classes"])
+        self.version = meta.get("version", 0)
+        self.names_bytes = meta.get("names_bytes", 0)
+        self._open_arrays()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _create(self, classes, dim):
+        os.makedirs(self.path, exist_ok=True)
+        np.lib.format.open_memmap(self._file(FEATURES_FILE), mode="w+",
+                                  dtype=np.float32, shape=(INITIAL_CAPACITY, dim)).flush()
+        np.lib.format.open_memmap(self._file(CODES_FILE), mode="w+",
+                                  dtype=np.int8, shape=(INITIAL_CAPACITY,)).flush()
+        np.lib.format.open_memmap(self._file(OFFSETS_FILE), mode="w+",
+                                  dtype=np.int64, shape=(INITIAL_CAPACITY,)).flush()
+        open(self._file(FILENAMES_FILE), "w").close()
+        self.size, self.dim, self.version, self.names_bytes = 0, dim, 0, 0
+        self.classes = [str(c) for c in (classes if classes is not None else [])]
+        self._write_meta()
+
+    def _open_arrays(self):
+        mmap_mode = "r" if self.mode == "r" else "r+"
+        self._features = np.load(self._file(FEATURES_FILE), mmap_mode=mmap_mode)
+        self._codes = np.load(self._file(CODES_FILE), mmap_mode=mmap_mode)
+        self._offsets = np.load(self._file(OFFSETS_FILE), mmap_mode=mmap_mode)
+
+    def _write_meta(self):
+        tmp = self._file(META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"size": self.size, "dim": self.dim, "classes": self.classes,
+                       "version": self.version, "names_bytes": self.names_bytes}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file(META_FILE))
+
+    def _grow(self, needed):
+        capacity = len(self._codes)
+        while capacity < needed:
+            capacity *= 2
+        for name, old in ((FEATURES_FILE, self._features), (CODES_FILE, self._codes),
+                          (OFFSETS_FILE, self._offsets)):
+            tmp = self._file(name + ".tmp")
+            new = np.lib.format.open_memmap(tmp, mode="w+", dtype=old.dtype,
+                                            shape=(capacity,) + old.shape[1:])
+            new[:self.size] = old[:self.size]
+            new.flush()
+            del new
+            os.replace(tmp, self._file(name))
+        self._open_arrays()
+
+    @cached_property
+    def _filenames(self):
+        # Yarıda kalmış eklemelerden kalan baytlar names_bytes'tan sonradır
+        with open(self._file(FILENAMES_FILE), "rb") as f:
+            data = f.read(self.names_bytes)
+        # JSON dizgeleri ham satır sonu içermez; tek bir dizi olarak ayrıştırılır
+        return json.loads(b"[" + data.rstrip(b"\n").replace(b"\n", b",") + b"]")
+
+    @property
+    def filenames(self):
+        return self._filenames[:self.size]
+
+    def filename(self, i):
+        """i. satırın adı; filenames.jsonl'ın tamamı ayrıştırılmadan okunur"""
+        names = self.__dict__.get("_filenames")
+        if names is not None:
+            return names[i]
+        with open(self._file(FILENAMES_FILE), "rb") as f:
+            f.seek(int(self._offsets[i]))
+            return json.loads(f.readline())
+
+    # Ekleme
+
+    def append_rows(self, features, classes, filenames):
+        """Satırları sütun olarak toplu ekle ve meta.json'ı güncelleyerek kalıcı kıl"""
+        if self.mode == "r":
+            raise PermissionError("Depo salt okunur açıldı")
+        super().append_rows(features, classes, filenames)
+
+    def _commit(self, end, filenames):
+        self._features.flush()
+        self._codes.flush()
+        # Önceki yarım eklemenin artıkları üzerine yazılır
+        lines = [(json.dumps(name) + "\n").encode() for name in filenames]
+        data = b"".join(lines)
+        lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+        self._offsets[self.size:end] = self.names_bytes + np.cumsum(lengths) - lengths
+        self._offsets.flush()
+        with open(self._file(FILENAMES_FILE), "r+b") as f:
+            f.seek(self.names_bytes)
+            f.write(data)
+            f.truncate()
+        if "_filenames" in self.__dict__:
+            self._filenames.extend(filenames)
+        self.names_bytes += len(data)
+
+        self.size = end
+        self.version += 1
+        self._write_meta()
+
+
+class ColumnStore(_ColumnRows):
+    """Bellek içi sütunlu referans veritabanı; FeatureStore ile aynı arayüz.
+
+    Özellikler iki katına büyüyen bitişik bir float32 matriste, sınıflar
+    classes listesine (label_encoder.classes_) int8 kod olarak tutulur.
+    Dosya adları interned dizgelerdir, sınıf başına sayımlar eklemede
+    güncellenir. Satır sözlükleri yalnızca indekslenince üretilir.
+    """
+
+    def __init__(self, classes=None, dim=42, capacity=INITIAL_CAPACITY):
+        self.dim = dim
+        self.classes = [str(c) for c in (classes if classes is not None else [])]
+        self.size = 0
+        self._features = np.empty((capacity, dim), dtype=np.float32)
+        self._codes = np.empty(capacity, dtype=np.int8)
+        self._counts = np.zeros(128, dtype=np.int64)
+        self._filenames = []
+
+    def _grow(self, needed):
+        capacity = max(len(self._codes), 1)
+        while capacity < needed:
+            capacity *= 2
+        # Eski dizilere tutulan görünümler geçerli kalır
+        for name in ("_features", "_codes"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    @property
+    def filenames(self):
+        return self._filenames
+
+    def filename(self, i):
+        return self._filenames[i]
+
+    def _commit(self, end, filenames):
+        self._filenames.extend(sys.intern(name) for name in filenames)
+        self.size = end
@@ -0,0 +1,238 @@
+"""Bir dizin ağacındaki sesleri paralel çıkarıp sınıflandıran, devam ettirilebilir dizinleyici.
+
+Çıktı dizini:
+    shard-00000.npz   sütunlar: features (n, 42) float32, predicted (int16 sınıf
+                      kodu, -1 = sınıflandırılmadı), confidence, path, label,
+                      size, mtime_ns
+    errors.jsonl      işlenemeyen dosyalar (path, size, mtime_ns, error)
+    manifest.json     kontrol noktası: tamamlanan parçalar, sınıflar, ayarlar
+
+Her parça yazıldıktan sonra manifest.json atomik olarak güncellenir;
+parçanın hata kayıtları errors.jsonl'a ancak bundan sonra eklenir.
+Kesilen bir çalışma en fazla son yarım parçayı kaybeder. Yeniden
+çalıştırmada boyutu ve değiştirilme zamanı aynı olan dosyalar atlanır.
+Değişen dosyalar yeni parçaya yazılır ve load_index'te son kayıt geçerli
+olur. label, notebook'taki gibi dosyanın bulunduğu klasörün adıdır.
+
+Kullanım:
+    python index_library.py /veri/one_shots --out index/ --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from feature_cache import extractor_fingerprint
+from feature_extractor import FEATURE_NAMES, RES_TYPE, RES_TYPES, extract_files_parallel
+
+MANIFEST_FILE = "manifest.json"
+ERRORS_FILE = "errors.jsonl"
+MANIFEST_VERSION = 1
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".aif", ".aiff", ".mp3")
+SHARD_SIZE = 2048
+
+
+def scan(root, extensions=AUDIO_EXTENSIONS):
+    """Kök altındaki ses dosyaları: (göreli yol, boyut, mtime_ns), belirlenimci sırada"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(extensions):
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield os.path.relpath(path, root), st.st_size, st.st_mtime_ns
+
+
+def _write_json_atomic(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_manifest(out):
+    path = os.path.join(out, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_index(out):
+    """Tüm parçaları birleştir; aynı yol birden çok kez varsa son kayıt geçerlidir.
+
+    {sütun adı: dizi} ve sınıf adlarını döndürür.
+    """
+    manifest = load_manifest(out)
+    if manifest is None or not manifest["shards"]:
+        return {}, []
+    shards = []
+    for shard in manifest["shards"]:
+        with np.load(os.path.join(out, shard["name"])) as data:
+            shards.append({key: data[key] for key in data.files})
+    columns = {key: np.concatenate([s[key] for s in shards]) for key in shards[0]}
+    # Son görülen kayıt: ters sırada ilk görülen
+    _, last = np.unique(columns["path"][::-1], return_index=True)
+    keep = np.sort(len(columns["path"]) - 1 - last)
+    return {key: value[keep] for key, value in columns.items()}, manifest["classes"]
+
+
+def _seen(out, manifest, retry_errors):
+    """Daha önce işlenmiş (yol -> (boyut, mtime_ns)) eşlemesi"""
+    seen = {}
+    for shard in manifest["shards"]:
+        with np.load(os.path.join(out, shard["name"])) as data:
+            for path, size, mtime in zip(data["path"], data["size"], data["mtime_ns"]):
+                seen[str(path)] = (int(size), int(mtime))
+    errors_path = os.path.join(out, ERRORS_FILE)
+    if not retry_errors and os.path.exists(errors_path):
+        with open(errors_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # yarıda kalmış son satır
+                seen.setdefault(record["path"], (record["size"], record["mtime_ns"]))
+    return seen
+
+
+def _settings(args, classes):
+    return {"fingerprint": extractor_fingerprint().decode(), "res_type": args.res_type,
+            "streaming": args.stream_long_files, "onset_window": args.onset_window,
+            "classes": classes, "feature_names": FEATURE_NAMES}
+
+
+def index_library(args):
+    root = os.path.abspath(args.root)
+    os.makedirs(args.out, exist_ok=True)
+
+    classifier = None
+    classes = []
+    if not args.no_classify:
+        from audio_classifier import AudioClassifier
+        classifier = AudioClassifier(model_path=args.model, scaler_path=args.scaler,
+                                     label_encoder_path=args.label_encoder,
+                                     backend=args.backend, res_type=args.res_type)
+        classes = [str(c) for c in classifier.classes]
+
+    settings = _settings(args, classes)
+    manifest = load_manifest(args.out)
+    if manifest is not None:
+        changed = [k for k, v in settings.items() if manifest.get(k) != v]
+        if changed and not args.force:
+            sys.exit(f"{args.out} farklı ayarlarla oluşturulmuş ({', '.join(changed)}); "
+                     "yeniden başlamak için --force")
+        if changed:
+            manifest = None
+    if manifest is None:
+        manifest = {"version": MANIFEST_VERSION, "root": root, "shards": [], **settings}
+        for name in os.listdir(args.out):
+            if name.startswith("shard-") or name == ERRORS_FILE:
+                os.remove(os.path.join(args.out, name))
+        _write_json_atomic(os.path.join(args.out, MANIFEST_FILE), manifest)
+
+    seen = _seen(args.out, manifest, args.retry_errors)
+    todo = [entry for entry in scan(root, tuple(args.extensions))
+            if seen.get(entry[0]) != (entry[1], entry[2])]
+    print(f"{len(seen)} dosya önceden işlenmiş, {len(todo)} dosya işlenecek", file=sys.stderr)
+
+    start = time.perf_counter()
+    done_total = 0
+    for offset in range(0, len(todo), args.shard_size):
+        chunk = todo[offset:offset + args.shard_size]
+        shard_index = len(manifest["shards"])
+
+        def progress(done, total, name):
+            if done == total or done % 100 == 0:
+                rate = (done_total + done) / (time.perf_counter() - start)
+                print(f"\r[parça {shard_index}] {done}/{total}  {rate:.1f} dosya/s",
+                      end="", file=sys.stderr)
+
+        extracted = extract_files_parallel([os.path.join(root, rel) for rel, _, _ in chunk],
+                                           n_workers=args.workers, progress_callback=progress,
+                                           names=[rel for rel, _, _ in chunk],
+                                           res_type=args.res_type,
+                                           streaming=args.stream_long_files,
+                                           onset_window=args.onset_window)
+        print(file=sys.stderr)
+        ok = [i for i, (vector, _) in enumerate(extracted) if vector is not None]
+        features = np.array([extracted[i][0] for i in ok]).reshape(-1, len(FEATURE_NAMES))
+
+        predicted = np.full(len(ok), -1, dtype=np.int16)
+        confidence = np.full(len(ok), np.nan, dtype=np.float32)
+        if classifier is not None and len(ok):
+            # Parça başına tek toplu model çağrısı
+            predicted_classes, confidences, _ = classifier.predict_batch(features)
+            predicted[:] = [classes.index(str(c)) for c in predicted_classes]
+            confidence[:] = confidences
+
+        name = f"shard-{shard_index:05d}.npz"
+        tmp = os.path.join(args.out, name + ".tmp.npz")
+        np.savez(tmp, features=features.astype(np.float32), predicted=predicted, confidence=confidence,
+                 path=np.array([chunk[i][0] for i in ok], dtype=str),
+                 label=np.array([os.path.basename(os.path.dirname(chunk[i][0])) for i in ok],
+                                dtype=str),
+                 size=np.array([chunk[i][1] for i in ok], dtype=np.int64),
+                 mtime_ns=np.array([chunk[i][2] for i in ok], dtype=np.int64))
+        os.replace(tmp, os.path.join(args.out, name))
+
+        failed = [i for i, (vector, _) in enumerate(extracted) if vector is None]
+
+        # Kontrol noktası: parça ancak manifest'e girince tamamlanmış sayılır
+        manifest["shards"].append({"name": name, "rows": len(ok), "failed": len(failed)})
+        _write_json_atomic(os.path.join(args.out, MANIFEST_FILE), manifest)
+
+        # Hatalar kontrol noktasından sonra: kesilen parçanın dosyaları
+        # hatalı diye atlanmaz, yeniden denenir
+        if failed:
+            with open(os.path.join(args.out, ERRORS_FILE), "a") as f:
+                for i in failed:
+                    rel, size, mtime = chunk[i]
+                    f.write(json.dumps({"path": rel, "size": size, "mtime_ns": mtime,
+                                        "error": extracted[i][1]}, ensure_ascii=False) + "\n")
+        done_total += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    print(f"Tamamlandı: {done_total} dosya, {elapsed:.1f} s, {len(manifest['shards'])} parça",
+          file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="Taranacak kök dizin")
+    parser.add_argument("--out", required=True, help="Parçaların ve manifest'in yazılacağı dizin")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help="Parça (kontrol noktası) başına dosya sayısı")
+    parser.add_argument("--extensions", nargs="+", default=list(AUDIO_EXTENSIONS))
+    parser.add_argument("--res-type", default=RES_TYPE, choices=RES_TYPES)
+    parser.add_argument("--stream-long-files", action="store_true",
+                        help="Uzun dosyaları sınırlı bellekli, yaklaşık akış modunda işle")
+    parser.add_argument("--onset-window", type=float, default=None,
+                        help="Akış modunda yalnızca ilk vuruştan sonraki bu kadar saniyeyi analiz et")
+    parser.add_argument("--no-classify", action="store_true", help="Yalnızca özellik çıkar")
+    parser.add_argument("--backend", default="numpy", choices=("tensorflow", "numpy"))
+    parser.add_argument("--model", default="my_enhanced_audio_model.h5")
+    parser.add_argument("--scaler", default="scaler.pkl")
+    parser.add_argument("--label-encoder", default="label_encoder.pkl")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="Önceki çalışmalarda başarısız olan dosyaları yeniden dene")
+    parser.add_argument("--force", action="store_true",
+                        help="Ayarlar değiştiyse mevcut dizini silip baştan başla")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    index_library(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""AudioClassifier için asyncio tabanlı yerel HTTP servisi.
+
+Eşzamanlı isteklerin özellik vektörleri model için mikro-gruplara
+toplanır (en fazla --max-batch-size satır ya da --max-wait-ms bekleme).
+Özellik çıkarma süreç havuzunda yapılır. Yalnızca standart kütüphane
+kullanılır.
+
+Uç noktalar (gövde ham ses baytlarıdır, örn. curl --data-binary @kick.wav):
+    POST /classify?name=kick.wav&add=1     sınıf ve güven
+    POST /similar?top_k=5&name=kick.wav    sınıf ve benzer sesler
+    GET  /health                           durum ve mikro-grup istatistikleri
+
+Kullanım:
+    python inference_server.py --port 8000 --backend numpy --max-batch-size 64
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import soundfile as sf
+
+from feature_extractor import SR, RES_TYPE, RES_TYPES, submit_extraction
+from profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan mikro-grup ayarları
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0
+
+# Kabul edilen en büyük istek gövdesi (README: dosya başına 200 MB)
+MAX_BODY_BYTES = 200 * 2**20
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """Eşzamanlı tahmin isteklerini tek predict_batch çağrısında birleştirir.
+
+    İlk istek geldikten sonra en fazla max_wait_ms beklenir ya da
+    max_batch_size satıra ulaşılınca grup hemen çalıştırılır. Model
+    çağrıları tek iş parçacıklı bir yürütücüde sırayla yapılır.
+    """
+
+    def __init__(self, predict_batch, executor, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait_ms=MAX_WAIT_MS):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, vector):
+        """Tek özellik vektörü için (sınıf, güven, ölçeklenmiş özellikler)"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((vector, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Beklemeden alınabilecek kalanlar da gruba katılır
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [(vector, future) for vector, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            matrix = np.stack([vector for vector, _ in batch])
+            try:
+                classes, confidences, scaled = await loop.run_in_executor(
+                    self.executor, self.predict_batch, matrix)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            for row, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result((classes[row], float(confidences[row]), scaled[row]))
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "queued": self.queue.qsize(), "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000}
+
+
+class InferenceService:
+    """HTTP isteklerini sınıflandırıcıya, süreç havuzuna ve mikro-gruplayıcıya bağlar"""
+
+    def __init__(self, classifier, n_workers=None, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait_ms=MAX_WAIT_MS, res_type=None):
+        self.classifier = classifier
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.res_type = res_type or classifier.res_type
+        # Akış modu sınıflandırıcının ayarıdır; uzun istekler yaklaşık işlenir
+        self.streaming = classifier.streaming
+        self.onset_window = classifier.onset_window
+        # Model, indeks ve kütüphane yazımları tek iş parçacığında sıralanır
+        self.model_executor = ThreadPoolExecutor(1, thread_name_prefix="model")
+        self.batcher = MicroBatcher(classifier.predict_batch, self.model_executor,
+                                    max_batch_size, max_wait_ms)
+        self.routes = {
+            ("POST", "/classify"): self.classify,
+            ("POST", "/similar"): self.similar,
+            ("GET", "/health"): self.health,
+        }
+
+    async def _features(self, data, name, res_type):
+        cache = self.classifier.feature_cache
+        loop = asyncio.get_running_loop()
+        # Büyük gövdelerin özetlenmesi ve disk katmanı olay döngüsünü bekletmez
+        key = await loop.run_in_executor(None, cache.key, data, res_type,
+                                         self.streaming, self.onset_window)
+        vector = await loop.run_in_executor(None, cache.get, key)
+        if vector is not None:
+            return vector
+        vector, err, record = await asyncio.wrap_future(
+            submit_extraction(data, self.n_workers, res_type, self.streaming, self.onset_window))
+        if record is not None:
+            record["file"] = name
+            profiler.add_record(record)
+        if vector is None:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{name} işlenemedi: {err}")
+        await loop.run_in_executor(None, cache.put, key, vector)
+        return vector
+
+    async def _predict(self, body, params):
+        if not body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Gövde boş; ses baytları bekleniyor")
+        name = params.get("name", "<bytes>")
+        res_type = params.get("res_type", self.res_type)
+        if res_type not in RES_TYPES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bilinmeyen res_type: {res_type}")
+        vector = await self._features(body, name, res_type)
+        predicted_class, confidence, scaled = await self.batcher.submit(vector)
+        return name, str(predicted_class), confidence, scaled
+
+    async def classify(self, body, params):
+        name, predicted_class, confidence, scaled = await self._predict(body, params)
+        if params.get("add") in ("1", "true"):
+            await asyncio.get_running_loop().run_in_executor(
+                self.model_executor, self.classifier.add_to_database, name,
+                predicted_class, scaled)
+        return {"filename": name, "predicted_class": predicted_class,
+                "confidence": confidence}
+
+    async def similar(self, body, params):
+        try:
+            top_k = int(params.get("top_k", 5))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "top_k tamsayı olmalı")
+        name, predicted_class, confidence, scaled = await self._predict(body, params)
+        similar = await asyncio.get_running_loop().run_in_executor(
+            self.model_executor, self.classifier.find_similar_sounds, scaled,
+            predicted_class, top_k)
+        return {"filename": name, "predicted_class": predicted_class,
+                "confidence": confidence,
+                "similar": [{"filename": s["filename"], "class": str(s["class"]),
+                             "cosine_similarity": float(s["cosine_similarity"]),
+                             "euclidean_distance": float(s["euclidean_distance"])}
+                            for s in similar]}
+
+    async def health(self, body, params):
+        return {"status": "ok", "classes": [str(c) for c in self.classifier.classes],
+                "library_size": len(self.classifier.reference_database),
+                "workers": self.n_workers, "batching": self.batcher.stats()}
+
+    # HTTP/1.1 (Content-Length gövdeli, keep-alive destekli) en küçük sunucu
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HTTPError as e:
+                    await _write_response(writer, e.status, {"error": str(e)}, close=True)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body, keep_alive = request
+                url = urlsplit(target)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                handler = self.routes.get((method, url.path))
+                try:
+                    if handler is None:
+                        known = any(path == url.path for _, path in self.routes)
+                        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED if known
+                                        else HTTPStatus.NOT_FOUND, f"{method} {url.path}")
+                    status, payload = HTTPStatus.OK, await handler(body, params)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    logger.exception("İstek başarısız: %s %s", method, target)
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+                await _write_response(writer, status, payload, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def warm_up(self):
+        """Süreç havuzunu başlat; işçilerin ilk çağrı maliyeti istek öncesi ödenir"""
+        buf = io.BytesIO()
+        sf.write(buf, np.zeros(SR // 10, dtype=np.float32), SR, format="WAV")
+        await asyncio.gather(*(
+            asyncio.wrap_future(submit_extraction(buf.getvalue(), self.n_workers, self.res_type))
+            for _ in range(self.n_workers)
+        ))
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.batcher.start()
+        await self.warm_up()
+        server = await asyncio.start_server(self.handle, host, port)
+        logger.info("Dinleniyor: http://%s:%d", host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.model_executor.shutdown(wait=False)
+
+
+async def _read_request(reader):
+    """(yöntem, hedef, başlıklar, gövde, keep_alive) ya da bağlantı kapandıysa None"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Geçersiz istek satırı")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", ""):
+        raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Chunked gövde desteklenmiyor")
+    length = headers.get("content-length") or "0"
+    if not (length.isascii() and length.isdigit()):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length negatif olmayan bir tamsayı olmalı")
+    length = int(length)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Gövde çok büyük")
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method.upper(), target, headers, body, keep_alive
+
+
+async def _write_response(writer, status, payload, close=False):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("INGEST_WORKERS", 0)) or None,
+                        help="Özellik çıkarma süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--backend", default=os.environ.get("MODEL_BACKEND", "tensorflow"),
+                        choices=("tensorflow", "numpy"))
+    parser.add_argument("--res-type", default=RES_TYPE, choices=RES_TYPES)
+    parser.add_argument("--store", default=os.environ.get("FEATURE_STORE_PATH"),
+                        help="Kalıcı FeatureStore dizini")
+    parser.add_argument("--cache-dir", default=os.environ.get("FEATURE_CACHE_DIR"),
+                        help="Özellik önbelleğinin disk katmanı")
+    parser.add_argument("--ann-probes", type=int, default=None)
+    parser.add_argument("--stream-long-files", action="store_true",
+                        help="Uzun dosyaları sınırlı bellekli, yaklaşık akış modunda işle")
+    parser.add_argument("--onset-window", type=float, default=None,
+                        help="Akış modunda yalnızca ilk vuruştan sonraki bu kadar saniyeyi analiz et")
+    parser.add_argument("--index-quantization", default=os.environ.get("INDEX_QUANTIZATION") or None,
+                        choices=("float32", "float16", "int8"),
+                        help="Benzerlik indeksini sıkıştırılmış tut (en iyiler kesin yeniden puanlanır)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from audio_classifier import AudioClassifier
+    from feature_cache import FeatureCache
+
+    classifier = AudioClassifier(store_path=args.store, backend=args.backend,
+                                 feature_cache=FeatureCache(cache_dir=args.cache_dir),
+                                 ann_probes=args.ann_probes, res_type=args.res_type,
+                                 index_quantization=args.index_quantization,
+                                 streaming=args.stream_long_files, onset_window=args.onset_window)
+    service = InferenceService(classifier, n_workers=args.workers,
+                               max_batch_size=args.max_batch_size,
+                               max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+# Eğitim dışı çıkarımda etkisiz katmanlar
+PASSTHROUGH_LAYERS = ("InputLayer", "Dropout")
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x = np.exp(x - x.max(axis=1, keepdims=True))
+    return x / x.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+class NumpyMLP:
+    """Keras yoğun (Dense/BatchNormalization/Dropout) ağının saf NumPy ileri geçişi.
+
+    Ağırlıklar .h5 dosyasından h5py ile bir kez okunur. TensorFlow
+    yüklenmez. Hesap Keras gibi float32 yapılır.
+    """
+
+    def __init__(self, layers):
+        # (kernel, bias, aktivasyon) üçlüleri; BatchNormalization önceki
+        # Dense katmanına değil, kendi ölçek/kaydırmasına dönüştürülür
+        self.layers = layers
+
+    @classmethod
+    def from_h5(cls, path):
+        """Keras .h5 model dosyasından yapılandırmayı ve ağırlıkları oku"""
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            config = json.loads(f.attrs["model_config"])
+            weights = f["model_weights"]
+            layers = []
+            for layer in config["config"]["layers"]:
+                kind, conf = layer["class_name"], layer["config"]
+                if kind in PASSTHROUGH_LAYERS:
+                    continue
+                group = weights[conf["name"]]
+                values = {name.split("/")[-1]: np.asarray(group[name], dtype=np.float32)
+                          for name in group.attrs["weight_names"]}
+                if kind == "Dense":
+                    activation = conf.get("activation", "linear")
+                    if activation not in ACTIVATIONS:
+                        raise ValueError(f"Desteklenmeyen aktivasyon: {activation}")
+                    bias = values.get("bias", np.zeros(conf["units"], dtype=np.float32))
+                    layers.append((values["kernel"], bias, activation))
+                elif kind == "BatchNormalization":
+                    # Keras ile aynı: x * gamma / sqrt(var + eps) + (beta - mean * inv)
+                    inv = 1.0 / np.sqrt(values["moving_variance"] + np.float32(conf["epsilon"]))
+                    if conf.get("scale", True):
+                        inv = inv * values["gamma"]
+                    shift = -values["moving_mean"] * inv
+                    if conf.get("center", True):
+                        shift = shift + values["beta"]
+                    layers.append((inv.astype(np.float32), shift.astype(np.float32), None))
+                else:
+                    raise ValueError(f"Desteklenmeyen katman: {kind}")
+        return cls(layers)
+
+    @classmethod
+    def load(cls, path):
+        """save() ile dışa aktarılmış .npz dosyasını yükle"""
+        with np.load(path) as data:
+            activations = [str(a) for a in data["activations"]]
+            layers = [(data[f"w{i}"], data[f"b{i}"], a or None)
+                      for i, a in enumerate(activations)]
+        return cls(layers)
+
+    def save(self, path):
+        """Ağırlıkları h5py gerektirmeyen tek bir .npz dosyasına aktar"""
+        arrays = {"activations": np.array([a or "" for _, _, a in self.layers])}
+        for i, (w, b, _) in enumerate(self.layers):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+        np.savez(path, **arrays)
+
+    def __call__(self, x):
+        """(n, giriş) matrisi için çıkış olasılıklarını döndür"""
+        x = np.asarray(x, dtype=np.float32)
+        for w, b, activation in self.layers:
+            if activation is None:
+                x = x * w + b
+            else:
+                x = ACTIVATIONS[activation](x @ w + b)
+        return x
+
+
+def load_numpy_model(path):
+    """.npz (dışa aktarılmış) ya da .h5 (Keras) dosyasından NumpyMLP yükle"""
+    if str(path).endswith(".npz"):
+        return NumpyMLP.load(path)
+    return NumpyMLP.from_h5(path)
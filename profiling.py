@@ -0,0 +1,215 @@
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Histogram kutuları: 0.01 ms ile 10 s arası logaritmik
+HISTOGRAM_EDGES_MS = np.logspace(-2, 4, 25)
+
+# Bellekte tutulan en fazla dosya kaydı ve aşama başına örnek sayısı
+MAX_FILE_RECORDS = 1000
+MAX_SAMPLES = 100_000
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start", "children", "mem_start", "child_peak", "locked")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.children = 0.0
+        self.child_peak = 0
+        # tracemalloc tepesi süreç geneldir: bellek ölçen en dış aşamalar
+        # iş parçacıkları arasında sıralanır, iç aşamalar kilidi devralır
+        self.locked = self.profiler.memory and not stack
+        if self.locked:
+            self.profiler._memory_lock.acquire()
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Üst aşamanın o ana kadarki tepesi sıfırlamadan önce saklanır
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        peak = None
+        if self.profiler.memory:
+            peak_abs = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak = peak_abs - self.mem_start
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak_abs)
+        if stack:
+            stack[-1].children += elapsed
+        if self.locked:
+            self.profiler._memory_lock.release()
+        # Süre dışlayıcıdır (iç aşamalar çıkarılır), tepe bellek kapsayıcıdır
+        self.profiler._record(self.name, (elapsed - self.children) * 1000, peak)
+        return False
+
+
+class _FileScope:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.owner = False
+
+    def __enter__(self):
+        local = self.profiler._local
+        if getattr(local, "record", None) is None:
+            local.record = {"file": self.name, "stages": {}}
+            self.owner = True
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.owner:
+            local = self.profiler._local
+            record, local.record = local.record, None
+            record["total_ms"] = (time.perf_counter() - self.start) * 1000
+            self.profiler.add_record(record, samples=False)
+        return False
+
+
+class Profiler:
+    """Özellik hattı için aşama başına süre ve tepe bellek kaydedici.
+
+    Kapalıyken stage() paylaşılan boş bir bağlam döndürür; maliyet tek bir
+    bayrak kontrolüdür. memory=True tracemalloc'u açar (belirgin ek yük);
+    tepe bellek süreç genelinde ölçüldüğü için bellek ölçülen aşamalar
+    iş parçacıkları arasında sıralanır. Aşama dışındaki eşzamanlı
+    ayırmalar yine de tepeye karışabilir. Süreler dışlayıcıdır: iç içe
+    aşamaların süresi üst aşamadan düşülür.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._memory_lock = threading.Lock()
+        self._own_tracing = False
+        self.reset()
+
+    def enable(self, memory=False):
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+        elif not memory and self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+        self.memory = memory
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.memory = False
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))  # aşama -> ms
+            self.peaks = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))    # aşama -> bayt
+            self.files = deque(maxlen=MAX_FILE_RECORDS)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name):
+        """Aşamayı ölçen bağlam yöneticisi (kapalıyken ölçüm yapılmaz)"""
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name)
+
+    def file(self, name):
+        """Bu bağlamdaki aşamaları name dosyasının kaydında topla (iç içe çağrılar birleşir)"""
+        if not self.enabled:
+            return _NULL
+        return _FileScope(self, name)
+
+    def _record(self, name, ms, peak):
+        with self._lock:
+            self.samples[name].append(ms)
+            if peak is not None:
+                self.peaks[name].append(peak)
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            stage = record["stages"].setdefault(name, {"ms": 0.0, "peak_bytes": None})
+            stage["ms"] += ms
+            if peak is not None:
+                stage["peak_bytes"] = max(stage["peak_bytes"] or 0, peak)
+
+    def add_record(self, record, samples=True):
+        """Dosya kaydını ekle; samples=True ise (işçi süreçten gelen) aşamalar da toplanır"""
+        with self._lock:
+            if samples:
+                for name, stage in record["stages"].items():
+                    self.samples[name].append(stage["ms"])
+                    if stage["peak_bytes"] is not None:
+                        self.peaks[name].append(stage["peak_bytes"])
+            self.files.append(record)
+
+    def take_record(self):
+        """İşçi süreçte: son tamamlanan dosya kaydını çıkarıp döndür"""
+        with self._lock:
+            return self.files.pop() if self.files else None
+
+    def summary(self):
+        """Aşama başına {count, total_ms, mean_ms, p50_ms, p90_ms, max_ms, peak_mb}"""
+        with self._lock:
+            samples = {name: np.asarray(values) for name, values in self.samples.items()}
+            peaks = {name: max(values) for name, values in self.peaks.items() if values}
+        out = {}
+        for name, values in samples.items():
+            out[name] = {
+                "count": len(values),
+                "total_ms": float(values.sum()),
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p90_ms": float(np.percentile(values, 90)),
+                "max_ms": float(values.max()),
+                "peak_mb": peaks[name] / 2**20 if name in peaks else None,
+            }
+        return out
+
+    def histograms(self, edges=HISTOGRAM_EDGES_MS):
+        """Aşama başına (sayımlar, kutu kenarları) süre histogramı"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        return {name: np.histogram(values, bins=edges) for name, values in samples.items()}
+
+    def file_records(self):
+        """Son MAX_FILE_RECORDS dosyanın {file, total_ms, stages} kayıtları"""
+        with self._lock:
+            return list(self.files)
+
+
+# Süreç genelinde paylaşılan profil kaydedici
+profiler = Profiler()
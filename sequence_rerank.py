@@ -0,0 +1,227 @@
+"""İki aşamalı benzerlik araması için çerçeve dizileri ve DTW yeniden sıralama.
+
+42 özet istatistik zarfın zamansal biçimini kaybeder; kuru bir snare ile
+odası uzun çınlayan bir snare aynı ortalamalara düşebilir. Hızlı 42 boyutlu
+arama en iyi M adayı seçer, ardından yalnızca bu adaylar çerçeve düzeyindeki
+MFCC dizileri üzerinde DTW uzaklığıyla yeniden sıralanır. Diziler ilk
+gerektiklerinde sesten hesaplanır ve float16 olarak önbelleğe alınır.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import librosa
+import numpy as np
+
+from feature_extractor import SR, N_FFT, N_MEL, RES_TYPE, load_signal
+from profiling import profiler
+
+SEQ_N_MFCC = 13
+SEQ_HOP_LENGTH = 512
+# Başlangıçtaki sessizlik bu eşikle kırpılır; kuyruk (çınlama) korunur
+SEQ_TOP_DB = 60
+# Dizi başına en fazla çerçeve (~3 s); DTW maliyeti çerçeve sayısının karesidir
+SEQ_MAX_FRAMES = 128
+
+# İkinci aşamaya giren aday sayısı (M)
+RERANK_CANDIDATES = 50
+
+
+def frame_sequence(signal, sr=SR):
+    """Sinyalin (çerçeve, SEQ_N_MFCC) float16 MFCC dizisi.
+
+    Mel gücü sesin tepesine göre dB'ye çevrilir: ses düzeyi farkları
+    elenir, c0 katsayısı zarfın sönümünü taşır.
+    """
+    signal = np.asarray(signal, dtype=np.float32)
+    if len(signal) == 0 or not np.any(signal):
+        return np.zeros((1, SEQ_N_MFCC), dtype=np.float16)
+    intervals = librosa.effects.split(signal, top_db=SEQ_TOP_DB,
+                                      frame_length=N_FFT, hop_length=SEQ_HOP_LENGTH)
+    start = int(intervals[0, 0]) if len(intervals) else 0
+    # Başlangıç kırpılır ama bitiş kırpılmaz: kuyruğun uzunluğu ayırt edicidir
+    signal = signal[start:start + (SEQ_MAX_FRAMES - 1) * SEQ_HOP_LENGTH]
+    mel = librosa.feature.melspectrogram(y=signal, sr=sr, n_fft=N_FFT,
+                                         hop_length=SEQ_HOP_LENGTH, n_mels=N_MEL)
+    mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel, ref=np.max), n_mfcc=SEQ_N_MFCC)
+    return mfcc.T.astype(np.float16)
+
+
+def sequence_from_source(source, res_type=RES_TYPE):
+    """Dosya yolu, bayt veya dosya benzeri nesnenin çerçeve dizisi"""
+    signal = load_signal(source, res_type)
+    with profiler.stage("sequence"):
+        return frame_sequence(signal)
+
+
+def dtw_distance(a, b):
+    """İki çerçeve dizisi arasındaki yol uzunluğuna göre normalize DTW uzaklığı"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    D = librosa.sequence.dtw(X=a.T, Y=b.T, metric="euclidean", backtrack=False)
+    return float(D[-1, -1]) / (len(a) + len(b))
+
+
+class SequenceCache:
+    """Dosya adıyla anahtarlanan, tembel hesaplanan çerçeve dizisi önbelleği.
+
+    Sesin kaynağı register() ile diske bırakılan özgün baytlardır; yoksa
+    loader(name) kaynağı (bayt ya da yol) veya None döndürür. Dizi yalnızca
+    ilk istendiğinde hesaplanır. Bellekte en fazla max_bytes tutulur,
+    aşılınca en uzun süredir kullanılmayanlar çıkarılır. Kaynak dizini
+    nesneyle birlikte silinir.
+    """
+
+    def __init__(self, loader=None, max_bytes=64 << 20, res_type=RES_TYPE, source_dir=None):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.res_type = res_type
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._sources = {}  # ad -> özgün baytların dosya yolu
+        self._lock = threading.Lock()
+        self._source_root = source_dir
+        self._source_dir = None
+        self._finalizer = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._items
+
+    def get(self, name):
+        """name'in dizisi; ses bulunamaz ya da çözülemezse None"""
+        with self._lock:
+            sequence = self._items.get(name)
+            if sequence is not None:
+                self._items.move_to_end(name)
+                self.hits += 1
+                return sequence
+            self.misses += 1
+            source = self._sources.get(name)
+        if source is None and self.loader is not None:
+            source = self.loader(name)
+        if source is None:
+            return None
+        try:
+            sequence = sequence_from_source(source, self.res_type)
+        except Exception:
+            return None
+        self.put(name, sequence)
+        return sequence
+
+    def _dir(self):
+        if self._source_dir is None:
+            self._source_dir = tempfile.mkdtemp(prefix="sequence_sources_", dir=self._source_root)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._source_dir, True)
+        return self._source_dir
+
+    def register(self, name, data, key=None):
+        """name'in özgün baytlarını diske bırak; dizi ilk get()'te hesaplanır.
+
+        Dinleme önbelleğine dokunulmaz, kayıplı dinleme kopyası da
+        kullanılmaz. key (içerik özeti) aynı içerikli dosyaların tek
+        kopyayı paylaşmasını sağlar. name'in eski dizisi çıkarılır.
+        """
+        key = key or hashlib.blake2b(data, digest_size=20).hexdigest()
+        with self._lock:
+            path = os.path.join(self._dir(), key)
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self._drop(name)
+            self._sources[name] = path
+
+    def put(self, name, sequence):
+        sequence = np.asarray(sequence, dtype=np.float16)
+        with self._lock:
+            old = self._items.pop(name, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self._items[name] = sequence
+            self.bytes += sequence.nbytes
+            while self.bytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.bytes -= evicted.nbytes
+
+    def _drop(self, name):
+        old = self._items.pop(name, None)
+        if old is not None:
+            self.bytes -= old.nbytes
+        path = self._sources.pop(name, None)
+        if path is not None and path not in self._sources.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def discard(self, name):
+        """name'in dizisini ve kayıtlı kaynağını unut"""
+        with self._lock:
+            self._drop(name)
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._items), "bytes": self.bytes,
+                    "sources": len(self._sources), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            for path in set(self._sources.values()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._sources.clear()
+            self._items.clear()
+            self.bytes = 0
+
+
+def rerank(candidates, query_sequence, sequences, top_k=5):
+    """find_similar_sounds adaylarını DTW uzaklığına göre yeniden sırala.
+
+    Her adaya 'dtw_distance' eklenir. Dizisi bulunamayan adaylar (ör. sesi
+    bu oturumda olmayan paylaşılan kütüphane satırları) ilk aşamadaki
+    yerlerinde kalır ve uzaklıkları None olur; dizisi olanlar yalnızca
+    kendi aralarında, kendi yerlerine DTW uzaklığına göre yerleşir.
+    """
+    ranked, scored = [], []
+    with profiler.stage("rerank"):
+        for candidate in candidates:
+            sequence = sequences.get(candidate['filename'])
+            if sequence is None:
+                ranked.append(dict(candidate, dtw_distance=None))
+            else:
+                ranked.append(None)
+                scored.append(dict(candidate, dtw_distance=dtw_distance(query_sequence, sequence)))
+    # Eşit uzaklıkta ilk aşama sırası korunur (sort kararlıdır)
+    scored.sort(key=lambda c: c['dtw_distance'])
+    scored = iter(scored)
+    return [next(scored) if c is None else c for c in ranked][:top_k]
+
+
+def two_stage_search(searcher, target_features, target_class, query_sequence, sequences,
+                     top_k=5, candidates=RERANK_CANDIDATES):
+    """Önce 42 boyutlu aramayla en iyi candidates adayı, sonra DTW ile top_k.
+
+    searcher, find_similar_sounds sunan AudioClassifier ya da LibraryView'dir.
+    query_sequence None ise yalnızca ilk aşama sonucu döner. DTW yalnızca
+    M aday için hesaplanır; kütüphanenin geri kalanı taranmaz.
+    """
+    first = searcher.find_similar_sounds(target_features, target_class,
+                                         top_k=max(candidates, top_k))
+    if query_sequence is None:
+        return first[:top_k]
+    return rerank(first, query_sequence, sequences, top_k)
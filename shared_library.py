@@ -0,0 +1,268 @@
+"""Oturumlar arasında paylaşılan referans kütüphanesi ve oturum katmanları.
+
+Okuma-kopyala-güncelle (RCU): okuyucular library.snapshot'ı bir kez okur
+ve o değişmez görünüm üzerinde kilitsiz arar. Yazıcılar kilit altında
+yeni bir görünüm kurup tek atamayla yayımlar; bir arama hiçbir zaman
+yarım güncellenmiş kütüphane görmez. Satır tamponları görünümler arasında
+paylaşılır, yani her yayım yalnızca yeni satırlar kadar iş yapar.
+
+Tipik kullanım: süreç başına bir paylaşılan SharedLibrary, oturum başına
+küçük bir SharedLibrary katmanı ve ikisini birleştiren LibraryView.
+"""
+import copy
+import threading
+
+import numpy as np
+
+from feature_extractor import FEATURE_NAMES
+from feature_store import ColumnStore
+from profiling import profiler
+from similarity_index import (ClassProjection, SimilarityIndex, duplicate_groups, DUPLICATE_BLOCK,
+                              SCORE_CHUNK)
+
+# İndeks birim vektörleri float32 tutar; en iyi adaylar sütunlardaki özgün
+# özelliklerle kesin olarak yeniden puanlandığı için sonuç kesin aramayla aynıdır
+LIBRARY_INDEX_STORAGE = "float32"
+
+
+class LibrarySnapshot:
+    """Kütüphanenin tek bir sürümdeki değişmez görünümü"""
+
+    __slots__ = ("version", "size", "index", "classes", "_features", "_codes", "_table")
+
+    def __init__(self, version, index, features, codes, classes, table):
+        self.version = version
+        self.size = len(codes)
+        self.index = index
+        self.classes = classes
+        self._features = features
+        self._codes = codes
+        # Yalnızca eklenen sütunlu depo; ilk size satırı bu görünüme aittir
+        self._table = table
+
+    def __len__(self):
+        return self.size
+
+    def filename(self, row):
+        # Kalıcı depoda ad istendiğinde diskten okunur
+        return self._table.filename(row)
+
+    def row(self, row):
+        """reference_database ile aynı {'filename', 'class', 'features'} sözlüğü"""
+        return {
+            'filename': self.filename(row),
+            'class': self.classes[self._codes[row]],
+            'features': np.asarray(self._features[row], dtype=np.float64),
+        }
+
+
+class SharedLibrary:
+    """Eşzamanlı okunan, eklenebilir referans kütüphanesi.
+
+    Okuyucular snapshot özniteliğini kullanır ve kilit almaz; add/extend
+    yazıcıları kendi aralarında kilitle sıralanır. store verilirse
+    (FeatureStore) indeks açılışta bellek eşlemli sütunlardan parça parça
+    kurulur, dosya adları yalnızca istendiğinde okunur ve eklemeler kalıcı
+    olur. quantization indeksteki birim vektörlerin biçimidir
+    (SimilarityIndex); aramalar her zaman sütunlardaki özgün özelliklerle
+    kesinleştirilir. reference_database ile aynı append/extend arayüzünü sunar.
+    """
+
+    def __init__(self, dim=len(FEATURE_NAMES), store=None, n_probe=None,
+                 quantization=LIBRARY_INDEX_STORAGE):
+        self.dim = dim
+        self.store = store
+        self.n_probe = n_probe
+        self.quantization = quantization
+        self._lock = threading.Lock()
+        self._pca_lock = threading.Lock()
+        self.snapshot = self._reset(version=0)
+        if store is not None and len(store):
+            # Yayımlanmamış indekse parça parça eklenir; float64 kopyası kurulmaz
+            index = self.snapshot.index
+            for start in range(0, len(store), SCORE_CHUNK):
+                index.add_coded(*store.coded_columns(start, start + SCORE_CHUNK))
+            self.snapshot = LibrarySnapshot(1, index, store.features, store.class_codes,
+                                            tuple(store.classes), store)
+
+    def _reset(self, version):
+        """Yeni boş sütunlar kur ve onlara ait boş görünümü döndür (yayımlamaz)"""
+        # Sütun tamponları büyürken yenisi ayrılır; eski görünümler eskisini tutar
+        self._table = self.store if self.store is not None else ColumnStore(dim=self.dim)
+        self._projections = {}
+        index = SimilarityIndex(self.dim, n_probe=self.n_probe, quantization=self.quantization)
+        return LibrarySnapshot(version, index, self._table.features, self._table.class_codes,
+                               tuple(self._table.classes), self._table)
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def _publish(self, base, features, codes):
+        """Kilit altında: base'in indeksini genişlet ve yeni görünümü tek atamayla yayımla"""
+        classes = tuple(self._table.classes)
+        index = base.index.extended(features, codes, classes)
+        self.snapshot = LibrarySnapshot(base.version + 1, index, self._table.features,
+                                        self._table.class_codes, classes, self._table)
+
+    def add(self, features, classes, filenames):
+        """Satırları sütun olarak ekle ve yayımla; yeni sürümü döndür"""
+        features = np.asarray(features, dtype=np.float64).reshape(-1, self.dim)
+        classes = [str(c) for c in classes]
+        filenames = [str(name) for name in filenames]
+        if not (len(features) == len(classes) == len(filenames)):
+            raise ValueError("features, classes ve filenames aynı uzunlukta olmalı")
+        with self._lock:
+            if len(features) == 0:
+                return self.snapshot.version
+            base = self.snapshot
+            self._table.append_rows(features, classes, filenames)
+            self._publish(base, features, self._table.class_codes[base.size:])
+            return self.snapshot.version
+
+    def append(self, ref):
+        """reference_database.append ile uyumlu tek satır ekleme"""
+        self.extend([ref])
+
+    def extend(self, refs):
+        """reference_database.extend ile uyumlu toplu ekleme (tek yayım)"""
+        refs = list(refs)
+        self.add(np.array([ref['features'] for ref in refs]).reshape(-1, self.dim),
+                 [ref['class'] for ref in refs], [ref['filename'] for ref in refs])
+
+    def remove(self, filenames):
+        """Adı verilen satırları çıkar.
+
+        Kütüphane baştan kurulur; oturum katmanları gibi küçük kütüphaneler
+        içindir. Kalıcı depodan satır silinmez.
+        """
+        if self.store is not None:
+            raise PermissionError("Kalıcı depodan satır silinemez")
+        filenames = set(filenames)
+        with self._lock:
+            old = self.snapshot
+            keep = [row for row in range(old.size) if old.filename(row) not in filenames]
+            if len(keep) == old.size:
+                return old.version
+            features = old._features[keep]
+            classes = [old.classes[code] for code in old._codes[keep]]
+            names = [old.filename(row) for row in keep]
+            # Yeni sütunlar kurulurken okuyucular eski görünümü görmeye devam eder
+            base = self._reset(version=old.version)
+            self._table.append_rows(features, classes, names)
+            self._publish(base, features, self._table.class_codes)
+            return self.snapshot.version
+
+    def projection(self, snapshot, class_name):
+        """Sınıfın snapshot'taki PCA projeksiyonunun kopyası (2'den az satır varsa None).
+
+        Projeksiyonlar tüm okuyucular için bir kez eğitilir ve artımlı
+        güncellenir; güncelleme kilit altındadır, dönen kopya sonradan değişmez.
+        """
+        features, _ = snapshot.index.class_features(class_name)
+        if len(features) < 2:
+            return None
+        with self._pca_lock:
+            projection = self._projections.setdefault(class_name, ClassProjection())
+            projection.update(features, snapshot.version)
+            frozen = copy.copy(projection)
+            frozen.pca = copy.deepcopy(projection.pca)
+        return frozen
+
+
+class LibraryView:
+    """Paylaşılan kütüphane ile oturum katmanının birleşik, tutarlı görünümü.
+
+    Her iki görünüm oluşturulurken bir kez okunur; aynı görünümle yapılan
+    tüm aramalar aynı sürümleri görür.
+    """
+
+    def __init__(self, shared, overlay):
+        self.libraries = (shared, overlay)
+        self.snapshots = (shared.snapshot, overlay.snapshot)
+
+    @property
+    def version(self):
+        return tuple(snapshot.version for snapshot in self.snapshots)
+
+    def __len__(self):
+        return sum(len(snapshot) for snapshot in self.snapshots)
+
+    def find_similar_sounds(self, target_features, target_class, top_k=5):
+        """AudioClassifier.find_similar_sounds ile aynı çıktı, iki kütüphaneden birleşik"""
+        target_class = str(target_class)
+        candidates = []
+        with profiler.stage("similarity"):
+            for snapshot in self.snapshots:
+                rows, cos_sims, euc_dists = snapshot.index.query(target_features, target_class, top_k,
+                                                                 exact=snapshot._features)
+                candidates.extend(zip(cos_sims, euc_dists, [snapshot] * len(rows), rows))
+        # Eşit skorlarda paylaşılan kütüphane ve ekleme sırası önce gelir
+        candidates.sort(key=lambda c: -c[0])
+
+        similarities = []
+        for cos_sim, euc_dist, snapshot, row in candidates[:top_k]:
+            ref = snapshot.row(row)
+            similarities.append({
+                'filename': ref['filename'],
+                'class': ref['class'],
+                'cosine_similarity': cos_sim,
+                'euclidean_distance': euc_dist,
+                'features': ref['features']
+            })
+        return similarities
+
+    def get_pca_visualization_data(self, target_features, target_class):
+        """AudioClassifier.get_pca_visualization_data ile aynı çıktı.
+
+        Eksenler sınıfında en az 2 satır olan ilk kütüphaneden (önce paylaşılan)
+        eğitilir; diğer kütüphanenin satırları ve hedef bu eksenlere yansıtılır.
+        """
+        target_class = str(target_class)
+        parts = [(library, snapshot, snapshot.index.class_features(target_class))
+                 for library, snapshot in zip(self.libraries, self.snapshots)]
+        if sum(len(rows) for _, _, (_, rows) in parts) < 2:
+            return None, None, None, None
+
+        base = next((part for part in parts if len(part[2][1]) >= 2), None)
+        with profiler.stage("pca"):
+            if base is not None:
+                projection = base[0].projection(base[1], target_class)
+            else:
+                # İki kütüphanede de birer satır: önbelleksiz küçük eğitim
+                projection = ClassProjection()
+                projection.update(np.vstack([features for _, _, (features, _) in parts]), 0)
+
+        coords = [projection.coords] if base is None else []
+        names = []
+        for part in parts:
+            _, snapshot, (features, rows) = part
+            if base is not None and len(rows):
+                coords.append(projection.coords if part is base else projection.project(features))
+            names.extend(snapshot.filename(row) for row in rows)
+        coords.append(projection.project(target_features))
+        names.append('Yüklenen Ses')
+
+        pca = projection.pca
+        return np.vstack(coords), names, pca.explained_variance_ratio_, pca
+
+    def find_duplicates(self, threshold=0.99, block_size=DUPLICATE_BLOCK):
+        """AudioClassifier.find_duplicates ile aynı çıktı; kümeler iki kütüphaneyi kapsayabilir"""
+        clusters = []
+        class_names = {name for snapshot in self.snapshots for name in snapshot.index.blocks}
+        with profiler.stage("duplicates"):
+            for class_name in sorted(class_names):
+                parts = [(snapshot, *snapshot.index.class_unit(class_name))
+                         for snapshot in self.snapshots]
+                parts = [part for part in parts if len(part[2])]
+                names = [snapshot.filename(row) for snapshot, _, rows in parts for row in rows]
+                # Parçalar birleştirilmeden karolar halinde karşılaştırılır
+                units = [unit for _, unit, _ in parts]
+                for members, lowest, highest in duplicate_groups(units, threshold, block_size):
+                    clusters.append({
+                        'class': class_name,
+                        'files': [names[i] for i in members],
+                        'min_similarity': lowest,
+                        'max_similarity': highest
+                    })
+        clusters.sort(key=lambda c: -len(c['files']))
+        return clusters
@@ -0,0 +1,466 @@
+import copy
+
+import numpy as np
+
+# Sınıf matrisleri bu kapasiteyle başlar ve dolunca iki katına çıkar
+INITIAL_CAPACITY = 64
+
+# Yaklaşık arama (IVF) ayarları
+ANN_MIN_ROWS = 10_000      # daha küçük sınıflarda kesin tarama zaten hızlı
+ANN_TRAIN_PER_LIST = 64    # k-means eğitiminde liste başına örnek sayısı
+ANN_KMEANS_ITER = 10
+ASSIGN_CHUNK = 65_536
+
+# Sıkıştırılmış birim vektör biçimleri (None: kesin float64)
+QUANTIZATIONS = (None, "float32", "float16", "int8")
+# Sıkıştırılmış satırlar bu kadarlık parçalar halinde float32'ye çözülerek puanlanır
+SCORE_CHUNK = 65_536
+# Kesin yeniden puanlamada top_k'nin kaç katı aday özgün özelliklerle yeniden hesaplanır
+EXACT_RERANK_FACTOR = 4
+
+# Yinelenen taraması: karo kenarı (tepe ek bellek ~8 * blok² bayt) ve çift sınırı
+DUPLICATE_BLOCK = 2048
+MAX_DUPLICATE_PAIRS = 20_000_000
+
+
+def _nearest_centroid(unit, centroids):
+    """Satırları iç çarpımı en yüksek merkeze ata (parçalar halinde)"""
+    out = np.empty(len(unit), dtype=np.int64)
+    for start in range(0, len(unit), ASSIGN_CHUNK):
+        out[start:start + ASSIGN_CHUNK] = np.argmax(
+            unit[start:start + ASSIGN_CHUNK] @ centroids.T, axis=1)
+    return out
+
+
+def _spherical_kmeans(unit, n_lists, rng):
+    """Birim vektörler üzerinde basit küresel k-means (Lloyd)"""
+    centroids = unit[rng.choice(len(unit), n_lists, replace=False)].copy()
+    for _ in range(ANN_KMEANS_ITER):
+        assign = _nearest_centroid(unit, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, unit)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Boş kalan listeler rastgele bir satırla yeniden tohumlanır
+        sums[empty] = unit[rng.choice(len(unit), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms[:, None]
+    return centroids
+
+
+def duplicate_groups(unit, threshold, block_size=DUPLICATE_BLOCK, max_pairs=MAX_DUPLICATE_PAIRS):
+    """Kosinüs benzerliği threshold'a ulaşan satırların bağlı bileşenleri.
+
+    unit birim vektörlerdir (dizi ya da SimilarityIndex.class_unit'in
+    tembel görünümü); art arda gelmiş tek matris gibi taranan bunların
+    listesi de olabilir (parçalar birleştirilmez). Tüm çiftler block_size x
+    block_size float32 karolar halinde matris çarpımıyla taranır; her karo
+    ancak kullanılırken dilimlenip çözülür, bellek satır sayısıyla değil
+    karo boyutuyla sınırlıdır. En az iki üyeli her grup için (sıralı
+    satırlar, en düşük ve en yüksek kenar benzerliği) döndürür; satırlar
+    parçaların art arda numaralandırılmasıdır.
+    """
+    parts = list(unit) if isinstance(unit, (list, tuple)) else [unit]
+    # (parça, parça içi başlangıç, genel başlangıç) karoları
+    tiles = []
+    n = 0
+    for part in parts:
+        tiles.extend((part, start, n + start) for start in range(0, len(part), block_size))
+        n += len(part)
+    firsts, seconds, sims = [], [], []
+    n_pairs = 0
+    for t, (part_a, start_a, a) in enumerate(tiles):
+        rows = np.asarray(part_a[start_a:start_a + block_size], dtype=np.float32)
+        for part_b, start_b, b in tiles[t:]:
+            tile = rows @ np.asarray(part_b[start_b:start_b + block_size], dtype=np.float32).T
+            i, j = np.nonzero(tile >= threshold)
+            if a == b:
+                upper = i < j
+                i, j = i[upper], j[upper]
+            if len(i):
+                n_pairs += len(i)
+                if n_pairs > max_pairs:
+                    raise ValueError(f"{max_pairs} çiftten fazla eşleşme; eşik ({threshold}) çok düşük")
+                firsts.append(i + a)
+                seconds.append(j + b)
+                sims.append(tile[i, j])
+    if not firsts:
+        return []
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    i, j, sims = np.concatenate(firsts), np.concatenate(seconds), np.concatenate(sims)
+    _, labels = connected_components(coo_matrix((np.ones(len(i), dtype=np.int8), (i, j)),
+                                                shape=(n, n)), directed=False)
+    edge_labels = labels[i]
+    lowest = np.full(labels.max() + 1, np.inf)
+    highest = np.full(labels.max() + 1, -np.inf)
+    np.minimum.at(lowest, edge_labels, sims)
+    np.maximum.at(highest, edge_labels, sims)
+
+    order = np.argsort(labels, kind="stable")
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    groups = []
+    for members in np.split(order, bounds):
+        if len(members) > 1:
+            label = labels[members[0]]
+            groups.append((members, float(lowest[label]), float(highest[label])))
+    return groups
+
+
+class _IVFLists:
+    """Ters dosya (IVF) listeleri: satırlar en yakın k-means merkezine bağlanır"""
+
+    def __init__(self, unit, seed):
+        n = len(unit)
+        n_lists = max(1, int(round(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = unit[rng.choice(n, min(n, ANN_TRAIN_PER_LIST * n_lists), replace=False)]
+        self.centroids = _spherical_kmeans(sample, n_lists, rng)
+        assign = _nearest_centroid(unit, self.centroids)
+
+        # CSR düzeni: liste l'nin satırları order[offsets[l]:offsets[l + 1]]
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        self.trained_size = n
+        self.assigned = n
+        # Eğitimden sonra eklenen satırlar bir sonraki eğitime kadar burada
+        self.pending_rows = np.empty(0, dtype=np.int64)
+        self.pending_lists = np.empty(0, dtype=np.int64)
+
+    def added(self, unit, start):
+        """Yeni satırlar atanmış kopya; eşzamanlı okuyucular eski nesneyi kullanmaya devam eder"""
+        new = copy.copy(self)
+        rows = np.arange(start, start + len(unit))
+        new.pending_rows = np.concatenate([self.pending_rows, rows])
+        new.pending_lists = np.concatenate([self.pending_lists,
+                                            _nearest_centroid(unit, self.centroids)])
+        new.assigned = start + len(unit)
+        return new
+
+    def candidates(self, q_unit, n_probe):
+        """Sorguya en yakın n_probe listedeki satırları döndür"""
+        n_probe = min(n_probe, len(self.centroids))
+        scores = self.centroids @ q_unit
+        probed = np.argpartition(-scores, n_probe - 1)[:n_probe]
+        parts = [self.order[self.offsets[l]:self.offsets[l + 1]] for l in probed]
+        if len(self.pending_rows):
+            parts.append(self.pending_rows[np.isin(self.pending_lists, probed)])
+        return np.concatenate(parts)
+
+
+def _top_positions(scores, top_k):
+    """En yüksek top_k skorun konumları; eşit skorlarda küçük konum önce"""
+    if top_k < len(scores):
+        # argpartition sınırdaki eşitlerden rastgele seçer; eşit skorlu
+        # satırlardan yalnızca ilk gelenler alınır
+        kth = -np.partition(-scores, top_k - 1)[top_k - 1]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:top_k - len(above)]
+        top = np.sort(np.concatenate([above, ties]))
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class _UnitRows:
+    """Sınıf bloğunun birim vektörleri; dilimlenince yalnızca o satırlar çözülür"""
+
+    def __init__(self, block):
+        self.block = block
+        self.size = block.size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, idx):
+        return self.block.decode(slice(*idx.indices(self.size)))
+
+
+class _ClassBlock:
+    """Tek bir sınıfın bitişik özellik matrisi ve ön hesaplanmış normları.
+
+    quantization verilirse yalnızca birim vektörler sıkıştırılmış tutulur:
+    "float32" satır başına 168 bayt, "float16" 84 bayt, "int8" ölçekli
+    46 bayt (kesin modda özellikler + birim vektörler 672 bayt). Özellikler
+    gerektiğinde birim vektör ve normdan geri kurulur.
+    """
+
+    def __init__(self, dim, quantization=None):
+        self.quantization = quantization
+        unit_dtype = {None: np.float64, "float32": np.float32,
+                      "float16": np.float16, "int8": np.int8}[quantization]
+        self.unit = np.empty((INITIAL_CAPACITY, dim), dtype=unit_dtype)
+        self.norms = np.empty(INITIAL_CAPACITY)
+        self.row_ids = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        buffers = ["unit", "norms", "row_ids"]
+        if quantization is None:
+            self.features = np.empty((INITIAL_CAPACITY, dim))
+            buffers.append("features")
+        elif quantization == "int8":
+            # Satır başına simetrik ölçek: satırlar eklendikten sonra yeniden nicemlenmez
+            self.scales = np.empty(INITIAL_CAPACITY, dtype=np.float32)
+            buffers.append("scales")
+        self._buffers = tuple(buffers)
+        self.size = 0
+        self.ivf = None
+
+    @property
+    def rows(self):
+        """reference_database içindeki satır numaraları"""
+        return self.row_ids[:self.size]
+
+    def _grow(self, needed):
+        capacity = len(self.norms)
+        while capacity < needed:
+            capacity *= 2
+        for name in self._buffers:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, features, rows):
+        n = len(features)
+        if self.size + n > len(self.norms):
+            self._grow(self.size + n)
+        norms = np.linalg.norm(features, axis=1)
+        # Sıfır vektörlerin kosinüs benzerliği 0 olur (sklearn ile aynı)
+        inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        end = self.size + n
+        unit = features * inv[:, None]
+        if self.quantization is None:
+            self.features[self.size:end] = features
+            self.unit[self.size:end] = unit
+        elif self.quantization in ("float32", "float16"):
+            self.unit[self.size:end] = unit
+        else:
+            peak = np.abs(unit).max(axis=1)
+            scale = (peak / 127.0).astype(np.float32)
+            inv_scale = np.divide(1.0, scale, out=np.zeros(n), where=scale > 0)
+            self.unit[self.size:end] = np.rint(unit * inv_scale[:, None])
+            self.scales[self.size:end] = scale
+        self.norms[self.size:end] = norms
+        self.row_ids[self.size:end] = rows
+        self.size = end
+
+    def decode(self, idx):
+        """idx (dilim ya da konum dizisi) satırlarının birim vektörleri.
+
+        Kesin modda float64, sıkıştırılmış modda float32; dilimler kesin ve
+        float32 modda kopyasız görünümdür.
+        """
+        unit = self.unit[idx]
+        if self.quantization in (None, "float32"):
+            return unit
+        unit = unit.astype(np.float32)
+        if self.quantization == "int8":
+            unit *= self.scales[idx][:, None]
+        return unit
+
+    def class_features(self):
+        """Özellik matrisi; sıkıştırılmış modda birim vektör x normdan geri kurulur"""
+        if self.quantization is None:
+            return self.features[:self.size]
+        return self.decode(slice(0, self.size)).astype(np.float64) * self.norms[:self.size, None]
+
+    def cosines(self, q_unit, positions=None):
+        """Sorgu birim vektörüyle kosinüs benzerlikleri (positions None ise tüm satırlar).
+
+        Sıkıştırılmış satırlar SCORE_CHUNK'lık parçalar halinde çözülür;
+        bloğun tam float kopyası hiç kurulmaz.
+        """
+        if self.quantization is None:
+            unit = self.unit[:self.size] if positions is None else self.unit[positions]
+            return unit @ q_unit
+        n = self.size if positions is None else len(positions)
+        q = q_unit.astype(np.float32)
+        out = np.empty(n)
+        for start in range(0, n, SCORE_CHUNK):
+            stop = min(start + SCORE_CHUNK, n)
+            part = slice(start, stop) if positions is None else positions[start:stop]
+            out[start:stop] = self.decode(part) @ q
+        return out
+
+    def ivf_lists(self, seed):
+        """IVF listelerini döndür; boyut eğitimdekinin iki katına çıkınca yeniden eğit.
+
+        Listeler yerinde değiştirilmez, yenisi atanır; aynı bloğu sorgulayan
+        iş parçacıkları en kötü ihtimalle aynı işi iki kez yapar.
+        """
+        ivf, size = self.ivf, self.size
+        if ivf is None or size >= 2 * ivf.trained_size:
+            ivf = self.ivf = _IVFLists(self.decode(slice(0, size)), seed)
+        elif ivf.assigned < size:
+            ivf = self.ivf = ivf.added(self.decode(slice(ivf.assigned, size)), ivf.assigned)
+        return ivf
+
+
+class SimilarityIndex:
+    """Sınıf başına kosinüs/öklid araması yapan dizi tabanlı indeks.
+
+    n_probe verilirse ANN_MIN_ROWS satırdan büyük sınıflarda IVF ile
+    yaklaşık arama yapılır; daha çok liste taramak isabeti artırır.
+    quantization ("float32", "float16" ya da "int8") birim vektörleri
+    sıkıştırılmış tutar ve benzerlikleri doğrudan bu biçimden hesaplar; query'ye özgün
+    özellikler (exact) verilirse en iyi adaylar onlarla yeniden puanlanır.
+    """
+
+    def __init__(self, dim, n_probe=None, min_ann_rows=ANN_MIN_ROWS, seed=0,
+                 quantization=None, rerank_factor=EXACT_RERANK_FACTOR):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Bilinmeyen sıkıştırma: {quantization} "
+                             f"(seçenekler: {', '.join(map(str, QUANTIZATIONS))})")
+        self.dim = dim
+        self.n_probe = n_probe
+        self.min_ann_rows = min_ann_rows
+        self.seed = seed
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.blocks = {}
+        self.size = 0
+        # Her eklemede artar; türetilmiş görünümler (PCA vb.) bununla geçersizleşir
+        self.version = 0
+
+    def add(self, features, classes):
+        """Satırları (n, dim) matris ve sınıf listesi olarak ekle"""
+        class_names, codes = np.unique(np.asarray(classes), return_inverse=True)
+        self.add_coded(features, codes, class_names)
+
+    def add_coded(self, features, codes, class_names, _copy_blocks=False):
+        """Satırları tamsayı sınıf kodlarıyla ekle (class_names[kod] = sınıf)"""
+        features = np.asarray(features, dtype=np.float64).reshape(-1, self.dim)
+        codes = np.asarray(codes)
+        rows = np.arange(self.size, self.size + len(features))
+        for code in np.unique(codes):
+            mask = codes == code
+            class_name = class_names[code]
+            block = self.blocks.get(class_name)
+            if block is None:
+                block = self.blocks[class_name] = _ClassBlock(self.dim, self.quantization)
+            elif _copy_blocks:
+                block = self.blocks[class_name] = copy.copy(block)
+            block.append(features[mask], rows[mask])
+        self.size += len(features)
+        self.version += 1
+
+    def extended(self, features, codes, class_names):
+        """Satırlar eklenmiş yeni indeks döndür; self değişmez (okuma-kopyala-güncelle).
+
+        Sınıf tamponları paylaşılır: yeni satırlar eski görünümlerin boyutunun
+        ötesine yazılır, tampon dolarsa yenisi ayrılır. Bu yüzden eski indeksi
+        sorgulayan okuyucular kilitsiz çalışmaya devam eder. Yalnızca en son
+        indeks genişletilmeli ve yazıcılar kendi aralarında sıralanmalıdır.
+        """
+        new = copy.copy(self)
+        new.blocks = dict(self.blocks)
+        new.add_coded(features, codes, class_names, _copy_blocks=True)
+        return new
+
+    def class_features(self, class_name):
+        """Sınıfın (özellik matrisi, satır numaraları) görünümü"""
+        block = self.blocks.get(class_name)
+        if block is None:
+            return np.empty((0, self.dim)), []
+        return block.class_features(), block.rows
+
+    def class_unit(self, class_name):
+        """Sınıfın (birim vektörler, satır numaraları) görünümü.
+
+        Birim vektörler dilimlenebilir tembel bir görünümdür; sıkıştırılmış
+        modda sınıfın tamamı değil yalnızca istenen dilim çözülür.
+        """
+        block = self.blocks.get(class_name)
+        if block is None:
+            return np.empty((0, self.dim)), np.empty(0, dtype=np.int64)
+        return _UnitRows(block), block.rows
+
+    def class_size(self, class_name):
+        block = self.blocks.get(class_name)
+        return 0 if block is None else block.size
+
+    def query(self, target_features, target_class, top_k=5, n_probe=None, exact=None):
+        """En benzer top_k satırı döndür: (satırlar, kosinüs, öklid).
+
+        exact, satır numarasıyla indekslenen özgün özellik matrisidir
+        (reference_database.features). Sıkıştırılmış indekste verilirse
+        yaklaşık puanlamadaki ilk top_k * rerank_factor aday bununla
+        kesin olarak yeniden puanlanır.
+        """
+        block = self.blocks.get(target_class)
+        if block is None or block.size == 0 or top_k <= 0:
+            return [], np.empty(0), np.empty(0)
+
+        q = np.asarray(target_features, dtype=np.float64).ravel()
+        q_norm = np.linalg.norm(q)
+        q_unit = q / q_norm if q_norm > 0 else np.zeros_like(q)
+
+        n_probe = self.n_probe if n_probe is None else n_probe
+        if n_probe and block.size >= self.min_ann_rows:
+            candidates = np.sort(block.ivf_lists(self.seed).candidates(q_unit, n_probe))
+        else:
+            candidates = None
+
+        # Tek matris-vektör çarpımı; öklid mesafesi aynı çarpımdan türetilir
+        cos = block.cosines(q_unit, candidates)
+        rescore = exact is not None and block.quantization is not None and self.rerank_factor
+        # Eşit skorlarda ekleme sırası korunur
+        top = _top_positions(cos, top_k * self.rerank_factor if rescore else top_k)
+        idx = top if candidates is None else candidates[top]
+        if rescore:
+            idx = np.sort(idx)
+            features = np.asarray(exact[block.row_ids[idx]], dtype=np.float64)
+            norms = np.linalg.norm(features, axis=1)
+            inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+            cos = (features * inv[:, None]) @ q_unit
+            top = _top_positions(cos, top_k)
+            idx, norms = idx[top], norms[top]
+        else:
+            norms = block.norms[idx]
+        dot = cos[top] * norms * q_norm
+        euc = np.sqrt(np.maximum(norms ** 2 + q_norm ** 2 - 2.0 * dot, 0.0))
+        rows = block.row_ids[idx].tolist()
+        return rows, cos[top], euc
+
+
+class ClassProjection:
+    """Tek sınıfın 2B PCA projeksiyonu.
+
+    Yeni satırlar partial_fit ile artımlı öğrenilir; sınıf son tam
+    eğitimdekinin iki katına çıkınca sapma birikmesin diye yeniden eğitilir.
+    Öğrenilmiş satırların ortalaması ya da varyansı artık tutmuyorsa
+    (satırlar değiştirildi ya da silindi) de baştan eğitilir.
+    Referans koordinatları kütüphane sürümü değişene kadar saklanır.
+    """
+
+    def __init__(self):
+        self.pca = None
+        self.fitted = 0
+        self.trained_size = 0
+        self.version = None
+        self.coords = None
+
+    def update(self, features, version):
+        if self.version == version:
+            return
+        from sklearn.decomposition import IncrementalPCA
+        n = len(features)
+        if (self.pca is None or n < self.fitted or n >= 2 * self.trained_size
+                or not self._fits(features[:self.fitted])):
+            self.pca = IncrementalPCA(n_components=2).partial_fit(features)
+            self.fitted = self.trained_size = n
+        elif n > self.fitted:
+            self.pca.partial_fit(features[self.fitted:])
+            self.fitted = n
+        self.coords = self.pca.transform(features)
+        self.version = version
+
+    def _fits(self, seen):
+        """seen, pca'nın öğrendiği satırlarla aynı ortalama ve varyansa sahip mi"""
+        return (np.allclose(seen.mean(axis=0), self.pca.mean_)
+                and np.allclose(seen.var(axis=0), self.pca.var_))
+
+    def project(self, features):
+        """Satırları mevcut eksenlere yansıt (yalnızca 42x2'lik bir çarpım)"""
+        features = np.asarray(features, dtype=np.float64).reshape(-1, self.pca.components_.shape[1])
+        return (features - self.pca.mean_) @ self.pca.components_.T
@@ -0,0 +1,301 @@
+import io
+
+import numpy as np
+import librosa
+import scipy.fft
+import soundfile as sf
+import soxr
+
+from feature_extractor import (SR, N_FFT, HOP_LENGTH, N_MEL, N_MFCC, ROLL_PERCENT, EPS,
+                               RES_TYPE, ZCR_THRESHOLD, extract_features,
+                               hpss_separate, log_attack_features, _contrast_peak_valley)
+
+# Akış modunda bir seferde çözülüp işlenen ses uzunluğu
+STREAM_BLOCK_SECONDS = 10.0
+# HPSS medyan süzgeci için blok kenarlarında tutulan bağlam
+HPSS_CONTEXT_SECONDS = 2.0
+# Başlangıç vuruşu: genliği bu seviyeyi (dBFS) aşan ilk örnek
+ONSET_THRESHOLD_DB = -40.0
+TOP_DB = 80.0
+
+# onset_strength merkezleme kaydırmaları (lag + n_fft // (2 * hop))
+FLUX_PAD = 1 + 2048 // (2 * HOP_LENGTH)
+ONSET_PAD = 1 + N_FFT // (2 * HOP_LENGTH)
+
+
+def stream_signal(source, res_type=RES_TYPE, block_seconds=STREAM_BLOCK_SECONDS,
+                  max_seconds=None):
+    """Sesi bloklar halinde çöz, mono yap ve SR'ye akışlı olarak yeniden örnekle"""
+    if not res_type.startswith("soxr"):
+        raise ValueError(f"Akış modu yalnızca soxr yeniden örnekleyicilerini destekler: {res_type}")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'getvalue'):
+        source = io.BytesIO(source.getvalue())
+
+    with sf.SoundFile(source) as f:
+        sr_native = f.samplerate
+        resampler = None
+        if sr_native != SR:
+            resampler = soxr.ResampleStream(sr_native, SR, 1, dtype='float32', quality=res_type)
+        limit = None if max_seconds is None else int(max_seconds * sr_native)
+        read = 0
+        for block in f.blocks(blocksize=int(block_seconds * sr_native), dtype='float32',
+                              always_2d=True):
+            if limit is not None:
+                block = block[:limit - read]
+            read += len(block)
+            last = limit is not None and read >= limit
+            # librosa.to_mono ile aynı: kanalların ortalaması
+            y = block.mean(axis=1)
+            if resampler is not None:
+                y = resampler.resample_chunk(y, last=last)
+            if len(y):
+                yield y
+            if last:
+                return
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if len(tail):
+                yield tail
+
+
+def _clamped_db(x, peak):
+    """power_to_db, top_db eşiği o ana kadarki en yüksek değere göre"""
+    db = 10.0 * np.log10(np.maximum(1e-10, x))
+    peak = max(peak, float(db.max()))
+    return np.maximum(db, peak - TOP_DB), peak
+
+
+class StreamingExtractor:
+    """Sinyali bloklar halinde alıp 42 özelliğin istatistiklerini biriktirir.
+
+    İlk blok dolmadan biten (kısa) sinyaller extract_features ile tam
+    hesaplanır. Uzun sinyallerde bellek blok boyutuyla sınırlıdır; yalnızca
+    kare başına birer değer olan flux/onset zarfları tutulur. dB tabanlı
+    özelliklerin top_db eşiği akan en yüksek değerle uygulanır ve HPSS blok
+    kenarlarında bağlamla hesaplanır; bu nedenle sonuç tam sinyaldekine çok
+    yakın ama birebir aynı değildir.
+    """
+
+    def __init__(self, sr=SR, block_seconds=STREAM_BLOCK_SECONDS):
+        self.sr = sr
+        self.block_len = int(block_seconds * sr)
+        self.context = int(HPSS_CONTEXT_SECONDS * sr)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT, n_mels=N_MEL)
+        self._head = []
+        self._head_len = 0
+        self._streaming = False
+
+    # Besleme
+
+    def feed(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if not len(chunk):
+            return
+        if self._streaming:
+            self._append(chunk)
+            self._drain(final=False)
+            return
+        self._head.append(chunk)
+        self._head_len += len(chunk)
+        if self._head_len >= self.block_len:
+            self._start(np.concatenate(self._head))
+            self._head = None
+
+    def _start(self, y):
+        self._streaming = True
+        half = N_FFT // 2
+        # STFT için sabit (sıfır), ZCR için kenar dolgusu (librosa ile aynı)
+        self._zbuf = np.concatenate([np.zeros(half, dtype=np.float32), y])
+        self._ebuf = np.concatenate([np.full(half, y[0], dtype=np.float32), y])
+        self._hbuf = y
+        self._h_left = 0
+        self.n_samples = len(y)
+        self._last = y[-1]
+
+        self.n_frames = 0
+        self._mel_db_sum = np.zeros(N_MEL)
+        self._mel_peak = self._melp_peak = -np.inf
+        self._peak_peak = self._valley_peak = -np.inf
+        self._sums = dict.fromkeys(("rms", "rms2", "zcr", "centroid", "bandwidth",
+                                    "rolloff", "flatness"), 0.0)
+        self._contrast_sum = np.zeros(7)
+        self._prev_S = None
+        self._prev_onset_db = None
+        self._flux = []
+        self._onset = []
+        self._e_h = self._e_p = 0.0
+        self._drain(final=False)
+
+    def _append(self, chunk):
+        self._zbuf = np.concatenate([self._zbuf, chunk])
+        self._ebuf = np.concatenate([self._ebuf, chunk])
+        self._hbuf = np.concatenate([self._hbuf, chunk])
+        self.n_samples += len(chunk)
+        self._last = chunk[-1]
+
+    def _drain(self, final):
+        if len(self._zbuf) >= N_FFT:
+            n = 1 + (len(self._zbuf) - N_FFT) // HOP_LENGTH
+            end = (n - 1) * HOP_LENGTH + N_FFT
+            self._frames(self._zbuf[:end], self._ebuf[:end])
+            self._zbuf = self._zbuf[n * HOP_LENGTH:]
+            self._ebuf = self._ebuf[n * HOP_LENGTH:]
+        while len(self._hbuf) >= self._h_left + self.block_len + self.context:
+            self._hpss(self.block_len)
+        if final and len(self._hbuf) > self._h_left:
+            self._hpss(len(self._hbuf) - self._h_left)
+
+    # Kare istatistikleri
+
+    def _frames(self, yz, ye):
+        sr = self.sr
+        S = np.abs(librosa.stft(yz, n_fft=N_FFT, hop_length=HOP_LENGTH, center=False))
+        self.n_frames += S.shape[-1]
+
+        # MFCC doğrusal: kare ortalamasının DCT'si = DCT'lerin ortalaması
+        mel_db, self._mel_peak = _clamped_db(self.mel_basis @ S, self._mel_peak)
+        self._mel_db_sum += mel_db.sum(axis=1)
+
+        rms = librosa.feature.rms(S=S, frame_length=N_FFT, hop_length=HOP_LENGTH)[0]
+        sums = self._sums
+        sums["rms"] += rms.sum()
+        sums["rms2"] += np.sum(rms.astype(np.float64) ** 2)
+        sums["centroid"] += librosa.feature.spectral_centroid(S=S, sr=sr)[0].sum()
+        sums["bandwidth"] += librosa.feature.spectral_bandwidth(S=S, sr=sr)[0].sum()
+        sums["rolloff"] += librosa.feature.spectral_rolloff(
+            S=S, sr=sr, roll_percent=ROLL_PERCENT)[0].sum()
+        sums["flatness"] += librosa.feature.spectral_flatness(S=S)[0].sum()
+
+        peak, valley = _contrast_peak_valley(S, sr)
+        peak_db, self._peak_peak = _clamped_db(peak, self._peak_peak)
+        valley_db, self._valley_peak = _clamped_db(valley, self._valley_peak)
+        self._contrast_sum += (peak_db - valley_db).sum(axis=1)
+
+        # ZCR: her karenin ilk örneği sayılmaz (pad=False)
+        neg = ye < -ZCR_THRESHOLD
+        csum = np.concatenate([[0, 0], np.cumsum(neg[1:] != neg[:-1])])
+        starts = np.arange(S.shape[-1]) * HOP_LENGTH
+        sums["zcr"] += np.sum(csum[starts + N_FFT] - csum[starts + 1]) / N_FFT
+
+        # Flux ve onset: bir önceki bloğun son karesiyle farklar
+        if self._prev_S is not None:
+            S_ext = np.concatenate([self._prev_S, S], axis=1)
+        else:
+            S_ext = S
+        self._flux.append(np.maximum(0.0, np.diff(S_ext, axis=1)).mean(axis=0))
+        self._prev_S = S[:, -1:]
+
+        onset_db, self._melp_peak = _clamped_db(self.mel_basis @ S ** 2, self._melp_peak)
+        if self._prev_onset_db is not None:
+            onset_ext = np.concatenate([self._prev_onset_db, onset_db], axis=1)
+        else:
+            onset_ext = onset_db
+        self._onset.append(np.maximum(0.0, np.diff(onset_ext, axis=1)).mean(axis=0))
+        self._prev_onset_db = onset_db[:, -1:]
+
+    def _hpss(self, core):
+        """[sol bağlam | çekirdek | sağ bağlam] parçasında HPSS enerjilerini biriktir"""
+        left = self._h_left
+        y_h, y_p = hpss_separate(self._hbuf)
+        self._e_h += float(np.sum(y_h[left:left + core].astype(np.float64) ** 2))
+        self._e_p += float(np.sum(y_p[left:left + core].astype(np.float64) ** 2))
+        keep_from = max(left + core - self.context, 0)
+        self._hbuf = self._hbuf[keep_from:]
+        self._h_left = left + core - keep_from
+
+    # Sonuç
+
+    def features(self):
+        """Biriken istatistiklerden 42 özelliği sözlük olarak döndür"""
+        if not self._streaming:
+            signal = np.concatenate(self._head) if self._head else np.zeros(0, np.float32)
+            return extract_features(signal, self.sr)
+
+        half = N_FFT // 2
+        self._zbuf = np.concatenate([self._zbuf, np.zeros(half, dtype=np.float32)])
+        self._ebuf = np.concatenate([self._ebuf, np.full(half, self._last, dtype=np.float32)])
+        self._drain(final=True)
+
+        T = self.n_frames
+        sums = self._sums
+        mfcc = scipy.fft.dct(self._mel_db_sum / T, type=2, norm="ortho")[:N_MFCC]
+        rms_mean = sums["rms"] / T
+        flux = np.concatenate([np.zeros(FLUX_PAD), *self._flux])[:T]
+        onset_env = np.concatenate([np.zeros(ONSET_PAD), *self._onset])[:T]
+        atk_time, atk_slope = log_attack_features(onset_env, self.sr, HOP_LENGTH)
+        contrast = self._contrast_sum / T
+
+        return {
+            **{f"mfcc{i+1:02d}": mfcc[i] for i in range(N_MFCC)},
+            "rms_mean": rms_mean,
+            "rms_std": np.sqrt(max(sums["rms2"] / T - rms_mean ** 2, 0.0)),
+            "zcr_mean": sums["zcr"] / T,
+            "centroid_mean": sums["centroid"] / T,
+            "bandwidth_mean": sums["bandwidth"] / T,
+            "rolloff_mean": sums["rolloff"] / T,
+            "flatness_mean": sums["flatness"] / T,
+            "flux_mean": flux.mean(),
+            **{f"contrast_b{b+1}": contrast[b] for b in range(len(contrast))},
+            "onset_mean": onset_env.mean(),
+            "onset_std": onset_env.std(),
+            "onset_max": onset_env.max(),
+            "onset_sum": onset_env.sum(),
+            "attack_time": atk_time,
+            "attack_slope": atk_slope,
+            "hpi_ratio": self._e_p / (self._e_h + EPS),
+        }
+
+
+def _onset_window(chunks, window_seconds, sr=SR):
+    """İlk vuruştan itibaren window_seconds uzunluğundaki pencereyi topla"""
+    threshold = 10.0 ** (ONSET_THRESHOLD_DB / 20.0)
+    length = int(window_seconds * sr)
+    preroll = N_FFT // 2
+    tail = np.zeros(0, dtype=np.float32)   # vuruş öncesi son örnekler
+    first = []                             # vuruş bulunamazsa dosyanın başı
+    first_len = 0
+    window = None
+
+    for chunk in chunks:
+        if window is None:
+            if first_len < length:
+                first.append(chunk[:length - first_len])
+                first_len += len(first[-1])
+            hits = np.flatnonzero(np.abs(chunk) >= threshold)
+            if not len(hits):
+                tail = np.concatenate([tail, chunk])[-preroll:]
+                continue
+            start = hits[0]
+            pre = np.concatenate([tail, chunk[:start]])[-preroll:]
+            window = [pre, chunk[start:]]
+        else:
+            window.append(chunk)
+        if sum(len(w) for w in window) >= length + preroll:
+            break
+
+    if window is None:
+        return np.concatenate(first) if first else np.zeros(0, dtype=np.float32)
+    return np.concatenate(window)[:length + preroll]
+
+
+def extract_features_streaming(source, res_type=RES_TYPE, block_seconds=STREAM_BLOCK_SECONDS,
+                               onset_window=None, max_seconds=None):
+    """Uzun dosyalardan sınırlı bellekle özellik çıkar.
+
+    onset_window (saniye) verilirse yalnızca ilk vuruştan sonraki pencere
+    çözülür ve tam yolla analiz edilir; dosyanın geri kalanı okunmaz.
+    max_seconds dosyanın yalnızca başındaki bu kadar sesi işler.
+    """
+    chunks = stream_signal(source, res_type, block_seconds, max_seconds)
+    if onset_window is not None:
+        try:
+            return extract_features(_onset_window(chunks, onset_window))
+        finally:
+            chunks.close()
+
+    extractor = StreamingExtractor(block_seconds=block_seconds)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor.features()
@@ -0,0 +1,40 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# Modüller depo kökünde düz durur
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def wav_bytes():
+    """seconds uzunluğunda, tohumla belirlenen gürültülü vuruşun WAV baytları"""
+    def make(seed=0, seconds=0.2, sr=22_050):
+        rng = np.random.default_rng(seed)
+        n = int(seconds * sr)
+        y = rng.standard_normal(n) * np.exp(-np.arange(n) / (0.05 * sr))
+        buf = io.BytesIO()
+        sf.write(buf, (0.5 * y).astype(np.float32), sr, format="WAV")
+        return buf.getvalue()
+    return make
+
+
+@pytest.fixture
+def bare_classifier():
+    """Model yüklemeden yalnızca benzerlik yolunu kullanan AudioClassifier"""
+    from audio_classifier import AudioClassifier
+    from feature_store import ColumnStore
+
+    def make(features, classes, filenames, class_names, quantization=None):
+        classifier = AudioClassifier.__new__(AudioClassifier)
+        classifier.classes = np.asarray(class_names)
+        classifier.ann_probes = None
+        classifier.index_quantization = quantization
+        classifier.reference_database = ColumnStore(classes=class_names)
+        classifier.reference_database.append_rows(features, classes, filenames)
+        return classifier
+    return make
@@ -0,0 +1,71 @@
+import io
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from audio_cache import AudioCache
+
+
+def test_spills_least_recently_played_and_reloads(tmp_path):
+    cache = AudioCache(max_memory_bytes=250, spill_dir=tmp_path)
+    for name in "abc":
+        cache.put(name, name.encode() * 100)
+    # "a" diske taşmıştı; dinlenince geri okunur ve yerine "b" taşar
+    assert cache.get("a") == (b"a" * 100, "audio/wav")
+    cache.put("d", b"d" * 100)
+
+    assert list(cache._memory) == ["a", "d"] and list(cache._disk) == ["b", "c"]
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 250 and stats["spills"] == 3 and stats["reloads"] == 1
+    assert len(cache) == 4 and "b" in cache
+
+    assert cache.get("b") == (b"b" * 100, "audio/wav")
+    assert cache.stats()["reloads"] == 2
+
+
+def test_disk_tier_drops_oldest_over_budget(tmp_path):
+    cache = AudioCache(max_memory_bytes=100, max_disk_bytes=200, spill_dir=tmp_path)
+    for name in "abcd":
+        cache.put(name, name.encode() * 100)
+
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.stats()["disk_bytes"] <= 200
+    assert cache.get("b") == (b"b" * 100, "audio/wav")
+
+
+def test_replace_and_clear_remove_spilled_files(tmp_path):
+    cache = AudioCache(max_memory_bytes=100, spill_dir=tmp_path)
+    cache.put("a", b"1" * 100)
+    cache.put("b", b"2" * 100)
+    cache.put("a", b"3" * 50)
+    assert cache.get("a") == (b"3" * 50, "audio/wav")
+
+    cache.put("c", b"4" * 100)
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["disk_bytes"] == 0
+    assert all(not files for _, _, files in os.walk(tmp_path))
+
+
+def test_compressed_copy_is_smaller_ogg():
+    rng = np.random.default_rng(0)
+    buf = io.BytesIO()
+    sf.write(buf, (0.3 * rng.standard_normal(22_050)).astype(np.float32), 22_050,
+             format="WAV", subtype="FLOAT")
+    data = buf.getvalue()
+
+    cache = AudioCache(compress="ogg")
+    cache.put("noise", data)
+    stored, mime = cache.get("noise")
+    assert mime == "audio/ogg" and len(stored) < len(data)
+
+    # Çözülemeyen veri olduğu gibi saklanır
+    cache.put("junk", b"junk")
+    assert cache.get("junk") == (b"junk", "audio/wav")
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        AudioCache(compress="mp3")
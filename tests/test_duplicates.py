@@ -0,0 +1,101 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from shared_library import LibraryView, SharedLibrary
+from similarity_index import duplicate_groups
+
+CLASSES = ["Kick", "Snare", "Hat"]
+
+
+def _library(n, seed=0, n_copies=40):
+    rng = np.random.default_rng(seed)
+    features = rng.standard_normal((n, 42))
+    classes = [CLASSES[i] for i in rng.integers(len(CLASSES), size=n)]
+    src = rng.choice(n // 2, n_copies, replace=False)
+    dst = n // 2 + rng.choice(n - n // 2, n_copies, replace=False)
+    features[dst] = features[src] + 1e-3 * rng.standard_normal((n_copies, 42))
+    for s, d in zip(src, dst):
+        classes[d] = classes[s]
+    return features, classes, [f"f{i}.wav" for i in range(n)]
+
+
+def _unit(x):
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _as_sets(groups):
+    return sorted((tuple(m), round(lo, 5), round(hi, 5)) for m, lo, hi in groups)
+
+
+def test_parts_match_concatenated_matrix():
+    features, _, _ = _library(900)
+    unit = _unit(features)
+    whole = duplicate_groups(unit, 0.99, block_size=128)
+    parts = duplicate_groups([unit[:500], unit[500:700], unit[700:]], 0.99, block_size=128)
+    assert len(whole) == 40
+    assert _as_sets(whole) == _as_sets(parts)
+
+
+def test_pair_cap_raises():
+    unit = _unit(np.ones((50, 42)))
+    with pytest.raises(ValueError):
+        duplicate_groups(unit, 0.9, block_size=16, max_pairs=100)
+
+
+def test_view_matches_classifier_across_shared_and_overlay(bare_classifier):
+    features, classes, names = _library(3000, seed=1)
+    classifier = bare_classifier(features, classes, names, CLASSES)
+    shared, overlay = SharedLibrary(), SharedLibrary()
+    shared.add(features[:2000], classes[:2000], names[:2000])
+    overlay.add(features[2000:], classes[2000:], names[2000:])
+
+    expected = classifier.find_duplicates(0.99, block_size=256)
+    found = LibraryView(shared, overlay).find_duplicates(0.99, block_size=256)
+
+    assert len(expected) == 40
+    assert sorted(map(tuple, (c['files'] for c in expected))) == \
+        sorted(map(tuple, (c['files'] for c in found)))
+
+
+def test_view_does_not_copy_shared_class_matrix():
+    rng = np.random.default_rng(2)
+    n = 40_000
+    shared, overlay = SharedLibrary(), SharedLibrary()
+    shared.add(rng.standard_normal((n, 42)), ["Kick"] * n, [f"s{i}" for i in range(n)])
+    overlay.add(rng.standard_normal((10, 42)), ["Kick"] * 10, [f"o{i}" for i in range(10)])
+    view = LibraryView(shared, overlay)
+
+    tracemalloc.start()
+    try:
+        view.find_duplicates(0.999, block_size=256)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Birleştirilmiş birim matrisi tek başına n * 42 * 8 bayt tutardı
+    assert peak < n * 42 * 8 / 2
+
+
+def test_quantized_class_is_decoded_tile_by_tile(bare_classifier):
+    features, classes, names = _library(3000, seed=3)
+    expected = bare_classifier(features, classes, names, CLASSES).find_duplicates(0.99, block_size=256)
+    found = bare_classifier(features, classes, names, CLASSES,
+                            quantization="int8").find_duplicates(0.99, block_size=256)
+    assert len(expected) == 40
+    assert sorted(map(tuple, (c['files'] for c in expected))) == \
+        sorted(map(tuple, (c['files'] for c in found)))
+
+    rng = np.random.default_rng(4)
+    n = 40_000
+    classifier = bare_classifier(rng.standard_normal((n, 42)), ["Kick"] * n,
+                                 [f"s{i}" for i in range(n)], CLASSES, quantization="int8")
+    classifier._similarity_index()
+    tracemalloc.start()
+    try:
+        classifier.find_duplicates(0.999, block_size=256)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Sınıfın tamamını float32'ye çözmek tek başına n * 42 * 4 bayt tutardı
+    assert peak < n * 42 * 4 / 4
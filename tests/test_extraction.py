@@ -0,0 +1,39 @@
+import numpy as np
+
+import feature_extractor as fe
+
+
+def test_file_object_source_matches_bytes(tmp_path, wav_bytes):
+    path = tmp_path / "hit.wav"
+    path.write_bytes(wav_bytes(3))
+
+    # Akış modu önce başlıktan süreyi okur; dosya sonra baştan çözülmeli
+    with open(path, "rb") as f:
+        from_file = fe.extract_from_file(f, streaming=True)
+    from_bytes = fe.extract_from_file(wav_bytes(3))
+
+    assert from_file is not None
+    np.testing.assert_array_equal(fe.features_to_vector(from_file),
+                                  fe.features_to_vector(from_bytes))
+
+
+def test_fast_hpss_matches_librosa():
+    rng = np.random.default_rng(0)
+    y = (rng.standard_normal(fe.SR // 2) * np.exp(-np.arange(fe.SR // 2) / 2000)).astype(np.float32)
+    import librosa
+    y_h, y_p = fe.hpss_separate(y)
+    ref_h, ref_p = librosa.effects.hpss(y, n_fft=fe.HPSS_N_FFT, hop_length=fe.HPSS_HOP_LENGTH,
+                                        kernel_size=fe.HPSS_KERNEL)
+    np.testing.assert_allclose(y_h, ref_h, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(y_p, ref_p, rtol=0, atol=1e-6)
+    assert fe.SpectralEngine(y).hpi_ratio == fe.hpss_energy_ratio(y)
+
+
+def test_batch_matches_single_extraction():
+    rng = np.random.default_rng(1)
+    # Farklı uzunluklar farklı dolgu gruplarına düşer; biri N_FFT'den kısa
+    signals = [(rng.standard_normal(n) * np.exp(-np.arange(n) / 3000)).astype(np.float32)
+               for n in (1000, 5000, 5100, 22050, 40000)]
+    batch = fe.extract_features_batch(signals, batch_size=2)
+    single = np.array([fe.features_to_vector(fe.extract_features(y)) for y in signals])
+    np.testing.assert_allclose(batch, single, rtol=1e-3, atol=1e-5)
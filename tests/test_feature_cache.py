@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+import feature_extractor as fe
+from feature_cache import FeatureCache
+
+
+def test_key_depends_on_bytes_and_resampler():
+    cache = FeatureCache()
+    assert cache.key(b"abc") == cache.key(b"abc")
+    assert cache.key(b"abc") != cache.key(b"abd")
+    assert cache.key(b"abc", "soxr_hq") != cache.key(b"abc", "soxr_vhq")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = FeatureCache(max_items=2)
+    cache.put("a", np.zeros(3))
+    cache.put("b", np.ones(3))
+    assert cache.get("a") is not None
+    cache.put("c", np.full(3, 2.0))
+
+    assert cache.get("b") is None
+    np.testing.assert_array_equal(cache.get("a"), np.zeros(3))
+    np.testing.assert_array_equal(cache.get("c"), np.full(3, 2.0))
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_tier_survives_restart_and_skips_corrupt_files(tmp_path):
+    FeatureCache(cache_dir=tmp_path).put("ab" * 20, np.arange(4.0))
+
+    reopened = FeatureCache(cache_dir=tmp_path)
+    np.testing.assert_array_equal(reopened.get("ab" * 20), np.arange(4.0))
+
+    reopened.put("cd" * 20, np.arange(4.0))
+    with open(reopened._path("cd" * 20), "wb") as f:
+        f.write(b"not an npy file")
+    assert FeatureCache(cache_dir=tmp_path).get("cd" * 20) is None
+
+
+def test_prune_removes_oldest_files_first(tmp_path):
+    cache = FeatureCache(cache_dir=tmp_path)
+    keys = [f"{i:02d}" * 20 for i in range(4)]
+    for age, key in enumerate(keys):
+        cache.put(key, np.zeros(100))
+        mtime = 1_000_000 + age
+        os.utime(cache._path(key), (mtime, mtime))
+    size = os.path.getsize(cache._path(keys[0]))
+
+    cache.max_disk_bytes = 2 * size
+    cache.prune()
+
+    assert [os.path.exists(cache._path(k)) for k in keys] == [False, False, True, True]
+
+
+def test_cached_files_are_not_extracted_again(wav_bytes):
+    cache = FeatureCache()
+    first = fe.extract_files_parallel([wav_bytes(0), wav_bytes(1)], n_workers=1, cache=cache)
+    assert cache.misses == 2
+
+    again = fe.extract_files_parallel([wav_bytes(1), wav_bytes(0)], n_workers=1, cache=cache)
+    assert cache.hits == 2
+    np.testing.assert_array_equal(again[0][0], first[1][0])
+    np.testing.assert_array_equal(again[1][0], first[0][0])
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from feature_store import INITIAL_CAPACITY, ColumnStore, FeatureStore
+
+CLASSES = ["Kick", "Snare", "Hat"]
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.standard_normal((n, 42))
+    classes = [CLASSES[i] for i in rng.integers(len(CLASSES), size=n)]
+    return features, classes, [f"dosya {i} \"ç\".wav" for i in range(n)]
+
+
+@pytest.fixture(params=["column", "feature"])
+def store(request, tmp_path):
+    if request.param == "column":
+        return ColumnStore(classes=CLASSES)
+    return FeatureStore(str(tmp_path / "store"), classes=CLASSES)
+
+
+def test_list_interface(store):
+    features, classes, names = _rows(5)
+    store.extend({'features': f, 'class': c, 'filename': n}
+                 for f, c, n in zip(features, classes, names))
+    store.append({'features': features[0], 'class': "Clap", 'filename': "yeni.wav"})
+
+    assert len(store) == 6
+    assert store[-1]['class'] == "Clap" and store[-1]['filename'] == "yeni.wav"
+    assert [r['filename'] for r in store] == names + ["yeni.wav"]
+    assert [r['filename'] for r in store[1:3]] == names[1:3]
+    np.testing.assert_array_equal(store[2]['features'], features[2].astype(np.float32))
+    with pytest.raises(IndexError):
+        store[6]
+    expected = {c: classes.count(c) for c in CLASSES if classes.count(c)}
+    expected["Clap"] = 1
+    assert store.class_counts() == expected
+
+
+def test_growth_keeps_rows(store):
+    features, classes, names = _rows(INITIAL_CAPACITY + 10)
+    store.append_rows(features[:7], classes[:7], names[:7])
+    store.append_rows(features[7:], classes[7:], names[7:])
+
+    got, codes, class_names = store.coded_columns()
+    np.testing.assert_array_equal(got, features.astype(np.float32))
+    assert [class_names[c] for c in codes] == classes
+    assert list(store.filenames) == names
+
+
+def test_mismatched_lengths_rejected(store):
+    features, classes, names = _rows(3)
+    with pytest.raises(ValueError):
+        store.append_rows(features, classes[:2], names)
+    assert len(store) == 0
+
+
+def test_feature_store_reopens(tmp_path):
+    path = str(tmp_path / "store")
+    features, classes, names = _rows(INITIAL_CAPACITY + 3, seed=1)
+    store = FeatureStore(path, classes=CLASSES)
+    store.append_rows(features[:100], classes[:100], names[:100])
+    store.append_rows(features[100:], classes[100:], names[100:])
+
+    reopened = FeatureStore(path, mode="r")
+    assert len(reopened) == len(features)
+    np.testing.assert_array_equal(reopened.features, features.astype(np.float32))
+    assert reopened.filenames == names
+    assert reopened.class_counts() == store.class_counts()
+    with pytest.raises(PermissionError):
+        reopened.append_rows(features[:1], classes[:1], names[:1])
+
+
+def test_unfinished_append_is_invisible(tmp_path):
+    path = str(tmp_path / "store")
+    features, classes, names = _rows(4)
+    store = FeatureStore(path, classes=CLASSES)
+    store.append_rows(features[:2], classes[:2], names[:2])
+    # meta.json yazılmadan kesilen ekleme: dosya adları diske ulaşmış olabilir
+    with open(store._file("filenames.jsonl"), "ab") as f:
+        f.write(b'"yarim.wav"\n')
+
+    reopened = FeatureStore(path)
+    assert reopened.filenames == names[:2]
+    reopened.append_rows(features[2:], classes[2:], names[2:])
+    assert FeatureStore(path, mode="r").filenames == names
+
+
+def test_missing_store_read_only(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FeatureStore(str(tmp_path / "yok"), mode="r")
+
+
+def test_filename_lookup_does_not_parse_all_names(tmp_path):
+    path = tmp_path / "store"
+    store = FeatureStore(path, classes=["Kick"], dim=3)
+    store.append_rows(np.zeros((2000, 3)), ["Kick"] * 2000, [f"ş/{i}.wav" for i in range(2000)])
+
+    reopened = FeatureStore(path, mode="r")
+    assert reopened.filename(1234) == "ş/1234.wav"
+    assert reopened[1999]["filename"] == "ş/1999.wav"
+    assert "_filenames" not in reopened.__dict__
@@ -0,0 +1,119 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import index_library
+from index_library import ERRORS_FILE, load_index, load_manifest
+
+
+@pytest.fixture
+def tree(tmp_path, wav_bytes):
+    """İki klasörde üç geçerli ve bir bozuk dosyadan oluşan küçük kütüphane"""
+    root = tmp_path / "library"
+    files = {"kick/a.wav": wav_bytes(0), "kick/b.wav": wav_bytes(1),
+             "snare/c.wav": wav_bytes(2), "snare/broken.wav": b"not audio"}
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root
+
+
+def _run(root, out, *extra):
+    index_library.main([str(root), "--out", str(out), "--no-classify", "--workers", "1",
+                        "--shard-size", "2", *extra])
+
+
+def _errors(out):
+    path = out / ERRORS_FILE
+    if not path.exists():
+        return []
+    return [json.loads(line)["path"] for line in path.read_text().splitlines()]
+
+
+def _pending(capsys):
+    """Son çalışmanın işlediği dosya sayısı (stderr özetinden)"""
+    line = next(l for l in capsys.readouterr().err.splitlines() if "işlenecek" in l)
+    return int(line.split(", ")[1].split()[0])
+
+
+def test_rerun_skips_seen_files_and_reindexes_modified(tree, tmp_path, wav_bytes, capsys):
+    out = tmp_path / "index"
+    _run(tree, out)
+    assert _pending(capsys) == 4
+    columns, _ = load_index(str(out))
+    assert sorted(columns["path"]) == ["kick/a.wav", "kick/b.wav", "snare/c.wav"]
+    assert list(columns["label"][np.argsort(columns["path"])]) == ["kick", "kick", "snare"]
+    assert _errors(out) == ["snare/broken.wav"]
+    before = columns["features"][list(columns["path"]).index("kick/a.wav")]
+
+    _run(tree, out)
+    assert _pending(capsys) == 0
+    assert len(load_manifest(str(out))["shards"]) == 2
+
+    modified = tree / "kick" / "a.wav"
+    modified.write_bytes(wav_bytes(7))
+    os.utime(modified, ns=(1_000_000_000, 1_000_000_000))
+    _run(tree, out)
+    assert _pending(capsys) == 1
+
+    columns, _ = load_index(str(out))
+    assert len(columns["path"]) == 3
+    after = columns["features"][list(columns["path"]).index("kick/a.wav")]
+    assert not np.array_equal(before, after)
+
+
+def test_retry_errors_processes_failed_files_again(tree, tmp_path, capsys):
+    out = tmp_path / "index"
+    _run(tree, out)
+    capsys.readouterr()
+
+    _run(tree, out)
+    assert _pending(capsys) == 0
+    _run(tree, out, "--retry-errors")
+    assert _pending(capsys) == 1
+    assert _errors(out) == ["snare/broken.wav"] * 2
+
+
+def test_changed_settings_require_force(tree, tmp_path, capsys):
+    out = tmp_path / "index"
+    _run(tree, out)
+    capsys.readouterr()
+
+    with pytest.raises(SystemExit, match="res_type"):
+        _run(tree, out, "--res-type", "soxr_lq")
+
+    _run(tree, out, "--res-type", "soxr_lq", "--force")
+    assert _pending(capsys) == 4
+    manifest = load_manifest(str(out))
+    assert manifest["res_type"] == "soxr_lq" and len(manifest["shards"]) == 2
+    assert _errors(out) == ["snare/broken.wav"]
+
+
+def test_errors_are_recorded_only_after_checkpoint(tree, tmp_path, monkeypatch, capsys):
+    out = tmp_path / "index"
+    write = index_library._write_json_atomic
+    calls = []
+
+    def interrupted(path, payload):
+        # İlk çağrı boş manifest, sonrakiler parça kontrol noktaları
+        calls.append(path)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        write(path, payload)
+
+    monkeypatch.setattr(index_library, "_write_json_atomic", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        _run(tree, out)
+    # Bozuk dosya kesilen ikinci parçadaydı: kaydı yok, yeniden denenecek
+    assert _errors(out) == []
+    assert len(load_manifest(str(out))["shards"]) == 1
+
+    monkeypatch.setattr(index_library, "_write_json_atomic", write)
+    capsys.readouterr()
+    _run(tree, out)
+    assert _pending(capsys) == 2
+    assert _errors(out) == ["snare/broken.wav"]
+    assert len(load_index(str(out))[0]["path"]) == 3
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from feature_cache import FeatureCache
+from inference_server import InferenceService
+
+
+class _Classifier:
+    """Model yüklemeden predict_batch sunan en küçük sınıflandırıcı"""
+
+    classes = np.array(["Kick", "Snare"])
+    res_type = "soxr_hq"
+    streaming = False
+    onset_window = None
+
+    def __init__(self):
+        self.feature_cache = FeatureCache()
+        self.reference_database = []
+
+    def predict_batch(self, matrix):
+        n = len(matrix)
+        return self.classes[np.zeros(n, dtype=int)], np.ones(n), matrix
+
+
+async def _exchange(raw, classifier=None):
+    service = InferenceService(classifier or _Classifier(), n_workers=1)
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.batcher.stop()
+        service.model_executor.shutdown(wait=False)
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def request(raw):
+    return asyncio.run(_exchange(raw))
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"\xc2\xb2"])
+def test_invalid_content_length_is_rejected(length):
+    status, payload = request(b"POST /classify HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+def test_malformed_request_line():
+    status, _ = request(b"GARBAGE\r\n\r\n")
+    assert status == 400
+
+
+def test_chunked_body_not_supported():
+    status, _ = request(b"POST /classify HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n")
+    assert status == 501
+
+
+def test_oversized_body_rejected():
+    status, _ = request(b"POST /classify HTTP/1.1\r\nContent-Length: 999999999999\r\n\r\n")
+    assert status == 413
+
+
+def test_unknown_route_and_wrong_method():
+    assert request(b"GET /nope HTTP/1.1\r\nConnection: close\r\n\r\n")[0] == 404
+    assert request(b"GET /classify HTTP/1.1\r\nConnection: close\r\n\r\n")[0] == 405
+
+
+def test_empty_body_and_bad_parameters():
+    assert request(b"POST /classify HTTP/1.1\r\nConnection: close\r\n\r\n")[0] == 400
+    raw = b"POST /similar?top_k=x HTTP/1.1\r\nConnection: close\r\nContent-Length: 1\r\n\r\nx"
+    assert request(raw)[0] == 400
+
+
+def test_classify_uses_feature_cache_hit():
+    classifier = _Classifier()
+    body = b"RIFF-not-really-audio"
+    cache = classifier.feature_cache
+    cache.put(cache.key(body, classifier.res_type), np.zeros(42))
+    raw = (b"POST /classify?name=a.wav HTTP/1.1\r\nConnection: close\r\n"
+           b"Content-Length: %d\r\n\r\n" % len(body)) + body
+    status, payload = asyncio.run(_exchange(raw, classifier))
+    assert status == 200
+    assert payload == {"filename": "a.wav", "predicted_class": "Kick", "confidence": 1.0}
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+
+from numpy_model import NumpyMLP, load_numpy_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL = os.path.join(ROOT, "my_enhanced_audio_model.h5")
+PATHS = dict(model_path=MODEL, scaler_path=os.path.join(ROOT, "scaler.pkl"),
+             label_encoder_path=os.path.join(ROOT, "label_encoder.pkl"))
+
+
+@pytest.fixture(scope="module")
+def scaled_inputs():
+    # Normalize uzaydaki tipik girişler ve uçlara yakın birkaç değer
+    rng = np.random.default_rng(0)
+    return np.vstack([rng.standard_normal((64, 42)), 4 * rng.standard_normal((8, 42))])
+
+
+def test_numpy_backend_matches_tensorflow(scaled_inputs):
+    pytest.importorskip("tensorflow")
+    from audio_classifier import AudioClassifier
+
+    numpy_clf = AudioClassifier(backend="numpy", **PATHS)
+    tf_clf = AudioClassifier(backend="tensorflow", **PATHS)
+
+    got, want = numpy_clf._infer(scaled_inputs), tf_clf._infer(scaled_inputs)
+    np.testing.assert_allclose(got, want, atol=1e-5)
+    np.testing.assert_array_equal(got.argmax(axis=1), want.argmax(axis=1))
+
+    features = numpy_clf.scaler.inverse_transform(scaled_inputs)
+    np.testing.assert_array_equal(numpy_clf.predict_batch(features)[0],
+                                  tf_clf.predict_batch(features)[0])
+
+
+def test_npz_round_trip(tmp_path, scaled_inputs):
+    model = NumpyMLP.from_h5(MODEL)
+    path = tmp_path / "model.npz"
+    model.save(path)
+
+    loaded = load_numpy_model(str(path))
+    assert [a for _, _, a in loaded.layers] == [a for _, _, a in model.layers]
+    for (w, b, _), (w2, b2, _) in zip(model.layers, loaded.layers):
+        np.testing.assert_array_equal(w, w2)
+        np.testing.assert_array_equal(b, b2)
+    np.testing.assert_array_equal(loaded(scaled_inputs), model(scaled_inputs))
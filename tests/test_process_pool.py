@@ -0,0 +1,45 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import feature_extractor as fe
+
+
+def test_parallel_extraction_recovers_from_killed_worker(wav_bytes):
+    pool = fe._get_pool(2)
+    try:
+        pool.submit(os._exit, 1).result()
+    except BrokenProcessPool:
+        pass
+
+    results = fe.extract_files_parallel([wav_bytes(0), wav_bytes(1), b"junk"], n_workers=2)
+
+    assert results[0][0] is not None and results[0][1] is None
+    assert results[1][0] is not None
+    assert results[2][0] is None and results[2][1]
+    assert fe.submit_extraction(wav_bytes(2), 2).result()[1] is None
+
+
+def test_pool_is_replaced_when_worker_count_changes():
+    old = fe._get_pool(2)
+    new = fe._get_pool(3)
+    assert new is not old
+    assert old._shutdown_thread
+    assert fe._get_pool(3) is new
+
+
+class _BrokenPool:
+    def map(self, *args, **kwargs):
+        raise BrokenProcessPool("ölü işçi")
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_persistently_broken_pool_becomes_per_file_errors(monkeypatch, wav_bytes):
+    monkeypatch.setattr(fe, "_get_pool", lambda n_workers: _BrokenPool())
+
+    results = fe.extract_files_parallel([wav_bytes(0), wav_bytes(1)], n_workers=2,
+                                        names=["a.wav", "b.wav"])
+
+    assert [vector for vector, _ in results] == [None, None]
+    assert all(err.startswith("BrokenProcessPool") for _, err in results)
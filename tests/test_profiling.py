@@ -0,0 +1,66 @@
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import feature_extractor as fe
+from profiling import profiler
+
+
+def test_worker_profiler_follows_each_job(wav_bytes):
+    try:
+        vector, err, record = fe._extract_job(wav_bytes(0), profile=True)
+        assert err is None and record is not None
+        assert profiler.enabled and tracemalloc.is_tracing()
+
+        vector, err, record = fe._extract_job(wav_bytes(0), profile=None)
+        assert vector is not None and record is None
+        assert not profiler.enabled
+        assert not tracemalloc.is_tracing()
+    finally:
+        profiler.disable()
+        profiler.reset()
+
+
+def test_serial_job_leaves_parent_profiler_untouched(wav_bytes):
+    profiler.enable()
+    try:
+        vector, err, record = fe._serial_job(wav_bytes(0), fe.RES_TYPE, "a.wav")
+        assert vector is not None and record is None
+        assert profiler.enabled
+        assert profiler.file_records()[-1]["file"] == "a.wav"
+        assert "stft" in profiler.summary()
+    finally:
+        profiler.disable()
+        profiler.reset()
+
+
+def test_memory_stages_in_threads_do_not_reset_each_other():
+    freed = threading.Event()
+
+    def big():
+        with profiler.stage("big"):
+            temp = np.ones(4 << 20)  # 32 MB, aşama bitmeden serbest
+            del temp
+            freed.set()
+            time.sleep(0.2)
+
+    def small():
+        freed.wait()
+        with profiler.stage("small"):
+            np.ones(1000)
+
+    profiler.enable(memory=True)
+    try:
+        threads = [threading.Thread(target=big), threading.Thread(target=small)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        summary = profiler.summary()
+        assert summary["big"]["peak_mb"] >= 30
+        assert summary["small"]["peak_mb"] < 1
+    finally:
+        profiler.disable()
+        profiler.reset()
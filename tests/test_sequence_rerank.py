@@ -0,0 +1,102 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from sequence_rerank import (SequenceCache, frame_sequence, rerank, sequence_from_source,
+                             two_stage_search)
+
+SR = 22_050
+
+
+def _hit(decay, seed, seconds=1.0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    return (rng.standard_normal(n) * np.exp(-np.arange(n) / (decay * SR))).astype(np.float32)
+
+
+def _wav(y):
+    buf = io.BytesIO()
+    sf.write(buf, y, SR, format="WAV")
+    return buf.getvalue()
+
+
+def test_sequences_are_float16_and_bounded():
+    sequence = frame_sequence(_hit(0.3, 0, seconds=10.0))
+    assert sequence.dtype == np.float16
+    assert sequence.shape[0] <= 128
+    assert frame_sequence(np.zeros(100)).shape == (1, 13)
+
+
+def test_rerank_prefers_matching_envelope_and_keeps_missing_in_place():
+    audio = {f"tight{i}": _wav(_hit(0.02, i)) for i in range(4)}
+    audio.update({f"roomy{i}": _wav(_hit(0.4, 10 + i)) for i in range(4)})
+    sequences = SequenceCache(audio.get)
+    # İlk aşama sırası kasıtlı olarak ters: önce uzun kuyruklular
+    candidates = [{'filename': name} for name in sorted(audio)]
+    candidates.insert(1, {'filename': "yok.wav"})
+
+    ranked = rerank(candidates, frame_sequence(_hit(0.02, 99)), sequences, top_k=9)
+
+    # Dizisi olmayan aday ilk aşamadaki yerinde kalır
+    assert ranked[1] == {'filename': "yok.wav", 'dtw_distance': None}
+    assert [ranked[i]['filename'][:5] for i in (0, 2, 3, 4)] == ["tight"] * 4
+    assert sequences.stats()["items"] == 8
+
+    # Başa gelen dizisiz aday (paylaşılan kütüphane satırı) geriye düşmez
+    ranked = rerank([{'filename': "yok.wav"}] + candidates[:1], frame_sequence(_hit(0.02, 99)),
+                    sequences, top_k=2)
+    assert [c['filename'] for c in ranked] == ["yok.wav", "roomy0"]
+
+
+def test_cache_is_lazy_and_byte_bounded():
+    calls = []
+    audio = {f"s{i}": _wav(_hit(0.1, i)) for i in range(3)}
+    sequences = SequenceCache(lambda name: calls.append(name) or audio.get(name), max_bytes=1)
+
+    assert sequences.get("s0") is not None
+    assert sequences.get("s1") is not None
+    assert calls == ["s0", "s1"]
+    assert len(sequences) == 1 and "s1" in sequences
+    sequences.register("bozuk", b"junk")
+    assert sequences.get("bozuk") is None
+
+
+def test_registered_originals_are_used_lazily(tmp_path):
+    loader_calls = []
+    sequences = SequenceCache(loader_calls.append, source_dir=tmp_path)
+    original = _wav(_hit(0.05, 1))
+    sequences.register("a.wav", original, key="digest")
+    sequences.register("kopya.wav", original, key="digest")
+
+    # Kayıt yalnızca baytları diske bırakır; dizi ilk istendiğinde hesaplanır
+    assert len(sequences) == 0 and len(list(tmp_path.rglob("digest"))) == 1
+    np.testing.assert_array_equal(sequences.get("a.wav"), sequence_from_source(original))
+    assert loader_calls == []
+
+    # Paylaşılan dosya son ad unutulunca silinir
+    sequences.discard("a.wav")
+    assert sequences.get("kopya.wav") is not None
+    sequences.discard("kopya.wav")
+    assert not list(tmp_path.rglob("digest"))
+
+
+class _Searcher:
+    def __init__(self, names):
+        self.names = names
+        self.requested = None
+
+    def find_similar_sounds(self, target_features, target_class, top_k=5):
+        self.requested = top_k
+        return [{'filename': name} for name in self.names[:top_k]]
+
+
+def test_two_stage_search_touches_only_m_candidates():
+    searcher = _Searcher([f"s{i}" for i in range(100)])
+    sequences = SequenceCache(lambda name: None)
+    result = two_stage_search(searcher, None, "Kick", frame_sequence(_hit(0.1, 0)),
+                              sequences, top_k=5, candidates=20)
+    assert searcher.requested == 20
+    assert len(result) == 5
+    assert two_stage_search(searcher, None, "Kick", None, sequences, top_k=3) == \
+        [{'filename': "s0"}, {'filename': "s1"}, {'filename': "s2"}]
@@ -0,0 +1,138 @@
+import threading
+
+import numpy as np
+import pytest
+
+from feature_extractor import FEATURE_NAMES
+from feature_store import FeatureStore
+from shared_library import LibraryView, SharedLibrary
+
+CLASSES = ["kick", "snare"]
+DIM = len(FEATURE_NAMES)
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.standard_normal((n, DIM))
+    classes = [CLASSES[i % 2] for i in range(n)]
+    return features, classes, [f"s{seed}_{i}.wav" for i in range(n)]
+
+
+def _names(results):
+    return [r["filename"] for r in results]
+
+
+def test_old_snapshot_is_unchanged_by_add_and_remove():
+    library = SharedLibrary(dim=DIM)
+    library.add(*_rows(20))
+    before = LibraryView(library, SharedLibrary(dim=DIM))
+    query = np.ones(DIM)
+    expected = before.find_similar_sounds(query, "kick", top_k=5)
+
+    library.add(*_rows(20, seed=1))
+    library.remove(_names(expected)[:2])
+
+    assert len(before) == 20
+    assert _names(before.find_similar_sounds(query, "kick", top_k=5)) == _names(expected)
+    after = LibraryView(library, SharedLibrary(dim=DIM))
+    assert len(after) == 38
+    assert not set(_names(after.find_similar_sounds(query, "kick", top_k=40))) & set(_names(expected)[:2])
+
+
+def test_readers_see_whole_batches_during_concurrent_adds():
+    library = SharedLibrary(dim=DIM)
+    batches = [_rows(10, seed=seed) for seed in range(30)]
+    seen, errors = set(), []
+
+    def write():
+        for batch in batches:
+            library.add(*batch)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive() or not seen:
+        view = LibraryView(library, SharedLibrary(dim=DIM))
+        names = _names(view.find_similar_sounds(np.ones(DIM), "kick", top_k=len(view)))
+        # Her görünüm tam yayımlanmış toplu eklemeleri içerir, yarımını değil
+        if len(view) % 10 or len(names) != len(view) // 2:
+            errors.append(len(view))
+        seen.add(len(view))
+    writer.join()
+
+    assert not errors
+    assert len(library) == 300
+
+
+def test_view_matches_classifier_over_combined_rows(bare_classifier):
+    shared_rows, overlay_rows = _rows(30), _rows(10, seed=1)
+    shared, overlay = SharedLibrary(dim=DIM), SharedLibrary(dim=DIM)
+    shared.add(*shared_rows)
+    overlay.add(*overlay_rows)
+    view = LibraryView(shared, overlay)
+    classifier = bare_classifier(np.vstack([shared_rows[0], overlay_rows[0]]),
+                                 shared_rows[1] + overlay_rows[1],
+                                 shared_rows[2] + overlay_rows[2], CLASSES)
+
+    rng = np.random.default_rng(2)
+    for query in rng.standard_normal((10, DIM)):
+        for class_name in CLASSES:
+            got = view.find_similar_sounds(query, class_name, top_k=7)
+            want = classifier.find_similar_sounds(query, class_name, top_k=7)
+            assert _names(got) == _names(want)
+            np.testing.assert_allclose([r["cosine_similarity"] for r in got],
+                                       [r["cosine_similarity"] for r in want], atol=1e-6)
+
+
+def test_extend_publishes_once():
+    library = SharedLibrary(dim=DIM)
+    features, classes, names = _rows(5)
+    library.extend({"features": f, "class": c, "filename": n}
+                   for f, c, n in zip(features, classes, names))
+    assert library.snapshot.version == 1 and len(library) == 5
+    assert library.snapshot.row(3)["filename"] == names[3]
+
+
+def test_projection_copy_is_frozen():
+    library = SharedLibrary(dim=DIM)
+    library.add(*_rows(20))
+    first = library.projection(library.snapshot, "kick")
+    coords = first.coords.copy()
+
+    library.add(*_rows(20, seed=1))
+    second = library.projection(library.snapshot, "kick")
+
+    np.testing.assert_array_equal(first.coords, coords)
+    assert len(second.coords) == 20
+
+
+def test_store_backed_library_reloads_and_refuses_remove(tmp_path):
+    path = tmp_path / "library"
+    library = SharedLibrary(dim=DIM, store=FeatureStore(path, classes=CLASSES, dim=DIM))
+    library.add(*_rows(6))
+
+    reopened = SharedLibrary(dim=DIM, store=FeatureStore(path, dim=DIM))
+    assert len(reopened) == 6 and reopened.snapshot.filename(5) == "s0_5.wav"
+    with pytest.raises(PermissionError):
+        reopened.remove(["s0_0.wav"])
+
+
+def test_store_backed_library_keeps_float32_index_and_lazy_names(tmp_path, bare_classifier):
+    path = tmp_path / "library"
+    features, classes, names = _rows(300)
+    FeatureStore(path, classes=CLASSES, dim=DIM).append_rows(features, classes, names)
+
+    store = FeatureStore(path, dim=DIM)
+    library = SharedLibrary(dim=DIM, store=store)
+    block = library.snapshot.index.blocks["kick"]
+    assert block.unit.dtype == np.float32 and not hasattr(block, "features")
+
+    view = LibraryView(library, SharedLibrary(dim=DIM))
+    classifier = bare_classifier(features, classes, names, CLASSES)
+    query = np.random.default_rng(3).standard_normal(DIM)
+    got = view.find_similar_sounds(query, "snare", top_k=10)
+    want = classifier.find_similar_sounds(query, "snare", top_k=10)
+    assert _names(got) == _names(want)
+    np.testing.assert_allclose([r["cosine_similarity"] for r in got],
+                               [r["cosine_similarity"] for r in want], atol=1e-12)
+    # Dosya adları filenames.jsonl'ın tamamı ayrıştırılmadan çözüldü
+    assert "_filenames" not in store.__dict__
@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
+
+from similarity_index import ClassProjection, SimilarityIndex
+
+CLASSES = ["Kick", "Snare", "Hat"]
+
+
+def _library(n, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.standard_normal((n, 42))
+    classes = [CLASSES[i] for i in rng.integers(len(CLASSES), size=n)]
+    return features, classes, [f"f{i}.wav" for i in range(n)]
+
+
+def _reference_loop(database, target_features, target_class, top_k):
+    """Dizi indeksinden önceki satır satır sklearn döngüsü"""
+    similarities = []
+    for ref in database:
+        if ref['class'] == target_class:
+            similarities.append({
+                'filename': ref['filename'],
+                'cosine_similarity': cosine_similarity([target_features], [ref['features']])[0][0],
+                'euclidean_distance': euclidean_distances([target_features], [ref['features']])[0][0],
+            })
+    similarities = sorted(similarities, key=lambda x: x['cosine_similarity'], reverse=True)
+    return similarities[:top_k]
+
+
+def _assert_same(found, expected):
+    assert [s['filename'] for s in found] == [s['filename'] for s in expected]
+    np.testing.assert_allclose([s['cosine_similarity'] for s in found],
+                               [s['cosine_similarity'] for s in expected], atol=1e-12)
+    np.testing.assert_allclose([s['euclidean_distance'] for s in found],
+                               [s['euclidean_distance'] for s in expected], atol=1e-9)
+
+
+def test_matches_reference_loop(bare_classifier):
+    features, classes, names = _library(600)
+    classifier = bare_classifier(features, classes, names, CLASSES)
+    database = list(classifier.reference_database)
+    rng = np.random.default_rng(1)
+    for target_class in CLASSES:
+        for top_k in (1, 5, 50, 1000):
+            target = rng.standard_normal(42)
+            _assert_same(classifier.find_similar_sounds(target, target_class, top_k),
+                         _reference_loop(database, target, target_class, top_k))
+
+
+def test_ties_keep_insertion_order(bare_classifier):
+    n = 30_000
+    features = np.tile(np.random.default_rng(2).standard_normal(42), (n, 1))
+    classifier = bare_classifier(features, ["Kick"] * n, [f"f{i}" for i in range(n)], CLASSES)
+
+    zero = classifier.find_similar_sounds(np.zeros(42), "Kick", top_k=5)
+    same = classifier.find_similar_sounds(features[0], "Kick", top_k=5)
+
+    assert [s['filename'] for s in zero] == ["f0", "f1", "f2", "f3", "f4"]
+    assert [s['cosine_similarity'] for s in zero] == [0.0] * 5
+    assert [s['filename'] for s in same] == ["f0", "f1", "f2", "f3", "f4"]
+
+
+def test_incremental_adds_match_rebuild():
+    features, classes, _ = _library(1500, seed=3)
+    built = SimilarityIndex(42)
+    built.add(features, classes)
+    grown = SimilarityIndex(42)
+    for start in range(0, 1500, 97):
+        grown.add(features[start:start + 97], classes[start:start + 97])
+    target = np.random.default_rng(4).standard_normal(42)
+    for target_class in CLASSES:
+        a, b = built.query(target, target_class, 20), grown.query(target, target_class, 20)
+        assert a[0] == b[0]
+        np.testing.assert_array_equal(a[1], b[1])
+
+
+def test_ann_with_all_lists_probed_is_exact():
+    features, classes, _ = _library(4000, seed=5)
+    index = SimilarityIndex(42, min_ann_rows=0)
+    index.add(features, classes)
+    target = np.random.default_rng(6).standard_normal(42)
+    for target_class in CLASSES:
+        exact = index.query(target, target_class, 10)
+        approx = index.query(target, target_class, 10, n_probe=10_000)
+        assert exact[0] == approx[0]
+
+
+def test_unknown_class_and_empty_index():
+    index = SimilarityIndex(42)
+    assert index.query(np.ones(42), "Kick", 5)[0] == []
+    index.add(np.ones((2, 42)), ["Kick", "Kick"])
+    assert index.query(np.ones(42), "Snare", 5)[0] == []
+    assert index.query(np.ones(42), "Kick", 0)[0] == []
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_quantized_rerank_matches_reference_loop(bare_classifier, quantization):
+    features, classes, names = _library(900, seed=7)
+    classifier = bare_classifier(features, classes, names, CLASSES, quantization=quantization)
+    database = list(classifier.reference_database)
+    rng = np.random.default_rng(8)
+    for target_class in CLASSES:
+        for top_k in (1, 10):
+            target = rng.standard_normal(42)
+            _assert_same(classifier.find_similar_sounds(target, target_class, top_k),
+                         _reference_loop(database, target, target_class, top_k))
+
+
+@pytest.mark.parametrize("quantization, bytes_per_row, atol", [
+    (None, 688, 0.0), ("float16", 100, 1e-3), ("int8", 62, 1e-2)])
+def test_quantized_storage_size_and_reconstruction(quantization, bytes_per_row, atol):
+    features, classes, _ = _library(500, seed=9)
+    index = SimilarityIndex(42, quantization=quantization)
+    index.add(features, ["Kick"] * 500)
+    block = index.blocks["Kick"]
+
+    stored = sum(getattr(block, name)[:block.size].nbytes for name in block._buffers)
+    assert stored == bytes_per_row * 500
+    rebuilt, _ = index.class_features("Kick")
+    np.testing.assert_allclose(rebuilt / np.linalg.norm(features, axis=1)[:, None],
+                               features / np.linalg.norm(features, axis=1)[:, None], atol=atol)
+
+
+def test_unknown_quantization_is_rejected():
+    with pytest.raises(ValueError):
+        SimilarityIndex(42, quantization="int4")
+
+
+def _structured(n, seed=0):
+    """İki baskın yönü belirgin (PCA eksenleri kararlı) özellikler"""
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, 42)) * np.r_[10.0, 5.0, np.full(40, 0.1)] + 1.0
+
+
+def _assert_same_axes(projection, features):
+    from sklearn.decomposition import PCA
+    batch = PCA(n_components=2).fit(features)
+    np.testing.assert_allclose(projection.pca.mean_, batch.mean_, atol=1e-9)
+    np.testing.assert_allclose(projection.pca.explained_variance_ratio_,
+                               batch.explained_variance_ratio_, rtol=1e-3)
+    # Eksenler işaret dışında aynı
+    signs = np.sign(np.sum(projection.pca.components_ * batch.components_, axis=1))
+    np.testing.assert_allclose(projection.pca.components_ * signs[:, None],
+                               batch.components_, atol=1e-3)
+    np.testing.assert_allclose(projection.coords * signs, batch.transform(features),
+                               rtol=1e-3, atol=1e-2)
+
+
+def test_incremental_projection_matches_batch_pca():
+    features = _structured(190)
+    projection = ClassProjection()
+    for version, n in enumerate([100, 130, 160, 190]):
+        projection.update(features[:n], version)
+    # Sınıf iki katına çıkmadı: hep partial_fit ile güncellendi
+    assert projection.trained_size == 100 and projection.fitted == 190
+    _assert_same_axes(projection, features)
+
+
+def test_projection_survives_appends_and_index_rebuilds(bare_classifier):
+    features = _structured(160, seed=1)
+    refs = [{'filename': f"f{i}.wav", 'class': "Kick", 'features': f}
+            for i, f in enumerate(features)]
+    classifier = bare_classifier(features[:0], [], [], CLASSES)
+    classifier.reference_database = refs[:100]
+    classifier.get_pca_visualization_data(features[0], "Kick")
+    projection = classifier._projections["Kick"]
+
+    for n in (110, 125, 140):
+        classifier.reference_database.extend(refs[len(classifier.reference_database):n])
+        coords, names, _, _ = classifier.get_pca_visualization_data(features[0], "Kick")
+        assert classifier._projections["Kick"] is projection and len(names) == n + 1
+    # Büyümüş bir liste kopyası atanınca indeks yeniden kurulur, projeksiyon kalır
+    index = classifier._similarity_index()
+    classifier.reference_database = classifier.reference_database + refs[140:]
+    classifier.get_pca_visualization_data(features[0], "Kick")
+    assert classifier._similarity_index() is not index
+    assert classifier._projections["Kick"] is projection
+    assert projection.trained_size == 100 and projection.fitted == 160
+    _assert_same_axes(projection, features)
+
+    # Önceki satırlar değiştiyse aynı uzunlukta bile baştan eğitilir
+    other = _structured(160, seed=2)
+    classifier.reference_database = [dict(ref, features=f) for ref, f in zip(refs, other)]
+    classifier.get_pca_visualization_data(other[0], "Kick")
+    assert projection.trained_size == 160
+    _assert_same_axes(projection, other)
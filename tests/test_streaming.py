@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import feature_extractor as fe
+from streaming_extractor import extract_features_streaming
+
+
+@pytest.fixture(scope="module")
+def long_recording():
+    """Yarım saniye arayla vuruşlar ve hafif gürültüden oluşan 25 s'lik kayıt"""
+    rng = np.random.default_rng(0)
+    n = 25 * fe.SR
+    y = 0.001 * rng.standard_normal(n)
+    for start in range(0, n - fe.SR, fe.SR // 2):
+        hit = rng.standard_normal(fe.SR // 4) * np.exp(-np.arange(fe.SR // 4) / (0.03 * fe.SR))
+        y[start:start + len(hit)] += 0.5 * hit
+    buf = io.BytesIO()
+    sf.write(buf, y.astype(np.float32), fe.SR, format="WAV", subtype="FLOAT")
+    return y.astype(np.float32), buf.getvalue()
+
+
+def test_streaming_matches_full_extraction(long_recording):
+    signal, data = long_recording
+    full = fe.extract_features(signal)
+    streamed = extract_features_streaming(data, block_seconds=4.0)
+
+    assert streamed.keys() == full.keys()
+    for name, value in full.items():
+        # HPSS medyan süzgeci blok sınırlarında yaklaşık kalır
+        rtol = 0.05 if name == "hpi_ratio" else 1e-3
+        assert streamed[name] == pytest.approx(value, rel=rtol, abs=1e-6), name
+
+
+def test_onset_window_skips_leading_silence(long_recording):
+    signal, _ = long_recording
+    hit = signal[:2 * fe.SR]
+    padded = np.concatenate([np.zeros(3 * fe.SR, dtype=np.float32), hit])
+    buf = io.BytesIO()
+    sf.write(buf, padded, fe.SR, format="WAV", subtype="FLOAT")
+
+    windowed = extract_features_streaming(buf.getvalue(), block_seconds=1.0, onset_window=1.0)
+    direct = fe.extract_features(hit[:fe.SR])
+    # Pencere vuruştan az önce başlar; baştaki sessizlik atak süresine eklenmez
+    assert windowed["attack_time"] == pytest.approx(direct["attack_time"], abs=0.05)
+    assert windowed["rms_mean"] == pytest.approx(direct["rms_mean"], rel=0.05)
+
+
+def test_streaming_is_explicit(long_recording, monkeypatch, caplog):
+    _, data = long_recording
+    monkeypatch.setattr(fe, "STREAM_THRESHOLD_SECONDS", 10.0)
+    full = fe.features_to_vector(fe.extract_features(fe.load_signal(data)))
+
+    # Varsayılan: uzun dosya da tam yoldan, aynı özelliklerle
+    np.testing.assert_array_equal(fe.features_to_vector(fe.features_from_source(data)), full)
+    streamed = fe.features_to_vector(fe.features_from_source(data, streaming=True))
+    assert not np.array_equal(streamed, full)
+
+    # soxr dışı yeniden örnekleyicide akış yok; geri dönüş kaydedilir
+    with caplog.at_level("WARNING", logger="feature_extractor"):
+        fe.features_from_source(data, "polyphase", streaming=True)
+    assert "soxr" in caplog.text
+
+
+def test_cache_key_separates_streaming_modes():
+    from feature_cache import FeatureCache
+    cache = FeatureCache()
+    keys = {cache.key(b"x"), cache.key(b"x", streaming=True),
+            cache.key(b"x", streaming=True, onset_window=1.0)}
+    assert len(keys) == 3
+    assert cache.key(b"x", streaming=False, onset_window=1.0) == cache.key(b"x")